@@ -1,9 +1,11 @@
 """API v1 router integration."""
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, consultations
+from app.api.v1.endpoints import health, readiness, consultations, stats
 
 api_router = APIRouter()
 
 # 모든 엔드포인트를 통합
 api_router.include_router(health.router, tags=["health"])
+api_router.include_router(readiness.router, tags=["health"])
 api_router.include_router(consultations.router, tags=["consultations"])
+api_router.include_router(stats.router, tags=["stats"])
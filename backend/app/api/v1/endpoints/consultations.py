@@ -1,16 +1,25 @@
 """Consultation API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.api.deps import get_db
 from app.schemas import (
     ConsultationCreate,
     ConsultationUpdate,
     ConsultationResponse,
+    ConsultationBulkCreateRequest,
+    ConsultationBulkCreateResponse,
+    ConsultationBulkCreatedItem,
+    BulkItemError,
     ConsultationSearchRequest,
     ConsultationSearchResult,
-    ConsultationSearchResponse
+    ConsultationSearchResponse,
+    SearchExplainResponse,
+    ConsultationBatchSearchRequest,
+    ConsultationBatchSearchResponse,
+    BatchSearchQueryResult
 )
+from app.core.metrics import RESULT_COUNT, stage
 from app.services.consultation_service import consultation_service
 
 router = APIRouter()
@@ -23,14 +32,55 @@ async def create_consultation(
     """Create a new consultation."""
     return await consultation_service.create_consultation(db=db, consultation_data=consultation)
 
+@router.post("/consultations/bulk", response_model=ConsultationBulkCreateResponse)
+async def bulk_create_consultations(
+    bulk_request: ConsultationBulkCreateRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many consultations with batched embedding and a single multi-row insert.
+    
+    Invalid items are reported per index and do not fail the rest of the batch.
+    """
+    created, errors = await consultation_service.bulk_create_consultations(db, bulk_request.items)
+    return ConsultationBulkCreateResponse(
+        # 응답 필드를 ORM 행에서 채워 ConsultationResponse에 추가된 필드(category/owner 등)도 반영
+        created=[
+            ConsultationBulkCreatedItem.model_validate(
+                {**ConsultationResponse.model_validate(consultation).model_dump(), "index": index}
+            )
+            for index, consultation in created
+        ],
+        errors=[BulkItemError(index=index, errors=messages) for index, messages in errors],
+        created_count=len(created),
+        error_count=len(errors)
+    )
+
 @router.get("/consultations", response_model=List[ConsultationResponse])
 async def read_consultations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of consultations."""
-    consultations = await consultation_service.get_consultations(db, skip=skip, limit=limit)
+    """Get list of consultations.
+    
+    With `cursor` (from the X-Next-Cursor header of the previous page) the list is
+    paged by keyset on (created_at, id) and `skip` is ignored.
+    """
+    if cursor is None:
+        consultations = await consultation_service.get_consultations(db, skip=skip, limit=limit)
+        next_cursor = consultation_service.next_list_cursor(consultations, limit)
+    else:
+        try:
+            consultations, next_cursor = await consultation_service.get_consultations_page(
+                db, cursor=cursor, limit=limit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return consultations
 
 @router.get("/consultations/{consultation_id}", response_model=ConsultationResponse)
@@ -79,39 +129,212 @@ async def search_consultations(
     """Search consultations using vector similarity."""
     # skip 값을 계산 (page가 주어진 경우)
     skip = search_request.skip or ((search_request.page - 1) * search_request.limit)
+    filters = search_request.search_filters()
     
-    # 검색 결과 가져오기 (pagination 포함)
-    results, total_count = await consultation_service.search_consultations(
-        db, 
-        query=search_request.query, 
-        limit=search_request.limit,
-        skip=skip,
-        similarity_threshold=search_request.similarity_threshold
-    )
+    if search_request.hybrid and search_request.passages:
+        raise HTTPException(status_code=400, detail="hybrid와 passages는 함께 사용할 수 없습니다")
     
-    search_results = [
-        ConsultationSearchResult(
-            id=consultation.id,
-            text=consultation.text,
-            created_at=consultation.created_at,
-            updated_at=consultation.updated_at,
-            similarity=similarity
+    if search_request.hybrid:
+        # 어휘 + 벡터 순위 융합 검색 (검색 세션 커서는 사용하지 않음)
+        try:
+            hybrid_results, total_count = await consultation_service.hybrid_search(
+                db,
+                query=search_request.query,
+                limit=search_request.limit,
+                skip=skip,
+                similarity_threshold=search_request.similarity_threshold,
+                prefilter=search_request.hybrid_prefilter,
+                filters=filters,
+                ef_search=search_request.ef_search,
+                probes=search_request.probes
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        cursor = None
+        search_results = [
+            ConsultationSearchResult(
+                id=consultation.id,
+                text=consultation.text,
+                created_at=consultation.created_at,
+                updated_at=consultation.updated_at,
+                similarity=similarity,
+                score=score,
+                category=consultation.category,
+                owner=consultation.owner
+            )
+            for consultation, similarity, score in hybrid_results
+        ]
+    elif search_request.passages:
+        # 구간 단위 검색 (검색 세션 커서는 사용하지 않음)
+        try:
+            passage_results, total_count = await consultation_service.search_passages(
+                db,
+                query=search_request.query,
+                limit=search_request.limit,
+                skip=skip,
+                similarity_threshold=search_request.similarity_threshold,
+                aggregation=search_request.aggregation,
+                top_n=search_request.top_n,
+                filters=filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        cursor = None
+        search_results = [
+            ConsultationSearchResult(
+                id=consultation.id,
+                text=consultation.text,
+                created_at=consultation.created_at,
+                updated_at=consultation.updated_at,
+                similarity=similarity,
+                snippet=passage,
+                category=consultation.category,
+                owner=consultation.owner
+            )
+            for consultation, similarity, passage in passage_results
+        ]
+    else:
+        # 검색 결과 가져오기 (pagination 포함, 커서를 요청/전달하면 저장된 순위 목록에서 조회)
+        results, total_count, cursor = await consultation_service.search_consultations_page(
+            db, 
+            query=search_request.query, 
+            limit=search_request.limit,
+            skip=skip,
+            similarity_threshold=search_request.similarity_threshold,
+            ef_search=search_request.ef_search,
+            probes=search_request.probes,
+            cursor=search_request.cursor,
+            filters=filters,
+            create_cursor=search_request.create_cursor
         )
-        for consultation, similarity in results
-    ]
+        
+        search_results = [
+            ConsultationSearchResult(
+                id=consultation.id,
+                text=consultation.text,
+                created_at=consultation.created_at,
+                updated_at=consultation.updated_at,
+                similarity=similarity,
+                category=consultation.category,
+                owner=consultation.owner
+            )
+            for consultation, similarity in results
+        ]
+    
+    # 하이브리드 total은 두 후보 목록(HYBRID_CANDIDATES 상한)을 합친 수라 근사값이고,
+    # 구간 검색은 정확히 세며, 벡터 검색은 ivfpq 모드에서만 근사값
+    total_is_estimate = search_request.hybrid or (
+        not search_request.passages and consultation_service.search_total_is_estimate()
+    )
+    
+    # 임베딩 대기 중이라 검색 대상에서 빠진 행 수 (요청 시에만 조회)
+    pending_excluded = None
+    if search_request.include_pending_count:
+        pending_excluded = await consultation_service.count_pending_embeddings(db)
     
     # 페이징 정보 계산
     total_pages = (total_count + search_request.limit - 1) // search_request.limit
     current_page = search_request.page
     has_next = current_page < total_pages
     has_prev = current_page > 1
+    RESULT_COUNT.observe(len(search_results), "search")
     
-    return ConsultationSearchResponse(
-        results=search_results,
-        total=total_count,
-        page=current_page,
-        limit=search_request.limit,
-        total_pages=total_pages,
-        has_next=has_next,
-        has_prev=has_prev
+    # 응답 본문을 여기서 직렬화해 serialize 단계로 측정 (jsonable_encoder 경유보다 빠름)
+    with stage("serialize", "search"):
+        body = ConsultationSearchResponse(
+            results=search_results,
+            total=total_count,
+            page=current_page,
+            limit=search_request.limit,
+            total_pages=total_pages,
+            has_next=has_next,
+            has_prev=has_prev,
+            cursor=cursor,
+            pending_excluded=pending_excluded,
+            total_is_estimate=total_is_estimate
+        ).model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+@router.post("/consultations/search/explain", response_model=SearchExplainResponse)
+async def explain_search(
+    search_request: ConsultationSearchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Run a search and report its strategy, SQL plan, candidates, threshold cut-off and timings.
+    
+    Takes the same body as /consultations/search; the cursor is ignored and
+    passage/hybrid searches are not supported.
+    """
+    if search_request.hybrid or search_request.passages:
+        raise HTTPException(status_code=400, detail="검색 진단은 hybrid/passages 검색을 지원하지 않습니다")
+    skip = search_request.skip or ((search_request.page - 1) * search_request.limit)
+    
+    try:
+        report = await consultation_service.explain_search(
+            db,
+            query=search_request.query,
+            limit=search_request.limit,
+            skip=skip,
+            similarity_threshold=search_request.similarity_threshold,
+            ef_search=search_request.ef_search,
+            probes=search_request.probes,
+            filters=search_request.search_filters()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return SearchExplainResponse(
+        **dict(report, results=[
+            ConsultationSearchResult(
+                id=consultation.id,
+                text=consultation.text,
+                created_at=consultation.created_at,
+                updated_at=consultation.updated_at,
+                similarity=similarity,
+                category=consultation.category,
+                owner=consultation.owner
+            )
+            for consultation, similarity in report["results"]
+        ])
     )
+
+@router.post("/consultations/search/batch", response_model=ConsultationBatchSearchResponse)
+async def search_consultations_batch(
+    batch_request: ConsultationBatchSearchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Run several similarity searches with one embedding call and one ranking pass."""
+    ranked = await consultation_service.search_consultations_batch(
+        db,
+        queries=batch_request.queries,
+        ef_search=batch_request.ef_search,
+        probes=batch_request.probes
+    )
+    
+    for results, _ in ranked:
+        RESULT_COUNT.observe(len(results), "search_batch")
+    
+    with stage("serialize", "search_batch"):
+        body = ConsultationBatchSearchResponse(
+            results=[
+                BatchSearchQueryResult(
+                    query=item.query,
+                    results=[
+                        ConsultationSearchResult(
+                            id=consultation.id,
+                            text=consultation.text,
+                            created_at=consultation.created_at,
+                            updated_at=consultation.updated_at,
+                            similarity=similarity,
+                            category=consultation.category,
+                            owner=consultation.owner
+                        )
+                        for consultation, similarity in results
+                    ],
+                    total=total_count
+                )
+                for item, (results, total_count) in zip(batch_request.queries, ranked)
+            ],
+            total_is_estimate=consultation_service.search_total_is_estimate()
+        ).model_dump_json()
+    return Response(content=body, media_type="application/json")
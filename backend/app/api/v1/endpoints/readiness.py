@@ -0,0 +1,14 @@
+"""Readiness check endpoint."""
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.services.readiness_service import readiness_service
+
+router = APIRouter()
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness check: 503 until the embedding model is loaded and warmed up."""
+    body = readiness_service.status()
+    if not body["ready"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
@@ -0,0 +1,33 @@
+"""Runtime statistics endpoints."""
+from fastapi import APIRouter
+from app.db.session import get_pool_stats
+from app.services.consultation_service import consultation_service
+from app.services.embedding_service import embedding_service
+from app.services.ingestion_service import ingestion_service
+
+router = APIRouter()
+
+@router.get("/stats/search-index")
+async def search_index_stats():
+    """In-process vector index state and memory footprint."""
+    return consultation_service.get_vector_index_stats()
+
+@router.get("/stats/embedding")
+async def embedding_stats():
+    """Query embedding cache counters."""
+    return embedding_service.get_stats()
+
+@router.get("/stats/search-cursors")
+async def search_cursor_stats():
+    """Search session cursor counters."""
+    return consultation_service.get_search_cursor_stats()
+
+@router.get("/stats/ingestion")
+async def ingestion_stats():
+    """Background embedding queue counters."""
+    return ingestion_service.stats()
+
+@router.get("/stats/database")
+async def database_stats():
+    """Database connection pool counters."""
+    return get_pool_stats()
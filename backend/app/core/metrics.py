@@ -0,0 +1,185 @@
+"""In-process metrics in Prometheus text format and per-request stage timings."""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# 지연 시간(초) 버킷
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 개수(행 수, 결과 수, 배치 크기) 버킷
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000, 100000, 1000000)
+# Server-Timing 헤더에 보고하는 단계
+STAGES = ("embed", "db", "score", "serialize")
+
+# 현재 요청의 단계별 누적 시간 (미들웨어가 요청마다 새 dict를 설정)
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+# 현재 요청에서 채점한 벡터 수 (검색 진단처럼 필요한 곳에서만 설정)
+request_rows_scanned: ContextVar[Optional[Dict[str, int]]] = ContextVar("request_rows_scanned", default=None)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them; when disabled every update is a no-op."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        return "".join(metric.render() for metric in self._metrics)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, registry: MetricsRegistry, name: str, documentation: str,
+                 labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        if not self.registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # [버킷별 개수..., +Inf 개수, 합계]
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class Gauge:
+    """Gauge that is set directly or read from a callback at scrape time."""
+
+    def __init__(self, registry: MetricsRegistry, name: str, documentation: str):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if self.registry.enabled:
+            with self._lock:
+                self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return float(self._function()) if self._function is not None else self._value
+
+    def render(self) -> str:
+        return (
+            f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} gauge\n"
+            f"{self.name} {_format_value(self.value)}\n"
+        )
+
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+STAGE_HISTOGRAMS = {
+    "embed": Histogram(registry, "embed_duration_seconds", "Time spent embedding texts", ("operation",)),
+    "db": Histogram(registry, "db_duration_seconds", "Time spent in database round trips", ("operation",)),
+    "score": Histogram(registry, "score_duration_seconds", "Time spent scoring vectors in Python", ("operation",)),
+    "serialize": Histogram(registry, "serialize_duration_seconds", "Time spent building response bodies", ("operation",)),
+}
+ROWS_SCANNED = Histogram(registry, "search_rows_scanned", "Vectors scored per search", ("mode",), COUNT_BUCKETS)
+RESULT_COUNT = Histogram(registry, "search_result_count", "Results returned per search", ("endpoint",), COUNT_BUCKETS)
+BATCH_SIZE = Histogram(registry, "embed_batch_size", "Texts per embedding call", ("operation",), COUNT_BUCKETS)
+REQUEST_DURATION = Histogram(
+    registry, "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+IN_FLIGHT = Gauge(registry, "http_requests_in_flight", "HTTP requests being processed")
+MODEL_LOADED = Gauge(registry, "embedding_model_loaded", "1 if the embedding model is loaded")
+DB_POOL_IN_USE = Gauge(registry, "db_pool_connections_in_use", "Database connections checked out of the pool")
+
+
+@contextmanager
+def stage(name: str, operation: str):
+    """Time a block as stage `name` (embed, db, score, serialize).
+
+    The duration is observed in the stage histogram and added to the current
+    request's Server-Timing totals.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings = request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+        STAGE_HISTOGRAMS[name].observe(elapsed, operation)
+
+
+def record_rows_scanned(count: int, mode: str) -> None:
+    """Observe vectors scored by one search and add them to the current request's counts."""
+    ROWS_SCANNED.observe(count, mode)
+    scanned = request_rows_scanned.get()
+    if scanned is not None:
+        scanned[mode] = scanned.get(mode, 0) + count
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    """Server-Timing value with the recorded stages and the total, in milliseconds."""
+    entries = [f"{name};dur={timings[name] * 1000:.2f}" for name in STAGES if name in timings]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
@@ -0,0 +1,92 @@
+"""Request timing middleware: latency metrics, Server-Timing and on-demand profiling."""
+import asyncio
+import hmac
+import sys
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import IN_FLIGHT, REQUEST_DURATION, request_timings, server_timing_header
+from app.core.profiling import SamplingProfiler
+
+PROFILE_REQUEST_HEADER = "x-debug-profile"
+PROFILE_RESPONSE_HEADER = "X-Debug-Profile-Id"
+# 저장된 프로파일 조회 요청 자체는 프로파일링하지 않음
+PROFILE_DOWNLOAD_PREFIX = "/debug/profiles/"
+
+
+def profiling_authorized(token: str) -> bool:
+    """True if profiling is enabled and `token` matches PROFILING_TOKEN."""
+    expected = settings.PROFILING_TOKEN
+    return bool(expected) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+class RequestTimingMiddleware:
+    """Pure ASGI middleware so streaming bodies and background tasks are untouched.
+
+    Every HTTP request gets a fresh stage-timing dict (filled by
+    `app.core.metrics.stage`), is counted in the in-flight gauge and observed
+    in the request latency histogram by route template. The response carries
+    a ``Server-Timing`` header with the stages measured before the headers
+    were sent. Requests with an ``X-Debug-Profile`` header equal to
+    PROFILING_TOKEN are sampled by `SamplingProfiler`; the folded stacks are
+    stored in PROFILE_DIR and the file name is returned in
+    ``X-Debug-Profile-Id``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = request_timings.set(timings)
+        profiler = None
+        profile_token = Headers(scope=scope).get(PROFILE_REQUEST_HEADER)
+        if (
+            profile_token is not None
+            and not scope["path"].startswith(PROFILE_DOWNLOAD_PREFIX)
+            and profiling_authorized(profile_token)
+        ):
+            # 이 코루틴 프레임을 앵커로 삼아 동시 요청의 샘플을 제외
+            profiler = SamplingProfiler(sys._getframe(), settings.PROFILING_INTERVAL_MS)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                if settings.SERVER_TIMING_ENABLED:
+                    headers.append("Server-Timing", server_timing_header(timings, time.perf_counter() - started))
+                if profiler is not None:
+                    # 헤더 전송 전에 샘플링을 끝내야 파일 이름을 응답에 실을 수 있음
+                    # (stop은 스레드를 기다리지 않고, 파일 쓰기는 이벤트 루프 밖에서 수행)
+                    profiler.stop()
+                    name = await asyncio.to_thread(profiler.save, settings.PROFILE_DIR)
+                    headers.append(PROFILE_RESPONSE_HEADER, name)
+            await send(message)
+
+        IN_FLIGHT.inc()
+        if profiler is not None:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            )
+            request_timings.reset(token)
@@ -0,0 +1,109 @@
+"""Sampling CPU profiler for a single request, written as folded stacks."""
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+from typing import List, Optional
+
+# 스레드 풀 작업자가 작업을 기다리는 중인 프레임 (유휴 샘플로 보고 제외)
+IDLE_LEAF_FUNCTIONS = frozenset({"_worker", "wait", "get", "select", "poll", "_run_once"})
+# 메모리 사용을 제한하기 위한 요청당 최대 샘플 수
+MAX_SAMPLES = 20000
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+def _stack(frame: Optional[FrameType]) -> List[FrameType]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class SamplingProfiler:
+    """Sample the stacks of running threads every `interval_ms` while active.
+
+    On the thread that owns the request (the event loop) only samples whose
+    stack contains `anchor` are kept, so concurrent requests served by the
+    same loop do not leak into the profile. Other threads (the embedding
+    thread pool) are sampled unless idle. The result is the folded-stack
+    format read by flamegraph.pl and speedscope: ``frame;frame;... count``.
+    """
+
+    def __init__(self, anchor: FrameType, interval_ms: float = 5.0):
+        self.anchor = anchor
+        self.owner_thread = threading.get_ident()
+        self.interval = max(interval_ms, 0.5) / 1000.0
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        # stop() 이후에는 샘플이 추가되지 않도록 기록과 중지를 직렬화
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling without waiting for the sampler thread; it exits on its next wake-up."""
+        with self._lock:
+            self._stop.set()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval) and self.sample_count < MAX_SAMPLES:
+            self._sample(me)
+
+    def _sample(self, me: int) -> None:
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            frames = _stack(frame)
+            if thread_id == self.owner_thread:
+                # 요청 코루틴이 실행 중일 때만 (앵커 프레임 이하만 기록)
+                try:
+                    start = next(i for i, f in enumerate(frames) if f is self.anchor)
+                except StopIteration:
+                    continue
+                frames = frames[start:]
+            elif frames[-1].f_code.co_name in IDLE_LEAF_FUNCTIONS:
+                continue
+            stacks.append(";".join(_frame_label(f) for f in frames))
+        with self._lock:
+            # 스택을 모으는 동안 stop()이 호출됐으면 저장 중인 결과를 바꾸지 않음
+            if self._stop.is_set():
+                return
+            self.samples.update(stacks)
+            self.sample_count += len(stacks)
+
+    def folded(self) -> str:
+        """Folded stacks, one ``stack count`` line each, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def save(self, directory: str) -> str:
+        """Write the folded stacks under `directory` and return the file name."""
+        name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.folded"
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text(self.folded(), encoding="utf-8")
+        return name
+
+
+def profile_path(directory: str, name: str) -> Optional[Path]:
+    """Path of a stored profile, or None if `name` is not a plain profile file name."""
+    if os.path.basename(name) != name or not name.endswith(".folded"):
+        return None
+    path = Path(directory) / name
+    return path if path.is_file() else None
@@ -1,38 +1,388 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
-from app.models import Consultation
-from app.schemas import ConsultationCreate, ConsultationUpdate
+from sqlalchemy import select, insert, update, delete, bindparam, text, func, tuple_, literal, literal_column, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import defer
+from app.core.config import settings
+from app.core.metrics import record_rows_scanned, stage
+from app.db.explain import explain
+from app.db.vector_index import apply_search_params, HNSW_DEFAULT_EF_SEARCH, HNSW_MAX_EF_SEARCH
+from app.models import (
+    Consultation,
+    ConsultationPassage,
+    EMBEDDING_STATUS_PENDING,
+    EMBEDDING_STATUS_READY,
+    EMBEDDING_STATUS_FAILED,
+)
+from app.search.hybrid import build_tsquery, reciprocal_rank_fusion
+from app.search.passages import aggregate_passage_scores, rank_aggregated, split_passages
+from app.search.topk import BatchTopK
+from app.schemas import ConsultationCreate, ConsultationUpdate, SearchFilters
+from app.services.embedding_cache import content_hash
 from app.services.embedding_service import embedding_service
+import base64
+import json
 import numpy as np
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-async def create_consultation(db: AsyncSession, consultation: ConsultationCreate):
-    # 텍스트를 벡터로 변환
-    embedding = embedding_service.embed_text(consultation.text)
-    
-    db_consultation = Consultation(
-        text=consultation.text,
-        embedding=embedding
+# PostgreSQL 전용 생성 컬럼 (to_tsvector('simple', text)) - 모델에는 선언하지 않음
+TEXT_SEARCH_COLUMN = literal_column("consultations.text_search", TSVECTOR)
+
+def search_filter_conditions(filters: Optional[SearchFilters]) -> list:
+    """WHERE conditions on consultations for the given metadata filters."""
+    if filters is None:
+        return []
+    conditions = []
+    if filters.category is not None:
+        conditions.append(Consultation.category == filters.category)
+    if filters.owner is not None:
+        conditions.append(Consultation.owner == filters.owner)
+    if filters.created_from is not None:
+        conditions.append(Consultation.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        conditions.append(Consultation.created_at < filters.created_to)
+    if filters.ids is not None:
+        conditions.append(Consultation.id.in_(set(filters.ids)))
+    return conditions
+
+def _iterative_scan(filter_conditions: list) -> Optional[str]:
+    # HNSW는 ef_search개 후보를 뽑은 뒤 필터를 적용하므로, 필터가 있으면 반복 탐색으로 limit을 채움
+    if not filter_conditions or settings.VECTOR_INDEX_TYPE != "hnsw":
+        return None
+    mode = settings.SEARCH_FILTER_ITERATIVE_SCAN
+    return None if mode == "off" else mode
+
+async def get_filtered_consultation_ids(db: AsyncSession, filters: SearchFilters) -> List[int]:
+    """Ids of embedded consultations that pass the filters (in-process search allow-list)."""
+    result = await db.execute(
+        select(Consultation.id)
+        .where(Consultation.embedding.isnot(None), *search_filter_conditions(filters))
+    )
+    return result.scalars().all()
+
+async def get_embeddings_by_content_hash(db: AsyncSession, content_hashes: List[str]) -> Dict[str, List[float]]:
+    """Existing embeddings for the given content hashes (one row per hash)."""
+    if not content_hashes:
+        return {}
+    # 해시별로 가장 오래된 행 하나의 임베딩만 가져옴
+    first_ids = (
+        select(func.min(Consultation.id))
+        .where(
+            Consultation.content_hash.in_(set(content_hashes)),
+            Consultation.embedding_status == EMBEDDING_STATUS_READY,
+            Consultation.embedding.isnot(None)
+        )
+        .group_by(Consultation.content_hash)
     )
+    result = await db.execute(
+        select(Consultation.content_hash, Consultation.embedding).where(Consultation.id.in_(first_ids))
+    )
+    return {row.content_hash: row.embedding for row in result.all()}
+
+async def delete_passages(db: AsyncSession, consultation_ids: List[int]) -> None:
+    if consultation_ids:
+        await db.execute(delete(ConsultationPassage).where(ConsultationPassage.consultation_id.in_(consultation_ids)))
+
+async def write_passages(db: AsyncSession, consultations: List[Tuple[int, str, Optional[List[float]]]]) -> int:
+    """Replace the passages of (id, text, embedding) rows without committing; return the passage count.
+    
+    Passages of all rows are embedded with one batched call; a text that fits in
+    one passage reuses the consultation embedding.
+    """
+    await delete_passages(db, [consultation_id for consultation_id, _, _ in consultations])
+    if not settings.PASSAGE_SEARCH_ENABLED or not consultations:
+        return 0
+    
+    rows = []
+    texts_to_embed: Dict[str, None] = {}
+    for consultation_id, consultation_text, embedding in consultations:
+        spans = split_passages(consultation_text, settings.PASSAGE_MAX_CHARS, settings.PASSAGE_OVERLAP_CHARS)
+        for position, (start, end) in enumerate(spans):
+            passage_text = consultation_text[start:end]
+            reuse = embedding if len(spans) == 1 and embedding is not None else None
+            if reuse is None:
+                texts_to_embed.setdefault(passage_text)
+            rows.append({
+                "consultation_id": consultation_id,
+                "position": position,
+                "start_offset": start,
+                "end_offset": end,
+                "embedding": reuse,
+                "_text": passage_text,
+            })
+    if texts_to_embed:
+        # 구간은 길이가 비슷하므로 길이 버킷 배치에서 패딩이 거의 없음
+        vectors = dict(zip(texts_to_embed, await embedding_service.aembed_batch(list(texts_to_embed))))
+        for row in rows:
+            if row["embedding"] is None:
+                row["embedding"] = vectors[row["_text"]]
+    for row in rows:
+        del row["_text"]
+    await db.execute(insert(ConsultationPassage), rows)
+    return len(rows)
+
+async def sync_passages(db: AsyncSession, consultations: List[Tuple[int, str, Optional[List[float]]]]) -> int:
+    """write_passages and commit (background ingestion and backfill)."""
+    count = await write_passages(db, consultations)
+    await db.commit()
+    return count
+
+async def create_consultation(db: AsyncSession, consultation: ConsultationCreate, defer_embedding: bool = False):
+    text_hash = content_hash(consultation.text)
+    # 같은 내용의 행이 있으면 모델을 호출하지 않고 임베딩을 복사
+    existing = await get_embeddings_by_content_hash(db, [text_hash])
+    if text_hash in existing:
+        embedding_service.record_reuse("copied_by_hash")
+        db_consultation = Consultation(
+            text=consultation.text,
+            content_hash=text_hash,
+            embedding=existing[text_hash],
+            category=consultation.category,
+            owner=consultation.owner
+        )
+    elif defer_embedding:
+        # 임베딩은 수집 워커가 나중에 채움
+        db_consultation = Consultation(
+            text=consultation.text,
+            content_hash=text_hash,
+            embedding_status=EMBEDDING_STATUS_PENDING,
+            category=consultation.category,
+            owner=consultation.owner
+        )
+    else:
+        # 텍스트를 벡터로 변환
+        embedding = await embedding_service.aembed_text(consultation.text)
+        db_consultation = Consultation(
+            text=consultation.text,
+            content_hash=text_hash,
+            embedding=embedding,
+            category=consultation.category,
+            owner=consultation.owner
+        )
     
     db.add(db_consultation)
+    if settings.PASSAGE_SEARCH_ENABLED and db_consultation.embedding is not None:
+        # id를 받아 같은 트랜잭션에서 구간도 저장
+        await db.flush()
+        await write_passages(db, [(db_consultation.id, db_consultation.text, db_consultation.embedding)])
     await db.commit()
     await db.refresh(db_consultation)
     return db_consultation
 
+async def bulk_create_consultations(
+    db: AsyncSession,
+    consultations: List[ConsultationCreate],
+    defer_embedding: bool = False
+) -> List[Consultation]:
+    hashes = [content_hash(consultation.text) for consultation in consultations]
+    embeddings_by_hash = await get_embeddings_by_content_hash(db, hashes)
+    
+    # 기존 행에도, 배치 안의 앞선 항목에도 없는 내용만 모델로 임베딩
+    missing: Dict[str, str] = {}
+    for consultation, text_hash in zip(consultations, hashes):
+        if text_hash not in embeddings_by_hash:
+            missing.setdefault(text_hash, consultation.text)
+    model_calls = 0
+    if missing and not defer_embedding:
+        # 배치 임베딩 (길이가 비슷한 텍스트끼리 토큰 예산 단위 forward pass)
+        embeddings = await embedding_service.aembed_batch(list(missing.values()))
+        embeddings_by_hash.update(zip(missing, embeddings))
+        model_calls = len(missing)
+    embedding_service.record_reuse(
+        "copied_by_hash", sum(text_hash in embeddings_by_hash for text_hash in hashes) - model_calls
+    )
+    
+    rows = [
+        {
+            "text": consultation.text,
+            "content_hash": text_hash,
+            "category": consultation.category,
+            "owner": consultation.owner,
+            "embedding": embeddings_by_hash.get(text_hash),
+            "embedding_status": EMBEDDING_STATUS_READY if text_hash in embeddings_by_hash else EMBEDDING_STATUS_PENDING
+        }
+        for consultation, text_hash in zip(consultations, hashes)
+    ]
+    
+    # 다중 행 INSERT ... RETURNING 한 번과 커밋 한 번으로 저장 (입력 순서대로 반환)
+    result = await db.scalars(
+        insert(Consultation).returning(Consultation, sort_by_parameter_order=True),
+        rows
+    )
+    db_consultations = result.all()
+    if settings.PASSAGE_SEARCH_ENABLED:
+        # 모든 상담의 구간을 한 번의 배치 임베딩으로 저장 (pending 행은 수집 워커가 처리)
+        await write_passages(db, [
+            (consultation.id, consultation.text, consultation.embedding)
+            for consultation in db_consultations
+            if consultation.embedding is not None
+        ])
+    await db.commit()
+    return db_consultations
+
+async def get_unembedded_consultation_ids(
+    db: AsyncSession,
+    updated_since: Optional[datetime] = None
+) -> List[int]:
+    # 재시작 시 임베딩이 채워지지 않은 행(pending/failed) 복구용 (updated_since: 인덱스 갱신용)
+    statement = select(Consultation.id).where(Consultation.embedding_status != EMBEDDING_STATUS_READY)
+    if updated_since is not None:
+        statement = statement.where(Consultation.updated_at >= updated_since)
+    result = await db.execute(statement.order_by(Consultation.id))
+    return result.scalars().all()
+
+async def count_pending_consultations(db: AsyncSession) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Consultation)
+        .where(Consultation.embedding_status != EMBEDDING_STATUS_READY)
+    )
+
+async def get_pending_consultations(db: AsyncSession, consultation_ids: List[int]) -> List[Tuple[int, str]]:
+    # 행을 잠가 선점: 여러 워커 프로세스가 같은 행을 복구해도 한 곳에서만 임베딩
+    # (다른 워커가 잠근 행은 건너뛰고, 잠금은 fill_embeddings/mark_embedding_failed의 커밋까지 유지, SQLite는 무시)
+    result = await db.execute(
+        select(Consultation.id, Consultation.text)
+        .where(Consultation.id.in_(consultation_ids), Consultation.embedding_status != EMBEDDING_STATUS_READY)
+        .with_for_update(skip_locked=True)
+    )
+    return result.all()
+
+async def fill_embeddings(
+    db: AsyncSession,
+    rows: List[Tuple[int, str]],
+    embeddings: List[List[float]]
+) -> List[int]:
+    """Store embeddings for pending rows whose text is unchanged; return the updated ids."""
+    table = Consultation.__table__
+    # 임베딩 중에 텍스트가 수정된 행은 건너뜀 (수정 요청이 다시 대기열에 넣음)
+    await db.execute(
+        update(table)
+        .where(
+            table.c.id == bindparam("row_id"),
+            table.c.text == bindparam("row_text"),
+            table.c.embedding_status != EMBEDDING_STATUS_READY
+        )
+        .values(embedding=bindparam("row_embedding"), embedding_status=EMBEDDING_STATUS_READY),
+        [
+            {"row_id": consultation_id, "row_text": embedded_text, "row_embedding": embedding}
+            for (consultation_id, embedded_text), embedding in zip(rows, embeddings)
+        ]
+    )
+    await db.commit()
+    
+    embedded_texts = dict(rows)
+    result = await db.execute(
+        select(Consultation.id, Consultation.text)
+        .where(Consultation.id.in_(embedded_texts), Consultation.embedding_status == EMBEDDING_STATUS_READY)
+    )
+    return [consultation_id for consultation_id, current_text in result.all() if embedded_texts[consultation_id] == current_text]
+
+async def mark_embedding_failed(db: AsyncSession, consultation_ids: List[int]) -> None:
+    await db.execute(
+        update(Consultation)
+        .where(Consultation.id.in_(consultation_ids), Consultation.embedding_status == EMBEDDING_STATUS_PENDING)
+        .values(embedding_status=EMBEDDING_STATUS_FAILED)
+    )
+    await db.commit()
+
 async def get_consultation(db: AsyncSession, consultation_id: int):
     result = await db.execute(
         select(Consultation).where(Consultation.id == consultation_id)
     )
     return result.scalar_one_or_none()
 
+async def get_consultations_by_ids(db: AsyncSession, consultation_ids: List[int]):
+    # 검색 결과 페이지 조회용 - 임베딩 컬럼은 전송하지 않음
+    if not consultation_ids:
+        return []
+    result = await db.execute(
+        select(Consultation)
+        .options(defer(Consultation.embedding))
+        .where(Consultation.id.in_(consultation_ids))
+    )
+    return result.scalars().all()
+
+async def get_consultation_embeddings_by_ids(db: AsyncSession, consultation_ids: List[int]):
+    # 후보 재정렬용 - 텍스트 없이 id와 float32 임베딩만 조회
+    if not consultation_ids:
+        return []
+    result = await db.execute(
+        select(Consultation.id, Consultation.embedding)
+        .where(Consultation.id.in_(consultation_ids), Consultation.embedding.isnot(None))
+    )
+    return result.all()
+
+async def count_embedded_consultations(db: AsyncSession) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Consultation).where(Consultation.embedding.isnot(None))
+    )
+
+async def stream_consultation_embeddings(
+    db: AsyncSession,
+    updated_since: Optional[datetime] = None,
+    chunk_size: int = 10000
+) -> AsyncIterator[Tuple[List[int], List[np.ndarray]]]:
+    # 전체 행을 한 번에 올리지 않고 (id 목록, 임베딩 목록) 청크 단위로 스트리밍
+    statement = select(Consultation.id, Consultation.embedding).where(Consultation.embedding.isnot(None))
+    if updated_since is not None:
+        statement = statement.where(Consultation.updated_at >= updated_since)
+    
+    result = await db.stream(statement.execution_options(yield_per=chunk_size))
+    async for rows in result.partitions():
+        yield [row.id for row in rows], [row.embedding for row in rows]
+
+async def get_latest_update(db: AsyncSession) -> Optional[datetime]:
+    # 프로세스 내 인덱스가 반영한 변경 시점 (다음 갱신의 high-water mark)
+    return await db.scalar(select(func.max(Consultation.updated_at)))
+
+async def get_consultation_ids(db: AsyncSession) -> List[int]:
+    result = await db.execute(select(Consultation.id))
+    return result.scalars().all()
+
 async def get_consultations(db: AsyncSession, skip: int = 0, limit: int = 100):
     result = await db.execute(
-        select(Consultation).offset(skip).limit(limit).order_by(Consultation.created_at.desc())
+        select(Consultation).offset(skip).limit(limit)
+        .order_by(Consultation.created_at.desc(), Consultation.id.desc())
     )
     return result.scalars().all()
 
-async def update_consultation(db: AsyncSession, consultation_id: int, consultation: ConsultationUpdate):
+def encode_list_cursor(consultation: Consultation) -> str:
+    """Encode the (created_at, id) position of a row as an opaque cursor."""
+    payload = {"created_at": consultation.created_at.isoformat(), "id": consultation.id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_list_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_list_cursor; raise ValueError if malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("잘못된 목록 커서입니다") from e
+
+async def get_consultations_after(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> List[Consultation]:
+    """Keyset page ordered by (created_at DESC, id DESC), starting after `cursor`."""
+    statement = select(Consultation)
+    if cursor:
+        created_at, consultation_id = decode_list_cursor(cursor)
+        # OFFSET 대신 (created_at, id) 위치에서 바로 탐색하므로 깊은 페이지도 일정한 비용
+        statement = statement.where(
+            tuple_(Consultation.created_at, Consultation.id) < tuple_(created_at, consultation_id)
+        )
+    result = await db.execute(
+        statement.order_by(Consultation.created_at.desc(), Consultation.id.desc()).limit(limit)
+    )
+    return result.scalars().all()
+
+async def update_consultation(
+    db: AsyncSession,
+    consultation_id: int,
+    consultation: ConsultationUpdate,
+    defer_embedding: bool = False
+):
     # 기존 상담 찾기
     result = await db.execute(
         select(Consultation).where(Consultation.id == consultation_id)
@@ -40,10 +390,32 @@ async def update_consultation(db: AsyncSession, consultation_id: int, consultati
     db_consultation = result.scalar_one_or_none()
     
     if db_consultation:
-        # 텍스트 업데이트 및 임베딩 재생성
+        text_hash = content_hash(consultation.text)
+        unchanged = (
+            db_consultation.content_hash == text_hash
+            and db_consultation.embedding is not None
+            and db_consultation.embedding_status == EMBEDDING_STATUS_READY
+        )
+        # 텍스트 업데이트 및 임베딩 재생성 (내용이 같으면 기존 임베딩 유지)
         db_consultation.text = consultation.text
-        embedding = embedding_service.embed_text(consultation.text)
-        db_consultation.embedding = embedding
+        db_consultation.content_hash = text_hash
+        # 메타데이터는 값이 주어진 경우에만 변경 (임베딩과 무관)
+        if consultation.category is not None:
+            db_consultation.category = consultation.category
+        if consultation.owner is not None:
+            db_consultation.owner = consultation.owner
+        if unchanged:
+            embedding_service.record_reuse("unchanged_update")
+        elif defer_embedding:
+            # 이전 텍스트의 벡터로 검색되지 않도록 비우고 수집 워커에 맡김 (구간도 삭제)
+            db_consultation.embedding = None
+            db_consultation.embedding_status = EMBEDDING_STATUS_PENDING
+            await delete_passages(db, [db_consultation.id])
+        else:
+            embedding = await embedding_service.aembed_text(consultation.text)
+            db_consultation.embedding = embedding
+            db_consultation.embedding_status = EMBEDDING_STATUS_READY
+            await write_passages(db, [(db_consultation.id, db_consultation.text, embedding)])
         
         await db.commit()
         await db.refresh(db_consultation)
@@ -57,36 +429,328 @@ async def delete_consultation(db: AsyncSession, consultation_id: int):
     db_consultation = result.scalar_one_or_none()
     
     if db_consultation:
+        # FK ON DELETE CASCADE가 없는 DB(SQLite 등)에서도 구간이 남지 않도록 명시적으로 삭제
+        await delete_passages(db, [consultation_id])
         await db.delete(db_consultation)
         await db.commit()
     
     return db_consultation
 
-async def search_consultations(db: AsyncSession, query: str, limit: int = 10, skip: int = 0, similarity_threshold: float = 0.3):
-    # 검색 쿼리를 벡터로 변환
-    query_embedding = embedding_service.embed_text(query)
+async def search_consultations(
+    db: AsyncSession,
+    query: str,
+    limit: int = 10,
+    skip: int = 0,
+    similarity_threshold: float = 0.3,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    filters: Optional[SearchFilters] = None
+):
+    # 검색 쿼리를 벡터로 변환 (쿼리 임베딩 캐시 사용)
+    query_embedding = await embedding_service.aembed_query(query)
+    
+    return await search_consultations_by_embedding(
+        db,
+        query_embedding,
+        limit=limit,
+        skip=skip,
+        similarity_threshold=similarity_threshold,
+        mode=mode,
+        ef_search=ef_search,
+        probes=probes,
+        filters=filters
+    )
+
+async def search_consultations_by_embedding(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int = 10,
+    skip: int = 0,
+    similarity_threshold: float = 0.3,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    filters: Optional[SearchFilters] = None
+):
+    mode = mode or settings.SEARCH_MODE
+    
+    if mode == "pgvector":
+        return await _search_pgvector(
+            db, query_embedding, limit, skip, similarity_threshold,
+            ef_search=ef_search, probes=probes, filters=filters
+        )
+    if mode == "python":
+        return await _search_python_scan(db, query_embedding, limit, skip, similarity_threshold, filters=filters)
+    
+    raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+
+async def rank_consultations_by_embedding(
+    db: AsyncSession,
+    query_embedding: List[float],
+    max_hits: int,
+    similarity_threshold: float = 0.3,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    filters: Optional[SearchFilters] = None
+) -> Tuple[List[Tuple[int, float]], int]:
+    """Return the top `max_hits` (id, similarity) pairs and the total hit count."""
+    mode = mode or settings.SEARCH_MODE
+    
+    if mode == "python":
+        results, total_count = await _search_python_scan(
+            db, query_embedding, max_hits, 0, similarity_threshold, filters=filters
+        )
+        return [(consultation.id, similarity) for consultation, similarity in results], total_count
+    if mode != "pgvector":
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+    
+    filter_conditions = search_filter_conditions(filters)
+    if settings.VECTOR_INDEX_TYPE == "hnsw":
+        ef_search = min(max(ef_search or HNSW_DEFAULT_EF_SEARCH, max_hits), HNSW_MAX_EF_SEARCH)
+    await apply_search_params(
+        db, ef_search=ef_search, probes=probes, iterative_scan=_iterative_scan(filter_conditions)
+    )
+    
+    distance = Consultation.embedding.cosine_distance(query_embedding)
+    conditions = (
+        Consultation.embedding.isnot(None),
+        distance <= 1.0 - similarity_threshold,
+        *filter_conditions,
+    )
+    # 순위 목록만 필요하므로 id와 유사도만 가져옴 (본문은 페이지별로 id 조회)
+    with stage("db", "rank_pgvector"):
+        result = await db.execute(
+            select(Consultation.id, (1.0 - distance).label("similarity"))
+            .where(*conditions)
+            .order_by(distance)
+            .limit(max_hits)
+        )
+        hits = [(consultation_id, float(similarity)) for consultation_id, similarity in result.all()]
+        if len(hits) < max_hits:
+            return hits, len(hits)
+        
+        total_count = await db.scalar(
+            select(func.count()).select_from(Consultation).where(*conditions)
+        )
+    return hits, total_count
+
+async def rank_consultations_batch(
+    db: AsyncSession,
+    query_embeddings: List[List[float]],
+    limits: List[int],
+    similarity_thresholds: List[float],
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> List[Tuple[List[Tuple[int, float]], int]]:
+    """Rank several queries at once; return ([(id, similarity)], total) per query."""
+    mode = mode or settings.SEARCH_MODE
+    
+    if mode == "python":
+        return await _rank_batch_python_scan(db, query_embeddings, limits, similarity_thresholds)
+    if mode != "pgvector":
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+    
+    if settings.VECTOR_INDEX_TYPE == "hnsw":
+        ef_search = min(max(ef_search or HNSW_DEFAULT_EF_SEARCH, max(limits)), HNSW_MAX_EF_SEARCH)
+    await apply_search_params(db, ef_search=ef_search, probes=probes)
+    
+    # 쿼리별 top-k를 UNION ALL로 묶어 한 번의 왕복으로 가져옴
+    distances = [Consultation.embedding.cosine_distance(embedding) for embedding in query_embeddings]
+    conditions = [distance <= 1.0 - threshold for distance, threshold in zip(distances, similarity_thresholds)]
+    members = []
+    for query_index, (distance, condition, limit) in enumerate(zip(distances, conditions, limits)):
+        ranked = (
+            select(
+                literal(query_index).label("query_index"),
+                Consultation.id.label("id"),
+                (1.0 - distance).label("similarity")
+            )
+            .where(Consultation.embedding.isnot(None), condition)
+            .order_by(distance)
+            .limit(limit)
+            .subquery()
+        )
+        members.append(select(ranked.c.query_index, ranked.c.id, ranked.c.similarity))
+    with stage("db", "rank_batch"):
+        result = await db.execute(union_all(*members))
+    
+    hits: List[List[Tuple[int, float]]] = [[] for _ in query_embeddings]
+    for query_index, consultation_id, similarity in result.all():
+        hits[query_index].append((consultation_id, float(similarity)))
+    for query_hits in hits:
+        query_hits.sort(key=lambda hit: hit[1], reverse=True)
+    totals = [len(query_hits) for query_hits in hits]
+    
+    # limit을 채운 쿼리만 전체 개수가 필요하며, FILTER 집계로 한 번의 스캔에서 함께 계산
+    full = [i for i, query_hits in enumerate(hits) if len(query_hits) >= limits[i]]
+    if full:
+        with stage("db", "rank_batch"):
+            counts = (await db.execute(
+                select(*[func.count().filter(conditions[i]) for i in full])
+                .select_from(Consultation)
+                .where(Consultation.embedding.isnot(None))
+            )).one()
+        for i, count in zip(full, counts):
+            totals[i] = count
+    return list(zip(hits, totals))
+
+async def _rank_batch_python_scan(
+    db: AsyncSession,
+    query_embeddings: List[List[float]],
+    limits: List[int],
+    similarity_thresholds: List[float]
+) -> List[Tuple[List[Tuple[int, float]], int]]:
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    top = BatchTopK(limits, similarity_thresholds)
+    
+    # 모든 쿼리를 코퍼스 한 번 읽기로 처리 (청크별 행렬-행렬 곱)
+    scanned = 0
+    async for ids, embeddings in stream_consultation_embeddings(db):
+        with stage("score", "python_scan_batch"):
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            top.add(np.asarray(ids, dtype=np.int64), vectors @ queries.T)
+        scanned += len(ids)
+    record_rows_scanned(scanned, "python")
+    return top.results()
+
+async def _apply_pgvector_search_params(
+    db: AsyncSession,
+    depth: int,
+    ef_search: Optional[int],
+    probes: Optional[int],
+    filter_conditions: list
+) -> Optional[int]:
+    # HNSW 인덱스는 ef_search개 후보만 반환하므로 요청 페이지 끝까지는 탐색하도록 보정
+    if settings.VECTOR_INDEX_TYPE == "hnsw" and (ef_search is not None or depth > HNSW_DEFAULT_EF_SEARCH):
+        ef_search = min(max(ef_search or HNSW_DEFAULT_EF_SEARCH, depth), HNSW_MAX_EF_SEARCH)
+    await apply_search_params(
+        db, ef_search=ef_search, probes=probes, iterative_scan=_iterative_scan(filter_conditions)
+    )
+    return ef_search
+
+def _pgvector_search_statement(
+    query_embedding: List[float],
+    limit: int,
+    skip: int,
+    similarity_threshold: float,
+    filter_conditions: list
+):
+    # 코사인 거리(<=>) = 1 - 코사인 유사도 (메타데이터 필터는 같은 WHERE 절에서 적용)
+    distance = Consultation.embedding.cosine_distance(query_embedding)
+    conditions = (
+        Consultation.embedding.isnot(None),
+        distance <= 1.0 - similarity_threshold,
+        *filter_conditions,
+    )
+    statement = (
+        select(Consultation, (1.0 - distance).label("similarity"))
+        .where(*conditions)
+        .order_by(distance)
+        .offset(skip)
+        .limit(limit)
+    )
+    return statement, conditions
+
+async def explain_search(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int = 10,
+    skip: int = 0,
+    similarity_threshold: float = 0.3,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    filters: Optional[SearchFilters] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """EXPLAIN the page query of a SQL search mode; return (plan, effective index parameters).
+    
+    On PostgreSQL the plan comes from EXPLAIN (ANALYZE, BUFFERS), so the query
+    runs again with the same SET LOCAL search parameters.
+    """
+    mode = mode or settings.SEARCH_MODE
+    filter_conditions = search_filter_conditions(filters)
+    if mode == "pgvector":
+        ef_search = await _apply_pgvector_search_params(db, skip + limit, ef_search, probes, filter_conditions)
+        statement, _ = _pgvector_search_statement(query_embedding, limit, skip, similarity_threshold, filter_conditions)
+        parameters = {"index_type": settings.VECTOR_INDEX_TYPE, "ef_search": ef_search, "probes": probes}
+    elif mode == "python":
+        statement = select(Consultation).where(*filter_conditions)
+        parameters = {}
+    else:
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+    
+    with stage("db", "explain"):
+        return await explain(db, statement), parameters
+
+async def _search_pgvector(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int,
+    skip: int,
+    similarity_threshold: float,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    filters: Optional[SearchFilters] = None
+):
+    filter_conditions = search_filter_conditions(filters)
+    await _apply_pgvector_search_params(db, skip + limit, ef_search, probes, filter_conditions)
+    statement, conditions = _pgvector_search_statement(
+        query_embedding, limit, skip, similarity_threshold, filter_conditions
+    )
+    
+    # 정렬, 임계값 필터링, 페이징을 DB에서 수행하고 해당 페이지 행만 가져옴
+    with stage("db", "search_pgvector"):
+        result = await db.execute(statement)
+        paginated_results = [(consultation, float(similarity)) for consultation, similarity in result.all()]
+        
+        # 마지막 페이지라면 전체 개수를 바로 알 수 있으므로 COUNT 쿼리를 생략
+        if paginated_results and len(paginated_results) < limit:
+            return paginated_results, skip + len(paginated_results)
+        if not paginated_results and skip == 0:
+            return paginated_results, 0
+        
+        total_count = await db.scalar(
+            select(func.count()).select_from(Consultation).where(*conditions)
+        )
+    return paginated_results, total_count
+
+async def _search_python_scan(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int,
+    skip: int,
+    similarity_threshold: float,
+    filters: Optional[SearchFilters] = None
+):
     query_embedding_array = np.array(query_embedding)
     
-    # 모든 상담 내용을 가져와서 유사도 계산
-    result = await db.execute(select(Consultation))
-    all_consultations = result.scalars().all()
+    # 필터를 통과한 상담 내용만 가져와서 유사도 계산
+    with stage("db", "search_python_scan"):
+        result = await db.execute(select(Consultation).where(*search_filter_conditions(filters)))
+        all_consultations = result.scalars().all()
+    record_rows_scanned(len(all_consultations), "python")
     
     # 유사도 계산 및 필터링
     consultations_with_similarity = []
-    
-    for consultation in all_consultations:
-        if consultation.embedding is not None and len(consultation.embedding) > 0:
-            # 임베딩을 numpy array로 변환
-            consultation_embedding = np.array(consultation.embedding)
-            
-            # 코사인 유사도 계산
-            similarity = np.dot(query_embedding_array, consultation_embedding) / (
-                np.linalg.norm(query_embedding_array) * np.linalg.norm(consultation_embedding)
-            )
-            
-            # 유사도 임계값 필터링 - 연관성 있는 정보만 포함
-            if similarity >= similarity_threshold:
-                consultations_with_similarity.append((consultation, float(similarity)))
+    with stage("score", "python_scan"):
+        for consultation in all_consultations:
+            if consultation.embedding is not None and len(consultation.embedding) > 0:
+                # 임베딩을 numpy array로 변환
+                consultation_embedding = np.array(consultation.embedding)
+                
+                # 코사인 유사도 계산
+                similarity = np.dot(query_embedding_array, consultation_embedding) / (
+                    np.linalg.norm(query_embedding_array) * np.linalg.norm(consultation_embedding)
+                )
+                
+                # 유사도 임계값 필터링 - 연관성 있는 정보만 포함
+                if similarity >= similarity_threshold:
+                    consultations_with_similarity.append((consultation, float(similarity)))
     
     # 유사도로 정렬 (높은 순)
     consultations_with_similarity.sort(key=lambda x: x[1], reverse=True)
@@ -99,3 +763,246 @@ async def search_consultations(db: AsyncSession, query: str, limit: int = 10, sk
     
     # 결과와 전체 개수를 함께 반환
     return paginated_results, total_count
+
+def _passage_filter_conditions(filters: Optional[SearchFilters]) -> list:
+    # 구간은 필터를 통과한 상담의 것만 채점
+    conditions = search_filter_conditions(filters)
+    if not conditions:
+        return []
+    return [ConsultationPassage.consultation_id.in_(select(Consultation.id).where(*conditions))]
+
+async def search_passages(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int = 10,
+    skip: int = 0,
+    similarity_threshold: float = 0.3,
+    aggregation: str = "max",
+    top_n: int = 3,
+    mode: Optional[str] = None,
+    filters: Optional[SearchFilters] = None
+) -> Tuple[List[Tuple[Consultation, float, Tuple[int, int]]], int]:
+    """Rank consultations by their passages; return ([(consultation, score, best span)], total).
+    
+    The score is the best passage similarity ("max") or the mean of the `top_n`
+    best passages ("mean_top_n"); the span locates the best passage in the text.
+    """
+    if mode == "python":
+        return await _search_passages_python_scan(
+            db, query_embedding, limit, skip, similarity_threshold, aggregation, top_n, filters=filters
+        )
+    
+    # 구간 채점, 상담별 집계, 임계값/정렬/페이징, 전체 개수를 한 번의 쿼리로 수행
+    distance = ConsultationPassage.embedding.cosine_distance(query_embedding)
+    scored = (
+        select(
+            ConsultationPassage.consultation_id,
+            ConsultationPassage.start_offset,
+            ConsultationPassage.end_offset,
+            (1.0 - distance).label("similarity"),
+            func.row_number().over(
+                partition_by=ConsultationPassage.consultation_id, order_by=distance
+            ).label("passage_rank")
+        )
+        .where(ConsultationPassage.embedding.isnot(None), *_passage_filter_conditions(filters))
+        .subquery()
+    )
+    best = scored.c.passage_rank == 1
+    if aggregation == "max":
+        score = func.max(scored.c.similarity)
+    elif aggregation == "mean_top_n":
+        score = func.avg(scored.c.similarity).filter(scored.c.passage_rank <= top_n)
+    else:
+        raise ValueError(f"지원하지 않는 구간 점수 집계 방식입니다: {aggregation}")
+    aggregated = (
+        select(
+            scored.c.consultation_id,
+            score.label("score"),
+            func.min(scored.c.start_offset).filter(best).label("start_offset"),
+            func.min(scored.c.end_offset).filter(best).label("end_offset")
+        )
+        .group_by(scored.c.consultation_id)
+        .subquery()
+    )
+    with stage("db", "search_passages"):
+        result = await db.execute(
+            select(
+                Consultation,
+                aggregated.c.score,
+                aggregated.c.start_offset,
+                aggregated.c.end_offset,
+                func.count().over().label("total")
+            )
+            .options(defer(Consultation.embedding))
+            .join(aggregated, aggregated.c.consultation_id == Consultation.id)
+            .where(aggregated.c.score >= similarity_threshold)
+            .order_by(aggregated.c.score.desc(), Consultation.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = result.all()
+    if rows:
+        return [(row.Consultation, float(row.score), (row.start_offset, row.end_offset)) for row in rows], rows[0].total
+    if skip == 0:
+        return [], 0
+    # 결과 범위를 넘는 페이지는 전체 개수만 따로 계산
+    total_count = await db.scalar(
+        select(func.count()).select_from(aggregated).where(aggregated.c.score >= similarity_threshold)
+    )
+    return [], total_count
+
+async def _search_passages_python_scan(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int,
+    skip: int,
+    similarity_threshold: float,
+    aggregation: str,
+    top_n: int,
+    chunk_size: int = 10000,
+    filters: Optional[SearchFilters] = None
+):
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    ids, spans, scores = [], [], []
+    result = await db.stream(
+        select(
+            ConsultationPassage.consultation_id,
+            ConsultationPassage.start_offset,
+            ConsultationPassage.end_offset,
+            ConsultationPassage.embedding
+        )
+        .where(ConsultationPassage.embedding.isnot(None), *_passage_filter_conditions(filters))
+        .execution_options(yield_per=chunk_size)
+    )
+    async for rows in result.partitions():
+        with stage("score", "passages_python_scan"):
+            vectors = np.asarray([row.embedding for row in rows], dtype=np.float32)
+            vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            scores.append(vectors @ query)
+        ids.extend(row.consultation_id for row in rows)
+        spans.extend((row.start_offset, row.end_offset) for row in rows)
+    record_rows_scanned(len(ids), "passages_python")
+    if not ids:
+        return [], 0
+    
+    hits = rank_aggregated(
+        aggregate_passage_scores(np.asarray(ids, dtype=np.int64), np.concatenate(scores), aggregation, top_n),
+        similarity_threshold
+    )
+    page = hits[skip:skip + limit]
+    by_id = {consultation.id: consultation for consultation in await get_consultations_by_ids(db, [hit[0] for hit in page])}
+    return [
+        (by_id[consultation_id], score, spans[best])
+        for consultation_id, score, best in page
+        if consultation_id in by_id
+    ], len(hits)
+
+async def hybrid_search(
+    db: AsyncSession,
+    query: str,
+    query_embedding: List[float],
+    limit: int = 10,
+    skip: int = 0,
+    similarity_threshold: float = 0.3,
+    prefilter: bool = False,
+    filters: Optional[SearchFilters] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> Tuple[List[Tuple[Consultation, float, float]], int]:
+    """Fuse full-text and vector rankings; return ([(consultation, similarity, fused score)], total).
+    
+    The lexical top-k (ts_rank_cd over the text_search tsvector) and the vector
+    top-k come back in one statement and are combined with reciprocal rank
+    fusion. With `prefilter`, only lexical hits are scored by vector distance.
+    The similarity threshold applies to the vector list only. The total is the
+    number of fused candidates, bounded by the per-list candidate limit, so it
+    is an estimate rather than a count of all matching rows.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        raise ValueError("하이브리드 검색은 PostgreSQL에서만 지원됩니다")
+    tsquery = build_tsquery(query)
+    if tsquery is None and prefilter:
+        return [], 0
+    
+    candidates = max(settings.HYBRID_CANDIDATES, skip + limit)
+    filter_conditions = search_filter_conditions(filters)
+    if settings.VECTOR_INDEX_TYPE == "hnsw":
+        ef_search = min(max(ef_search or HNSW_DEFAULT_EF_SEARCH, candidates), HNSW_MAX_EF_SEARCH)
+    await apply_search_params(
+        db, ef_search=ef_search, probes=probes, iterative_scan=_iterative_scan(filter_conditions)
+    )
+    
+    lexical = None
+    if tsquery is not None:
+        ts_query = func.to_tsquery(literal_column("'simple'"), tsquery)
+        lexical_rank = func.ts_rank_cd(TEXT_SEARCH_COLUMN, ts_query)
+        lexical = (
+            select(
+                Consultation.id.label("id"),
+                func.row_number().over(order_by=(lexical_rank.desc(), Consultation.id)).label("rank")
+            )
+            .where(TEXT_SEARCH_COLUMN.op("@@")(ts_query), *filter_conditions)
+            .order_by(lexical_rank.desc(), Consultation.id)
+            .limit(settings.HYBRID_PREFILTER_CANDIDATES if prefilter else candidates)
+            .cte("lexical")
+        )
+    
+    # 정렬+LIMIT 하위 쿼리를 그대로 두어 ANN 인덱스를 타게 하고, 순위는 바깥에서 매김
+    distance = Consultation.embedding.cosine_distance(query_embedding)
+    vector_conditions = [
+        Consultation.embedding.isnot(None),
+        distance <= 1.0 - similarity_threshold,
+        *filter_conditions,
+    ]
+    if prefilter:
+        vector_conditions.append(Consultation.id.in_(select(lexical.c.id)))
+    nearest = (
+        select(Consultation.id.label("id"), distance.label("distance"))
+        .where(*vector_conditions)
+        .order_by(distance)
+        .limit(candidates)
+        .subquery("nearest")
+    )
+    vector = select(
+        nearest.c.id,
+        func.row_number().over(order_by=(nearest.c.distance, nearest.c.id)).label("rank")
+    ).cte("vector")
+    
+    if lexical is None:
+        fused = select(vector.c.id.label("id"), literal(None).label("lexical_rank"), vector.c.rank.label("vector_rank"))
+    else:
+        fused = select(
+            func.coalesce(lexical.c.id, vector.c.id).label("id"),
+            lexical.c.rank.label("lexical_rank"),
+            vector.c.rank.label("vector_rank")
+        ).select_from(lexical.outerjoin(vector, lexical.c.id == vector.c.id, full=True))
+    fused = fused.subquery("fused")
+    # 어휘로만 찾은 행도 응답에 유사도를 주기 위해 융합된 id 전체의 코사인 유사도를 함께 계산
+    with stage("db", "hybrid"):
+        result = await db.execute(
+            select(
+                fused.c.id,
+                fused.c.lexical_rank,
+                fused.c.vector_rank,
+                (1.0 - Consultation.embedding.cosine_distance(query_embedding)).label("similarity")
+            )
+            .join(Consultation, Consultation.id == fused.c.id)
+        )
+        rows = result.all()
+    if not rows:
+        return [], 0
+    
+    similarities = {row.id: float(row.similarity) if row.similarity is not None else 0.0 for row in rows}
+    rankings = [
+        [row.id for row in sorted((row for row in rows if getattr(row, rank) is not None), key=lambda row: getattr(row, rank))]
+        for rank in ("lexical_rank", "vector_rank")
+    ]
+    fused_hits = reciprocal_rank_fusion(rankings, k=settings.HYBRID_RRF_K)
+    page = fused_hits[skip:skip + limit]
+    by_id = {consultation.id: consultation for consultation in await get_consultations_by_ids(db, [hit[0] for hit in page])}
+    return [
+        (by_id[consultation_id], similarities[consultation_id], score)
+        for consultation_id, score in page
+        if consultation_id in by_id
+    ], len(fused_hits)
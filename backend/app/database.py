@@ -1,31 +1,13 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-import asyncpg
+"""Backward-compatible aliases; the engine and sessions live in app.db.session."""
+from app.db.base import Base
+from app.db.init_db import create_tables
+from app.db.session import AsyncSessionLocal, get_db, get_engine
 
-from app.core.config import settings
+__all__ = ["AsyncSessionLocal", "Base", "async_engine", "create_tables", "get_db"]
 
-# 비동기 엔진 생성
-async_engine = create_async_engine(settings.async_database_url, echo=True)
 
-# 동기 엔진 (마이그레이션용)
-sync_engine = create_engine(settings.DATABASE_URL)
-
-# 세션 생성
-AsyncSessionLocal = sessionmaker(
-    async_engine, class_=AsyncSession, expire_on_commit=False
-)
-
-Base = declarative_base()
-
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
-
-async def create_tables():
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+def __getattr__(name):
+    # async_engine은 첫 접근 시 생성되는 공유 엔진
+    if name == "async_engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
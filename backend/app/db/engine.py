@@ -0,0 +1,67 @@
+"""Settings-driven async engine factory and connection pool statistics."""
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+
+def engine_options(url: Optional[str] = None, statement_timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """Keyword arguments for create_async_engine from Settings.
+
+    Pool sizing and the asyncpg options (statement caches, server-side
+    statement_timeout, application_name) only apply to PostgreSQL; other
+    dialects keep SQLAlchemy's default pool.
+    """
+    url = url or settings.async_database_url
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    if make_url(url).get_backend_name() != "postgresql":
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if statement_timeout_ms is None:
+        statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+    if statement_timeout_ms > 0:
+        server_settings["statement_timeout"] = str(int(statement_timeout_ms))
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        }
+    return options
+
+
+def create_engine(url: Optional[str] = None, statement_timeout_ms: Optional[int] = None, **overrides) -> AsyncEngine:
+    """Create an AsyncEngine configured from Settings.
+
+    `statement_timeout_ms=0` disables the server-side timeout (batch scripts);
+    `overrides` are passed to create_async_engine as-is.
+    """
+    url = url or settings.async_database_url
+    return create_async_engine(url, **dict(engine_options(url, statement_timeout_ms), **overrides))
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Connection pool counters of `engine`."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, "dialect": engine.dialect.name}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    return stats
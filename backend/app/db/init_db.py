@@ -1,9 +1,89 @@
 """Database initialization."""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from app.db.base import Base
-from app.db.session import async_engine
+from app.db.session import get_engine
+from app.db.vector_index import ensure_vector_index
+
+logger = logging.getLogger(__name__)
+TEXT_SEARCH_INDEX_NAME = "ix_consultations_text_search"
 
 
 async def create_tables():
     """Create all database tables."""
-    async with async_engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+# create_all은 기존 테이블에 컬럼을 추가하지 않으므로 PostgreSQL에서 누락분을 보완
+SCHEMA_UPGRADES = (
+    "ALTER TABLE consultations ADD COLUMN IF NOT EXISTS embedding_status VARCHAR(16) NOT NULL DEFAULT 'ready'",
+    "CREATE INDEX IF NOT EXISTS ix_consultations_embedding_pending ON consultations (id) WHERE embedding_status <> 'ready'",
+    "ALTER TABLE consultations ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_consultations_content_hash ON consultations (content_hash)",
+    # 목록 keyset 페이지네이션용 (create_all은 기존 테이블에 인덱스를 추가하지 않음)
+    "CREATE INDEX IF NOT EXISTS ix_consultations_created_at_id ON consultations (created_at, id)",
+    "ALTER TABLE consultations ADD COLUMN IF NOT EXISTS category VARCHAR(64)",
+    "ALTER TABLE consultations ADD COLUMN IF NOT EXISTS owner VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_consultations_category ON consultations (category)",
+    "CREATE INDEX IF NOT EXISTS ix_consultations_owner ON consultations (owner)",
+)
+
+# 하이브리드 검색용 tsvector (PostgreSQL 전용이므로 모델에는 선언하지 않음)
+# STORED 생성 컬럼 추가는 ACCESS EXCLUSIVE 잠금으로 테이블 전체를 다시 쓰므로
+# 행이 있는 테이블에는 scripts/manage_vector_index.py text-search로 오프라인에서 적용
+TEXT_SEARCH_UPGRADES = (
+    "ALTER TABLE consultations ADD COLUMN IF NOT EXISTS text_search tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, ''))) STORED",
+    f"CREATE INDEX IF NOT EXISTS {TEXT_SEARCH_INDEX_NAME} ON consultations USING gin (text_search)",
+)
+
+
+async def text_search_ready(conn: AsyncConnection) -> bool:
+    """True when the text_search column and its GIN index both exist."""
+    result = await conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = 'consultations' AND column_name = 'text_search') "
+        "AND EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :name)"
+    ), {"name": TEXT_SEARCH_INDEX_NAME})
+    return bool(result.scalar_one())
+
+
+async def apply_text_search_upgrades(conn: AsyncConnection) -> None:
+    """Add the generated tsvector column and its GIN index (rewrites the table)."""
+    await conn.execute(text("SET LOCAL statement_timeout = 0"))
+    for statement in TEXT_SEARCH_UPGRADES:
+        await conn.execute(text(statement))
+
+
+async def upgrade_schema():
+    """Add columns and indexes introduced after the table was first created.
+
+    The text_search column is only added at startup while the table is empty;
+    existing tables get it from scripts/manage_vector_index.py text-search.
+    """
+    async with get_engine().begin() as conn:
+        if conn.dialect.name != "postgresql":
+            return
+        # 기존 테이블의 인덱스 생성은 서버 측 statement_timeout(DB_STATEMENT_TIMEOUT_MS)을 넘을 수 있으므로 해제
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
+
+        if await text_search_ready(conn):
+            return
+        if await conn.scalar(text("SELECT EXISTS (SELECT 1 FROM consultations)")):
+            logger.warning(
+                "하이브리드 검색용 text_search 컬럼/인덱스가 없습니다. 테이블 전체를 다시 쓰므로 "
+                "시작 시에는 만들지 않습니다: python scripts/manage_vector_index.py text-search"
+            )
+            return
+        await apply_text_search_upgrades(conn)
+
+
+async def create_indexes():
+    """Create the ANN vector index if it does not exist yet."""
+    async with get_engine().begin() as conn:
+        await ensure_vector_index(conn)
@@ -1,26 +1,51 @@
 """Database session management."""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-import asyncpg
+from typing import Optional
 
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
-# 비동기 엔진 생성
-async_engine = create_async_engine(settings.async_database_url, echo=True)
+from app.core.metrics import DB_POOL_IN_USE
+from app.db.engine import create_engine, pool_stats
 
-# 동기 엔진 (마이그레이션용)
-sync_engine = create_engine(settings.DATABASE_URL)
+# 애플리케이션 전체에서 공유하는 비동기 엔진 (연결 풀은 프로세스당 하나)
+# import 시점이 아니라 lifespan 시작(또는 첫 사용) 때 생성
+_engine: Optional[AsyncEngine] = None
+
+# 세션 생성 (엔진이 만들어질 때 바인딩)
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def get_engine() -> AsyncEngine:
+    """The shared engine, created from Settings on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine()
+        AsyncSessionLocal.configure(bind=_engine)
+    return _engine
+
+
+async def dispose_engine() -> None:
+    """Close the pool's connections and drop the shared engine."""
+    global _engine
+    if _engine is not None:
+        engine, _engine = _engine, None
+        await engine.dispose()
 
-# 세션 생성
-AsyncSessionLocal = sessionmaker(
-    async_engine, class_=AsyncSession, expire_on_commit=False
-)
 
 async def get_db():
     """Database dependency for FastAPI."""
+    get_engine()
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+def get_pool_stats() -> dict:
+    """Connection pool counters of the shared engine."""
+    if _engine is None:
+        return {"pool": None, "initialized": False}
+    return dict(pool_stats(_engine), initialized=True)
+
+
+DB_POOL_IN_USE.set_function(lambda: get_pool_stats().get("checked_out", 0))
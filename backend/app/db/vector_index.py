@@ -0,0 +1,214 @@
+"""pgvector ANN index lifecycle management."""
+import math
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+
+VECTOR_INDEX_NAME = "ix_consultations_embedding_ann"
+VECTOR_INDEX_METHODS = ("hnsw", "ivfflat")
+
+# pgvector의 hnsw.ef_search 기본값과 허용 최대값
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+# 필터 검색 시 HNSW 반복 탐색 모드 (pgvector 0.8+)
+HNSW_ITERATIVE_SCAN_MODES = ("off", "strict_order", "relaxed_order")
+
+
+@dataclass(frozen=True)
+class VectorIndexParams:
+    """Build parameters for an ANN index on consultations.embedding."""
+
+    method: str
+    lists: Optional[int] = None
+    m: Optional[int] = None
+    ef_construction: Optional[int] = None
+
+    def with_clause(self) -> str:
+        """Render the WITH (...) storage parameters."""
+        if self.method == "ivfflat":
+            return f"lists = {self.lists}"
+        return f"m = {self.m}, ef_construction = {self.ef_construction}"
+
+
+def compute_index_params(row_count: int, method: Optional[str] = None) -> VectorIndexParams:
+    """Derive index build parameters from the corpus size."""
+    method = method or settings.VECTOR_INDEX_TYPE
+    if method not in VECTOR_INDEX_METHODS:
+        raise ValueError(f"지원하지 않는 벡터 인덱스 유형입니다: {method}")
+
+    if method == "ivfflat":
+        # pgvector 권장값: 100만 행까지는 rows / 1000, 그 이상은 sqrt(rows)
+        if row_count <= 1_000_000:
+            lists = row_count // 1000
+        else:
+            lists = int(math.sqrt(row_count))
+        return VectorIndexParams(method=method, lists=max(lists, 1))
+
+    # HNSW: 코퍼스가 커질수록 그래프 연결 수와 빌드 탐색 폭을 늘려 recall 유지
+    if row_count < 100_000:
+        m, ef_construction = 16, 64
+    elif row_count < 1_000_000:
+        m, ef_construction = 16, 128
+    else:
+        m, ef_construction = 24, 200
+    return VectorIndexParams(method=method, m=m, ef_construction=ef_construction)
+
+
+def build_index_ddl(params: VectorIndexParams) -> str:
+    """Build the CREATE INDEX statement for the given parameters."""
+    return (
+        f"CREATE INDEX IF NOT EXISTS {VECTOR_INDEX_NAME} ON consultations "
+        f"USING {params.method} (embedding vector_cosine_ops) "
+        f"WITH ({params.with_clause()})"
+    )
+
+
+def parse_index_definition(indexdef: str) -> Optional[VectorIndexParams]:
+    """Parse an indexdef from pg_indexes back into parameters."""
+    method_match = re.search(r"USING (hnsw|ivfflat)", indexdef)
+    if method_match is None:
+        return None
+    options = dict(re.findall(r"(\w+)='?(\d+)'?", indexdef.split("WITH", 1)[-1]))
+    method = method_match.group(1)
+    if method == "ivfflat":
+        return VectorIndexParams(method=method, lists=int(options.get("lists", 100)))
+    return VectorIndexParams(
+        method=method,
+        m=int(options.get("m", 16)),
+        ef_construction=int(options.get("ef_construction", 64)),
+    )
+
+
+async def count_embedded_rows(conn: AsyncConnection) -> int:
+    """Count rows that carry an embedding."""
+    result = await conn.execute(
+        text("SELECT count(*) FROM consultations WHERE embedding IS NOT NULL")
+    )
+    return result.scalar_one()
+
+
+async def get_index_params(conn: AsyncConnection) -> Optional[VectorIndexParams]:
+    """Return the parameters of the current ANN index, if one exists."""
+    result = await conn.execute(
+        text("SELECT indexdef FROM pg_indexes WHERE indexname = :name"),
+        {"name": VECTOR_INDEX_NAME},
+    )
+    indexdef = result.scalar_one_or_none()
+    return parse_index_definition(indexdef) if indexdef else None
+
+
+async def create_vector_index(
+    conn: AsyncConnection,
+    method: Optional[str] = None,
+    row_count: Optional[int] = None,
+) -> VectorIndexParams:
+    """Create the ANN index sized for the current corpus."""
+    if row_count is None:
+        row_count = await count_embedded_rows(conn)
+    params = compute_index_params(row_count, method)
+
+    # 대용량 인덱스 빌드는 서버 측 statement_timeout(DB_STATEMENT_TIMEOUT_MS)을 넘을 수 있으므로 해제
+    await conn.execute(text("SET LOCAL statement_timeout = 0"))
+    if settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM:
+        await conn.execute(
+            text(f"SET LOCAL maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'")
+        )
+    await conn.execute(text(build_index_ddl(params)))
+    return params
+
+
+async def rebuild_vector_index(
+    conn: AsyncConnection,
+    method: Optional[str] = None,
+) -> VectorIndexParams:
+    """Drop and recreate the ANN index with parameters for the current size."""
+    await conn.execute(text(f"DROP INDEX IF EXISTS {VECTOR_INDEX_NAME}"))
+    return await create_vector_index(conn, method)
+
+
+async def ensure_vector_index(conn: AsyncConnection) -> Optional[VectorIndexParams]:
+    """Create the configured ANN index at startup if it is missing."""
+    if conn.dialect.name != "postgresql" or settings.VECTOR_INDEX_TYPE == "none":
+        return None
+
+    current = await get_index_params(conn)
+    if current is not None:
+        return current
+
+    row_count = await count_embedded_rows(conn)
+    # IVFFlat은 데이터로 클러스터를 학습하므로 빈 테이블에는 만들지 않음
+    if settings.VECTOR_INDEX_TYPE == "ivfflat" and row_count < settings.VECTOR_INDEX_MIN_ROWS:
+        return None
+    return await create_vector_index(conn, row_count=row_count)
+
+
+async def bulk_load_index_action(
+    conn: AsyncConnection,
+    inserted_rows: int,
+) -> Optional[str]:
+    """Return "create" or "rebuild" when a bulk load has outgrown the ANN index, else None.
+
+    Read-only: request handlers use it to report the maintenance that
+    `rebuild_after_bulk_load` or scripts/manage_vector_index.py would run.
+    """
+    if conn.dialect.name != "postgresql" or settings.VECTOR_INDEX_TYPE == "none":
+        return None
+
+    row_count = await count_embedded_rows(conn)
+    current = await get_index_params(conn)
+    recommended = compute_index_params(row_count)
+
+    if current is None:
+        if recommended.method == "ivfflat" and row_count < settings.VECTOR_INDEX_MIN_ROWS:
+            return None
+        return "create"
+
+    # 파라미터가 달라졌거나, IVFFlat 클러스터가 학습된 이후 데이터가 크게 늘어난 경우 재빌드
+    previous_rows = max(row_count - inserted_rows, 1)
+    grew_substantially = inserted_rows / previous_rows >= settings.VECTOR_INDEX_REBUILD_RATIO
+    if current != recommended or (current.method == "ivfflat" and grew_substantially):
+        return "rebuild"
+    return None
+
+
+async def rebuild_after_bulk_load(
+    conn: AsyncConnection,
+    inserted_rows: int,
+) -> Optional[VectorIndexParams]:
+    """Create or rebuild the ANN index when a bulk load has outgrown its parameters.
+
+    Runs blocking DDL without a statement timeout, so it is meant for batch
+    scripts, not request handlers.
+    """
+    if conn.dialect.name != "postgresql" or settings.VECTOR_INDEX_TYPE == "none":
+        return None
+    action = await bulk_load_index_action(conn, inserted_rows)
+    if action == "create":
+        return await create_vector_index(conn)
+    if action == "rebuild":
+        return await rebuild_vector_index(conn)
+    return await get_index_params(conn)
+
+
+async def apply_search_params(
+    db: AsyncSession,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    iterative_scan: Optional[str] = None,
+) -> None:
+    """Apply per-transaction ANN search knobs (SET LOCAL)."""
+    # SET 문은 바인드 파라미터를 지원하지 않으므로 정수로 검증 후 직접 삽입
+    if ef_search is not None:
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+    if probes is not None:
+        await db.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+    if iterative_scan is not None:
+        # 필터로 ef_search개 후보가 대부분 걸러져도 limit을 채울 때까지 그래프 탐색을 계속함
+        if iterative_scan not in HNSW_ITERATIVE_SCAN_MODES:
+            raise ValueError(f"지원하지 않는 반복 탐색 모드입니다: {iterative_scan}")
+        await db.execute(text(f"SET LOCAL hnsw.iterative_scan = {iterative_scan}"))
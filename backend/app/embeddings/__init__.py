@@ -1,3 +1,14 @@
+from .backends import EMBEDDING_BACKENDS, EmbedderBackend, SentenceTransformerBackend, create_backend, parity_report
+from .batcher import MicroBatcher
 from .bge_embedder import BGEEmbedder, embedder
 
-__all__ = ["BGEEmbedder", "embedder"]
+__all__ = [
+    "BGEEmbedder",
+    "EMBEDDING_BACKENDS",
+    "EmbedderBackend",
+    "MicroBatcher",
+    "SentenceTransformerBackend",
+    "create_backend",
+    "embedder",
+    "parity_report",
+]
@@ -0,0 +1,185 @@
+"""Embedding inference backends and a parity check between them."""
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# 지원하는 추론 백엔드 이름
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx")
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbedderBackend(ABC):
+    """Turn texts into L2-normalized float32 vectors of shape (len(texts), dimension)."""
+
+    name = ""
+
+    def __init__(self, model_name: str, cache_dir: Optional[str] = None, max_seq_length: Optional[int] = None):
+        self.model_name = model_name
+        self.cache_dir = cache_dir or os.getenv("HF_HOME", "./model_cache")
+        self.max_seq_length = max_seq_length
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load the model; called once before the first `encode`."""
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        ...
+
+    @property
+    def tokenizer(self):
+        """Tokenizer used to measure text lengths, or None if the backend has none."""
+        return None
+
+    def token_lengths(self, texts: Sequence[str]) -> List[int]:
+        """Token count of each text including special tokens, capped at `max_seq_length`."""
+        tokenizer = self.tokenizer
+        if tokenizer is None:
+            # 토크나이저가 없으면 문자 수로 근사
+            lengths = [len(text) + 2 for text in texts]
+        else:
+            encoded = tokenizer(
+                list(texts),
+                add_special_tokens=True,
+                truncation=self.max_seq_length is not None,
+                max_length=self.max_seq_length,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )
+            lengths = [len(ids) for ids in encoded["input_ids"]]
+        if self.max_seq_length is not None:
+            lengths = [min(length, self.max_seq_length) for length in lengths]
+        return lengths
+
+    def info(self) -> dict:
+        return {"backend": self.name, "model_name": self.model_name, "max_seq_length": self.max_seq_length}
+
+
+class SentenceTransformerBackend(EmbedderBackend):
+    """PyTorch inference through sentence-transformers."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str, cache_dir: Optional[str] = None, max_seq_length: Optional[int] = None):
+        super().__init__(model_name, cache_dir, max_seq_length)
+        self.model = None
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer if self.model is not None else None
+
+    def load(self) -> None:
+        if self.model is not None:
+            return
+        from sentence_transformers import SentenceTransformer
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.model = SentenceTransformer(
+            self.model_name,
+            trust_remote_code=True,
+            cache_folder=self.cache_dir
+        )
+        if self.max_seq_length:
+            self.model.max_seq_length = self.max_seq_length
+        else:
+            self.max_seq_length = self.model.get_max_seq_length()
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        self.load()
+        return self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,  # 코사인 유사도를 위한 정규화
+            show_progress_bar=show_progress_bar
+        ).astype(np.float32, copy=False)
+
+
+def create_backend(
+    backend: str,
+    model_name: str,
+    cache_dir: Optional[str] = None,
+    onnx_dir: Optional[str] = None,
+    quantize: bool = False,
+    threads: int = 0,
+    max_seq_length: Optional[int] = None,
+) -> EmbedderBackend:
+    """Instantiate the backend named `backend` (see EMBEDDING_BACKENDS)."""
+    if backend == "sentence-transformers":
+        return SentenceTransformerBackend(model_name, cache_dir, max_seq_length)
+    if backend == "onnx":
+        from .onnx_backend import OnnxBackend
+
+        return OnnxBackend(
+            model_name,
+            cache_dir,
+            max_seq_length=max_seq_length,
+            export_dir=onnx_dir or "./model_cache/onnx",
+            quantize=quantize,
+            intra_op_threads=threads
+        )
+    raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend} (허용: {', '.join(EMBEDDING_BACKENDS)})")
+
+
+def _timed_encode(backend: EmbedderBackend, texts: List[str], batch_size: int):
+    backend.encode(texts[:1], batch_size=1)  # 로딩/워밍업은 측정에서 제외
+    started = time.perf_counter()
+    vectors = np.asarray(backend.encode(texts, batch_size=batch_size), dtype=np.float32)
+    return vectors, time.perf_counter() - started
+
+
+def parity_report(
+    reference: EmbedderBackend,
+    candidate: EmbedderBackend,
+    texts: Sequence[str],
+    batch_size: int = 32,
+    top_k: int = 10,
+) -> dict:
+    """Compare `candidate` against `reference` on the same texts.
+
+    Reports per-text cosine agreement, how much of each text's top-k
+    neighbourhood (within `texts`) is preserved, and encode throughput.
+    """
+    texts = list(texts)
+    expected, reference_seconds = _timed_encode(reference, texts, batch_size)
+    actual, candidate_seconds = _timed_encode(candidate, texts, batch_size)
+    if expected.shape != actual.shape:
+        raise ValueError(f"임베딩 형태가 다릅니다: {expected.shape} != {actual.shape}")
+
+    cosines = np.sum(l2_normalize(expected) * l2_normalize(actual), axis=1)
+    k = min(top_k, len(texts) - 1)
+    overlap = None
+    if k > 0:
+        # 자기 자신을 제외한 이웃 순위가 얼마나 유지되는지
+        def neighbours(vectors):
+            scores = vectors @ vectors.T
+            np.fill_diagonal(scores, -np.inf)
+            return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+        expected_top, actual_top = neighbours(expected), neighbours(actual)
+        overlap = float(np.mean([
+            len(set(e.tolist()) & set(a.tolist())) / k for e, a in zip(expected_top, actual_top)
+        ]))
+
+    return {
+        "texts": len(texts),
+        "reference": reference.info(),
+        "candidate": candidate.info(),
+        "cosine": {
+            "min": round(float(cosines.min()), 6),
+            "mean": round(float(cosines.mean()), 6),
+            "p01": round(float(np.percentile(cosines, 1)), 6),
+        },
+        f"top{k}_overlap": round(overlap, 4) if overlap is not None else None,
+        "texts_per_second": {
+            "reference": round(len(texts) / reference_seconds, 2) if reference_seconds else None,
+            "candidate": round(len(texts) / candidate_seconds, 2) if candidate_seconds else None,
+        },
+    }
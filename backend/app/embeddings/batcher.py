@@ -0,0 +1,159 @@
+"""Dynamic micro-batching for concurrent single-text embedding requests."""
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 배치 크기 분포 집계 구간 (상한 포함)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+# 대기 시간 백분위 계산에 사용하는 최근 샘플 수
+QUEUE_DELAY_SAMPLES = 2048
+
+
+class MicroBatcher:
+    """Collect concurrent texts for up to `max_wait_ms` or `max_batch_size` texts
+    and encode them with one call, resolving each caller's future with its vector.
+
+    `encode` receives a list of texts and returns an array of shape
+    (len(texts), dimension). The collector task is bound to the event loop
+    that first submits a text.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], Awaitable[np.ndarray]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self._encode = encode
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+        # 지표
+        self.batches = 0
+        self.texts = 0
+        self.failures = 0
+        self._size_histogram: Dict[str, int] = {
+            self._bucket(size): 0 for size in BATCH_SIZE_BUCKETS + (BATCH_SIZE_BUCKETS[-1] + 1,)
+        }
+        self._queue_delays = deque(maxlen=QUEUE_DELAY_SAMPLES)
+        self._queue_delay_total = 0.0
+        self._queue_delay_max = 0.0
+
+    @staticmethod
+    def _bucket(size: int) -> str:
+        for bound in BATCH_SIZE_BUCKETS:
+            if size <= bound:
+                return f"<={bound}"
+        return f">{BATCH_SIZE_BUCKETS[-1]}"
+
+    def _ensure_collector(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+        return self._queue
+
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue one text and wait for its vector."""
+        queue = self._ensure_collector()
+        future = self._loop.create_future()
+        queue.put_nowait((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch: List[Tuple[str, asyncio.Future, float]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait_ms / 1000.0
+                while len(batch) < self.max_batch_size:
+                    # 이미 도착한 요청은 기다리지 않고 바로 합침
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                # 인코딩은 별도 태스크로 실행하고 다음 배치 수집을 계속함 (동시성은 실행기에서 제한)
+                task = loop.create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+                batch = []
+        finally:
+            # 수집 중이던 배치와 큐에 남은 요청은 인코딩하지 않으므로 호출자에게 오류로 알림
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            self._fail_pending(batch, RuntimeError("임베딩 배치 수집이 중단되었습니다"))
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+        error: BaseException = RuntimeError("임베딩 배치 처리가 취소되었습니다")
+        try:
+            vectors = np.asarray(await self._encode([text for text, _, _ in batch]), dtype=np.float32)
+            vectors = vectors.reshape(len(batch), -1)
+            for (_, future, _), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as exc:
+            self.failures += 1
+            error = exc
+        finally:
+            # 실패하거나 취소(CancelledError)된 배치의 호출자가 무한히 대기하지 않도록 정리
+            self._fail_pending(batch, error)
+
+    @staticmethod
+    def _fail_pending(batch: List[Tuple[str, asyncio.Future, float]], exc: BaseException) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    def _record(self, size: int, delays: List[float]) -> None:
+        self.batches += 1
+        self.texts += size
+        self._size_histogram[self._bucket(size)] += 1
+        self._queue_delays.extend(delays)
+        self._queue_delay_total += sum(delays)
+        self._queue_delay_max = max(self._queue_delay_max, max(delays))
+
+    def stats(self) -> dict:
+        """Batch-size distribution and queueing delay (milliseconds)."""
+        delays = np.fromiter(self._queue_delays, dtype=np.float64) * 1000.0
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "texts": self.texts,
+            "failures": self.failures,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else None,
+            "batch_size_histogram": dict(self._size_histogram),
+            "queue_delay_ms": {
+                "mean": round(self._queue_delay_total * 1000.0 / self.texts, 3) if self.texts else None,
+                "p50": round(float(np.percentile(delays, 50)), 3) if delays.size else None,
+                "p95": round(float(np.percentile(delays, 95)), 3) if delays.size else None,
+                "max": round(self._queue_delay_max * 1000.0, 3),
+            },
+        }
+
+    async def close(self) -> None:
+        """Stop the collector task; queued texts are not encoded and their callers get an error."""
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
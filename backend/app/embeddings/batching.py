@@ -0,0 +1,30 @@
+"""Length-bucketed batch planning for bulk embedding."""
+from typing import List, Sequence
+
+
+def plan_batches(lengths: Sequence[int], token_budget: int, max_batch_size: int) -> List[List[int]]:
+    """Group text indices into batches of similar token length.
+
+    Indices are ordered longest first and cut into consecutive batches whose
+    padded size (texts x longest length in the batch) stays within
+    `token_budget`, with at most `max_batch_size` texts. A text longer than
+    the budget gets a batch of its own.
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index], reverse=True)
+    max_batch_size = max(max_batch_size, 1)
+    batches = []
+    start = 0
+    while start < len(order):
+        # 정렬되어 있으므로 배치의 첫 텍스트가 패딩 길이를 결정
+        longest = max(lengths[order[start]], 1)
+        size = min(max(token_budget // longest, 1), max_batch_size)
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def padding_stats(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> dict:
+    """Real and padded token counts of a batch plan."""
+    real = sum(lengths)
+    padded = sum(len(batch) * max(lengths[index] for index in batch) for batch in batches if batch)
+    return {"tokens": real, "padded_tokens": padded}
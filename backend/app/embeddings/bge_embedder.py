@@ -1,67 +1,114 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from typing import List, Union, Optional
 import os
+import threading
+
+from app.core.config import settings
+from .backends import EmbedderBackend, create_backend
+from .batching import padding_stats, plan_batches
 
 class BGEEmbedder:
-    def __init__(self):
-        self.model: Optional[SentenceTransformer] = None
-        
+    def __init__(self, model_name: Optional[str] = None, backend: Optional[str] = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        self.backend_name = backend or settings.EMBEDDING_BACKEND
+        self.backend: Optional[EmbedderBackend] = None
+        # 예열 스레드와 첫 요청이 동시에 로딩하지 않도록 보호
+        self._load_lock = threading.Lock()
+        # 길이 버킷 배치 지표 (패딩 포함 토큰 대비 실제 토큰 비율)
+        self.batching_stats = {"calls": 0, "batches": 0, "texts": 0, "tokens": 0, "padded_tokens": 0}
+
+    @property
+    def loaded(self) -> bool:
+        return self.backend is not None
+
     def _load_model(self):
         """모델을 지연 로딩합니다."""
-        if self.model is None:
-            # 테스트 환경에서는 모델 로딩을 건너뜁니다
-            if os.getenv("TESTING", "false").lower() == "true":
+        if self.backend is not None:
+            return
+        # 테스트 환경에서는 모델 로딩을 건너뜁니다
+        if os.getenv("TESTING", "false").lower() == "true":
+            return
+        with self._load_lock:
+            if self.backend is not None:
                 return
-            
-            # 모델 캐시 디렉토리 설정 (로컬 환경에 맞게)
-            cache_dir = os.getenv("HF_HOME", "./model_cache")
-            
-            # 캐시 디렉토리가 존재하지 않으면 생성
-            os.makedirs(cache_dir, exist_ok=True)
-            
-            # BGE-M3 모델 로드
-            self.model = SentenceTransformer(
-                'BAAI/bge-m3',
-                trust_remote_code=True,
-                cache_folder=cache_dir
+
+            # 설정된 추론 백엔드 생성 (sentence-transformers | onnx)
+            backend = create_backend(
+                self.backend_name,
+                self.model_name,
+                cache_dir=os.getenv("HF_HOME", "./model_cache"),
+                onnx_dir=settings.EMBEDDING_ONNX_DIR,
+                quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+                threads=settings.EMBEDDING_ONNX_THREADS,
+                max_seq_length=settings.EMBEDDING_MAX_SEQ_LENGTH
             )
-        
+            backend.load()
+            self.backend = backend
+
+    def load(self):
+        """모델을 미리 로딩합니다 (시작 시 예열용)."""
+        self._load_model()
+
     def embed_text(self, text: Union[str, List[str]]) -> np.ndarray:
         """텍스트를 임베딩 벡터로 변환"""
         # 테스트 환경에서는 더미 벡터 반환
         if os.getenv("TESTING", "false").lower() == "true":
-            return np.array([0.0] * 1024)
-        
+            return np.zeros((len(text), 1024)) if isinstance(text, list) and len(text) != 1 else np.array([0.0] * 1024)
+
         self._load_model()
-        
+
         if isinstance(text, str):
             text = [text]
-        
-        embeddings = self.model.encode(
-            text,
-            convert_to_numpy=True,
-            normalize_embeddings=True  # 코사인 유사도를 위한 정규화
-        )
-        
+
+        embeddings = self.backend.encode(text)
+
         return embeddings[0] if len(text) == 1 else embeddings
-    
-    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[np.ndarray]:
-        """대량의 텍스트를 배치로 처리"""
+
+    def embed_batch(self, texts: List[str], batch_size: int = 32, token_budget: Optional[int] = None) -> List[np.ndarray]:
+        """대량의 텍스트를 배치로 처리
+
+        토큰 길이가 비슷한 텍스트끼리 묶어 패딩을 줄이고, 배치 크기는
+        토큰 예산(배치 크기 x 배치 내 최장 길이)에 맞춰 조정합니다.
+        batch_size 는 배치당 최대 텍스트 수입니다. 결과는 입력 순서를 유지합니다.
+        """
         # 테스트 환경에서는 더미 벡터 반환
         if os.getenv("TESTING", "false").lower() == "true":
             return [[0.0] * 1024 for _ in texts]
-        
+
         self._load_model()
-        
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-            show_progress_bar=True
-        )
+
+        if not texts:
+            return np.zeros((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+
+        lengths = self.backend.token_lengths(texts)
+        batches = plan_batches(lengths, token_budget or settings.EMBEDDING_BATCH_TOKEN_BUDGET, batch_size)
+        embeddings = None
+        for indices in batches:
+            vectors = self.backend.encode([texts[i] for i in indices], batch_size=len(indices))
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            # 원래 입력 순서로 되돌림
+            embeddings[indices] = vectors
+
+        stats = padding_stats(lengths, batches)
+        self.batching_stats["calls"] += 1
+        self.batching_stats["batches"] += len(batches)
+        self.batching_stats["texts"] += len(texts)
+        self.batching_stats["tokens"] += stats["tokens"]
+        self.batching_stats["padded_tokens"] += stats["padded_tokens"]
         return embeddings
 
+    def info(self) -> dict:
+        """선택된 백엔드 정보"""
+        padded = self.batching_stats["padded_tokens"]
+        batching = dict(
+            self.batching_stats,
+            token_budget=settings.EMBEDDING_BATCH_TOKEN_BUDGET,
+            padding_efficiency=round(self.batching_stats["tokens"] / padded, 4) if padded else None
+        )
+        if self.backend is not None:
+            return dict(self.backend.info(), batching=batching)
+        return {"backend": self.backend_name, "model_name": self.model_name, "loaded": False, "batching": batching}
+
 # 전역 임베더 인스턴스 (lazy loading)
 embedder = BGEEmbedder()
@@ -0,0 +1,194 @@
+"""ONNX Runtime CPU inference with an optional int8 dynamically quantized model."""
+import json
+import os
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .backends import EmbedderBackend, l2_normalize
+
+EXPORT_META_FILE = "embedder.json"
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model.int8.onnx"
+ONNX_OPSET = 17
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as exc:
+        raise ImportError(
+            "EMBEDDING_BACKEND=onnx 사용 시 onnxruntime 패키지가 필요합니다 (pip install onnxruntime)"
+        ) from exc
+    return onnxruntime
+
+
+def export_dir_for(root: str, model_name: str) -> Path:
+    """Export directory of one model under `root` (model names may contain '/')."""
+    return Path(root) / model_name.strip("/").replace("/", "--")
+
+
+def export_onnx(model_name: str, export_dir: Path, cache_dir: Optional[str] = None) -> Path:
+    """Export the transformer of a sentence-transformers model to ONNX.
+
+    Writes model.onnx with dynamic batch/sequence axes, the tokenizer and a
+    small JSON file with the pooling mode and max sequence length.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Pooling
+
+    model = SentenceTransformer(model_name, device="cpu", trust_remote_code=True, cache_folder=cache_dir)
+    transformer = model[0]
+    pooling = next((module for module in model if isinstance(module, Pooling)), None)
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["onnx export"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    export_dir.mkdir(parents=True, exist_ok=True)
+    target = export_dir / FP32_MODEL_FILE
+    partial = export_dir / (FP32_MODEL_FILE + ".partial")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            str(partial),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+    os.replace(partial, target)
+
+    tokenizer.save_pretrained(str(export_dir))
+    meta = {
+        "model_name": model_name,
+        "pooling": pooling.get_pooling_mode_str() if pooling is not None else "mean",
+        "max_seq_length": model.get_max_seq_length(),
+        "dimension": model.get_sentence_embedding_dimension(),
+        "input_names": input_names,
+    }
+    (export_dir / EXPORT_META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return target
+
+
+def quantize_onnx(source: Path, target: Path) -> Path:
+    """Dynamically quantize the weights of `source` to int8."""
+    _import_onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    partial = target.with_name(target.name + ".partial")
+    quantize_dynamic(str(source), str(partial), weight_type=QuantType.QInt8)
+    os.replace(partial, target)
+    return target
+
+
+def pool(hidden: np.ndarray, attention_mask: np.ndarray, mode: str) -> np.ndarray:
+    """Pool token states (batch, sequence, hidden) into sentence vectors."""
+    if mode == "cls":
+        return hidden[:, 0]
+    mask = attention_mask[..., None].astype(hidden.dtype)
+    if mode == "max":
+        return np.where(mask > 0, hidden, -np.inf).max(axis=1)
+    if mode == "mean":
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+    raise ValueError(f"지원하지 않는 풀링 방식입니다: {mode}")
+
+
+class OnnxBackend(EmbedderBackend):
+    """Run an exported model in ONNX Runtime on CPU.
+
+    The model is exported once into `export_dir/<model name>` (and quantized
+    to int8 when `quantize` is set); later loads reuse the files.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = None,
+        export_dir: str = "./model_cache/onnx",
+        quantize: bool = False,
+        intra_op_threads: int = 0,
+        max_seq_length: Optional[int] = None,
+    ):
+        super().__init__(model_name, cache_dir, max_seq_length)
+        self.export_dir = export_dir_for(export_dir, model_name)
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads
+        self.session = None
+        self._tokenizer = None
+        self.meta: dict = {}
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @property
+    def model_path(self) -> Path:
+        return self.export_dir / (INT8_MODEL_FILE if self.quantize else FP32_MODEL_FILE)
+
+    def load(self) -> None:
+        if self.session is not None:
+            return
+        ort = _import_onnxruntime()
+        from transformers import AutoTokenizer
+
+        fp32_path = self.export_dir / FP32_MODEL_FILE
+        if not fp32_path.exists() or not (self.export_dir / EXPORT_META_FILE).exists():
+            export_onnx(self.model_name, self.export_dir, self.cache_dir)
+        if self.quantize and not self.model_path.exists():
+            quantize_onnx(fp32_path, self.model_path)
+
+        self.meta = json.loads((self.export_dir / EXPORT_META_FILE).read_text(encoding="utf-8"))
+        # 설정된 최대 길이가 모델 한도보다 길면 모델 한도로 제한
+        model_limit = self.meta.get("max_seq_length")
+        if model_limit and (not self.max_seq_length or self.max_seq_length > model_limit):
+            self.max_seq_length = model_limit
+        self._tokenizer = AutoTokenizer.from_pretrained(str(self.export_dir))
+        options = ort.SessionOptions()
+        if self.intra_op_threads > 0:
+            options.intra_op_num_threads = self.intra_op_threads
+        self.session = ort.InferenceSession(
+            str(self.model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        self.load()
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.meta.get("dimension", 0)), dtype=np.float32)
+        outputs = []
+        for start in range(0, len(texts), max(batch_size, 1)):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self._input_names}
+            hidden = self.session.run(None, feeds)[0]
+            outputs.append(pool(hidden, encoded["attention_mask"], self.meta.get("pooling", "mean")))
+        return l2_normalize(np.concatenate(outputs).astype(np.float32, copy=False))
+
+    def info(self) -> dict:
+        return {
+            **super().info(),
+            "model_path": str(self.model_path),
+            "quantized": self.quantize,
+            "intra_op_threads": self.intra_op_threads,
+        }
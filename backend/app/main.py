@@ -1,14 +1,59 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse
 from app.api.v1.api import api_router
-from app.db.init_db import create_tables
+from app.db.init_db import create_tables, create_indexes, upgrade_schema
+from app.db.session import AsyncSessionLocal, dispose_engine, get_engine
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.middleware import RequestTimingMiddleware, profiling_authorized
+from app.core.profiling import profile_path
+from app.services.consultation_service import consultation_service, IN_PROCESS_SEARCH_MODES
+from app.services.embedding_service import embedding_service
+from app.services.ingestion_service import ingestion_service
+from app.services.readiness_service import readiness_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB 엔진(연결 풀)은 import 시점이 아니라 애플리케이션 시작 시 생성
+    get_engine()
+    
+    # 모델 로딩/예열은 백그라운드에서 진행하고 완료 전까지 /ready 는 503
+    if settings.EMBEDDING_PRELOAD:
+        readiness_service.start()
+    else:
+        readiness_service.disable()
+    
+    await create_tables()
+    await upgrade_schema()
+    await create_indexes()
+    
+    # 프로세스 내 검색 모드라면 첫 요청 전에 벡터를 메모리에 적재
+    if settings.SEARCH_MODE in IN_PROCESS_SEARCH_MODES:
+        async with AsyncSessionLocal() as db:
+            await consultation_service.load_vector_index(db)
+        # 다른 워커가 쓴 행을 주기적으로 반영
+        await consultation_service.start_index_refresh()
+    
+    # async 수집 모드: 백그라운드 임베딩 워커 시작 (임베딩 없는 행 복구 포함)
+    if settings.INGESTION_MODE == "async":
+        await ingestion_service.start()
+    
+    yield
+    
+    await readiness_service.stop()
+    await consultation_service.stop_index_refresh()
+    await ingestion_service.stop()
+    await embedding_service.shutdown()
+    await dispose_engine()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -20,13 +65,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 지연 지표, Server-Timing 헤더, 토큰 인증 요청 프로파일링
+app.add_middleware(RequestTimingMiddleware)
+
 # API v1 라우터 등록
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-@app.on_event("startup")
-async def startup_event():
-    await create_tables()
-
 @app.get("/")
 async def root():
     return {"message": "텍스트 벡터 검색 시스템 API"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (text format 0.0.4)."""
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="메트릭 수집이 비활성화되어 있습니다")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug/profiles/{name}", include_in_schema=False)
+async def get_profile(name: str, x_debug_profile: str = Header("")):
+    """Download a stored request profile (folded stacks); requires the profiling token."""
+    if not profiling_authorized(x_debug_profile):
+        raise HTTPException(status_code=404, detail="찾을 수 없습니다")
+    path = profile_path(settings.PROFILE_DIR, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
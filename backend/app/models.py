@@ -1,13 +1,52 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
-from sqlalchemy.sql import func
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func, text as sql_text
 from pgvector.sqlalchemy import Vector
 from app.db.base import Base
 
+# 임베딩 상태 (async 수집 모드에서 pending -> ready/failed)
+EMBEDDING_STATUS_PENDING = "pending"
+EMBEDDING_STATUS_READY = "ready"
+EMBEDDING_STATUS_FAILED = "failed"
+
 class Consultation(Base):
     __tablename__ = "consultations"
     
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text, nullable=False)
     embedding = Column(Vector(1024))  # Arctic 모델은 1024차원
+    content_hash = Column(String(64))  # 정규화된 텍스트의 SHA-256 (임베딩 재사용)
+    embedding_status = Column(String(16), nullable=False, default=EMBEDDING_STATUS_READY, server_default=EMBEDDING_STATUS_READY)
+    # 검색 필터용 메타데이터
+    category = Column(String(64))  # 상담 분류 (예: 학습발달_수학)
+    owner = Column(String(64))  # 담당 교사/학생 식별자
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # 목록 조회 keyset 페이지네이션 (created_at DESC, id DESC)용 복합 인덱스
+        Index("ix_consultations_created_at_id", "created_at", "id"),
+        Index("ix_consultations_content_hash", "content_hash"),
+        # 필터 검색 시 후보를 먼저 좁히기 위한 메타데이터 인덱스 (날짜 범위는 created_at 인덱스 사용)
+        Index("ix_consultations_category", "category"),
+        Index("ix_consultations_owner", "owner"),
+        # 임베딩 대기 행 복구/개수 조회용 부분 인덱스
+        Index(
+            "ix_consultations_embedding_pending", "id",
+            postgresql_where=sql_text("embedding_status <> 'ready'")
+        ),
+    )
+
+
+class ConsultationPassage(Base):
+    """Overlapping chunk of a consultation's text with its own embedding."""
+    __tablename__ = "consultation_passages"
+    
+    id = Column(Integer, primary_key=True)
+    consultation_id = Column(
+        Integer, ForeignKey("consultations.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    position = Column(Integer, nullable=False)  # 상담 내 구간 순서
+    # 원문(consultations.text) 내 문자 위치 [start_offset, end_offset) - 본문은 중복 저장하지 않음
+    start_offset = Column(Integer, nullable=False)
+    end_offset = Column(Integer, nullable=False)
+    embedding = Column(Vector(1024))
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
+from app.core.config import settings
 
 class ConsultationBase(BaseModel):
     text: str = Field(..., min_length=1, description="상담 내용")
@@ -13,25 +14,96 @@ class ConsultationBase(BaseModel):
         return v.strip()
 
 class ConsultationCreate(ConsultationBase):
-    pass
+    category: Optional[str] = Field(default=None, max_length=64, description="상담 분류 (검색 필터)")
+    owner: Optional[str] = Field(default=None, max_length=64, description="담당 교사/학생 식별자 (검색 필터)")
 
 class ConsultationUpdate(ConsultationBase):
-    pass
+    # None이면 기존 값 유지
+    category: Optional[str] = Field(default=None, max_length=64, description="상담 분류 (검색 필터)")
+    owner: Optional[str] = Field(default=None, max_length=64, description="담당 교사/학생 식별자 (검색 필터)")
 
 class ConsultationResponse(ConsultationBase):
     id: int
+    category: Optional[str] = None
+    owner: Optional[str] = None
+    embedding_status: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+class ConsultationBulkCreateRequest(BaseModel):
+    # 항목별 검증 오류를 개별 보고하기 위해 항목은 서비스에서 ConsultationCreate로 검증
+    items: List[Any] = Field(..., min_length=1, max_length=settings.BULK_CREATE_MAX_ITEMS, description="생성할 상담 목록 ({\"text\": ...})")
+
+class ConsultationBulkCreatedItem(ConsultationResponse):
+    index: int
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[str]
+
+class ConsultationBulkCreateResponse(BaseModel):
+    created: List[ConsultationBulkCreatedItem]
+    errors: List[BulkItemError]
+    created_count: int
+    error_count: int
+
+class SearchFilters(BaseModel):
+    """Metadata filters applied before or during vector ranking."""
+    category: Optional[str] = None
+    owner: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    ids: Optional[List[int]] = None
+    
+    @property
+    def is_empty(self) -> bool:
+        return all(value is None for value in (self.category, self.owner, self.created_from, self.created_to, self.ids))
+    
+    def cache_key(self) -> tuple:
+        # 검색 세션 커서 키 (id 목록은 순서와 무관)
+        return (
+            self.category,
+            self.owner,
+            self.created_from.isoformat() if self.created_from else None,
+            self.created_to.isoformat() if self.created_to else None,
+            tuple(sorted(set(self.ids))) if self.ids is not None else None,
+        )
+
 class ConsultationSearchRequest(BaseModel):
     query: str
     limit: Optional[int] = 10
     skip: Optional[int] = 0
     page: Optional[int] = 1
     similarity_threshold: Optional[float] = Field(default=0.3, ge=0.0, le=1.0, description="유사도 임계값 (0.0-1.0)")
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000, description="HNSW 탐색 폭 (클수록 recall 증가, 지연 증가)")
+    probes: Optional[int] = Field(default=None, ge=1, le=10000, description="IVFFlat/IVF-PQ 탐색 리스트 수 (클수록 recall 증가, 지연 증가)")
+    cursor: Optional[str] = Field(default=None, description="이전 검색 응답의 검색 세션 커서 (다음 페이지를 재정렬 없이 조회)")
+    create_cursor: bool = Field(default=False, description="검색 세션 커서 생성 (최대 SEARCH_CURSOR_MAX_HITS개 순위를 계산해 보관하므로 첫 페이지가 느려짐)")
+    include_pending_count: bool = Field(default=False, description="임베딩 대기로 검색에서 제외된 행 수를 함께 반환")
+    passages: bool = Field(default=False, description="구간 단위로 채점하고 상담별로 집계 (가장 잘 맞는 구간을 snippet으로 반환)")
+    aggregation: Optional[Literal["max", "mean_top_n"]] = Field(default=None, description="구간 점수 집계 방식 (기본값: PASSAGE_AGGREGATION)")
+    top_n: Optional[int] = Field(default=None, ge=1, le=20, description="mean_top_n 집계에 사용할 상위 구간 수")
+    hybrid: bool = Field(default=False, description="어휘(전문 검색) 순위와 벡터 순위를 RRF로 결합 (PostgreSQL 전용)")
+    hybrid_prefilter: bool = Field(default=False, description="어휘 검색 결과만 벡터로 채점 (hybrid일 때)")
+    category: Optional[str] = Field(default=None, max_length=64, description="분류 필터")
+    owner: Optional[str] = Field(default=None, max_length=64, description="담당 교사/학생 필터")
+    created_from: Optional[datetime] = Field(default=None, description="작성일 필터 시작 (포함)")
+    created_to: Optional[datetime] = Field(default=None, description="작성일 필터 끝 (미포함)")
+    ids: Optional[List[int]] = Field(default=None, max_length=settings.SEARCH_FILTER_MAX_IDS, description="검색 대상 id 허용 목록")
+    
+    def search_filters(self) -> Optional[SearchFilters]:
+        """Metadata filters of this request, or None when no filter is set."""
+        filters = SearchFilters(
+            category=self.category,
+            owner=self.owner,
+            created_from=self.created_from,
+            created_to=self.created_to,
+            ids=self.ids
+        )
+        return None if filters.is_empty else filters
     
     @field_validator('similarity_threshold')
     @classmethod
@@ -46,6 +118,10 @@ class ConsultationSearchResult(BaseModel):
     created_at: datetime
     updated_at: datetime
     similarity: float
+    score: Optional[float] = None
+    snippet: Optional[str] = None
+    category: Optional[str] = None
+    owner: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -58,3 +134,48 @@ class ConsultationSearchResponse(BaseModel):
     total_pages: int
     has_next: bool
     has_prev: bool
+    cursor: Optional[str] = None
+    pending_excluded: Optional[int] = None
+    # ivfpq 모드의 total은 탐색한(probes) 셀 안에서 센 근사값이고, 하이브리드 total은 후보 목록 크기에 묶인 근사값
+    total_is_estimate: bool = False
+
+class ThresholdStats(BaseModel):
+    similarity_threshold: float
+    matched: int = Field(..., description="임계값 이상인 행 수 (검색 결과 total)")
+    evaluated: int = Field(..., description="임계값 없이 채점 대상이 된 행 수")
+    cut: int = Field(..., description="임계값 때문에 제외된 행 수")
+    best_similarity: Optional[float] = None
+    best_cut_similarity: Optional[float] = Field(default=None, description="임계값에 걸린 행 중 가장 높은 유사도")
+    similarity_at_rank: Dict[int, float] = Field(default_factory=dict, description="임계값 없는 순위별 유사도 (1, 10, 100, ...)")
+    sample_size: int = Field(..., description="임계값 분석에 사용한 상위 결과 수")
+
+class SearchExplainResponse(BaseModel):
+    strategy: str = Field(..., description="python_scan | pgvector | memory_index | quantized_index | ivfpq_index")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="실제로 적용된 인덱스/검색 파라미터")
+    query_embedding_cache: Literal["hit", "miss", "disabled"]
+    candidates_scanned: Dict[str, int] = Field(default_factory=dict, description="단계별 채점한 벡터 수 (pgvector는 실행 계획 기준)")
+    returned: int
+    total: int
+    threshold: ThresholdStats
+    timings_ms: Dict[str, float] = Field(default_factory=dict, description="단계별 소요 시간 (embed, db, score, total)")
+    plan: Optional[Any] = Field(default=None, description="SQL 경로의 EXPLAIN 결과 (PostgreSQL: ANALYZE, BUFFERS JSON)")
+    results: List[ConsultationSearchResult]
+
+class BatchSearchQuery(BaseModel):
+    query: str = Field(..., min_length=1)
+    limit: int = Field(default=10, ge=1, le=settings.MAX_SEARCH_RESULTS)
+    similarity_threshold: float = Field(default=0.3, ge=0.0, le=1.0, description="유사도 임계값 (0.0-1.0)")
+
+class ConsultationBatchSearchRequest(BaseModel):
+    queries: List[BatchSearchQuery] = Field(..., min_length=1, max_length=settings.BATCH_SEARCH_MAX_QUERIES)
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000, description="HNSW 탐색 폭 (클수록 recall 증가, 지연 증가)")
+    probes: Optional[int] = Field(default=None, ge=1, le=10000, description="IVFFlat/IVF-PQ 탐색 리스트 수 (클수록 recall 증가, 지연 증가)")
+
+class BatchSearchQueryResult(BaseModel):
+    query: str
+    results: List[ConsultationSearchResult]
+    total: int
+
+class ConsultationBatchSearchResponse(BaseModel):
+    results: List[BatchSearchQueryResult]
+    total_is_estimate: bool = False
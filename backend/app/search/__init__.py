@@ -0,0 +1,27 @@
+from .cursors import SearchCursorStore, SearchSession
+from .hybrid import build_tsquery, reciprocal_rank_fusion
+from .ivfpq import IVFPQIndex
+from .memory_index import InMemoryVectorIndex
+from .quantized import QuantizedVectorIndex, QUANTIZATION_MODES
+from .passages import PASSAGE_AGGREGATIONS, aggregate_passage_scores, split_passages
+from .topk import BatchTopK
+from .snapshot import EmbeddingSnapshot, build_snapshot, load_snapshot, write_snapshot
+
+__all__ = [
+    "SearchCursorStore",
+    "SearchSession",
+    "build_tsquery",
+    "reciprocal_rank_fusion",
+    "IVFPQIndex",
+    "InMemoryVectorIndex",
+    "QuantizedVectorIndex",
+    "QUANTIZATION_MODES",
+    "PASSAGE_AGGREGATIONS",
+    "aggregate_passage_scores",
+    "split_passages",
+    "BatchTopK",
+    "EmbeddingSnapshot",
+    "build_snapshot",
+    "load_snapshot",
+    "write_snapshot",
+]
@@ -0,0 +1,131 @@
+"""Search session cursors: ranked hit lists kept between page requests."""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class SearchSession:
+    """Ranked ids and similarities computed by the first page of a search."""
+
+    key: Hashable
+    ids: np.ndarray
+    scores: np.ndarray
+    total: int
+    expires_at: float
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.scores.nbytes
+
+    @property
+    def complete(self) -> bool:
+        """True when every hit counted in `total` is held by the session."""
+        return len(self.ids) >= self.total
+
+    def covers(self, skip: int, limit: int) -> bool:
+        return self.complete or skip + limit <= len(self.ids)
+
+    def page(self, skip: int, limit: int) -> List[Tuple[int, float]]:
+        end = skip + limit
+        return list(zip(self.ids[skip:end].tolist(), self.scores[skip:end].tolist()))
+
+
+class SearchCursorStore:
+    """Thread-safe store of search sessions bounded by TTL, count and bytes.
+
+    Sessions expire `ttl_seconds` after their last access. When the store is
+    over `max_entries` or `max_bytes`, least recently used sessions are dropped.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sessions: "OrderedDict[str, SearchSession]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _drop(self, cursor: str) -> None:
+        session = self._sessions.pop(cursor)
+        self._bytes -= session.nbytes
+
+    def create(self, key: Hashable, hits: Sequence[Tuple[int, float]], total: int) -> str:
+        """Store a ranked hit list and return its opaque cursor id."""
+        session = SearchSession(
+            key=key,
+            ids=np.fromiter((hit[0] for hit in hits), dtype=np.int64, count=len(hits)),
+            scores=np.fromiter((hit[1] for hit in hits), dtype=np.float32, count=len(hits)),
+            total=total,
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        cursor = secrets.token_urlsafe(16)
+        with self._lock:
+            self._sessions[cursor] = session
+            self._bytes += session.nbytes
+            self.created += 1
+            while len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._drop(next(iter(self._sessions)))
+                self.evictions += 1
+        return cursor
+
+    def get(self, cursor: str, key: Hashable) -> Optional[SearchSession]:
+        """Return the live session for `cursor` if it was created for `key`."""
+        now = self._clock()
+        with self._lock:
+            session = self._sessions.get(cursor)
+            if session is not None and session.expires_at <= now:
+                self._drop(cursor)
+                self.expirations += 1
+                session = None
+            if session is None or session.key != key:
+                self.misses += 1
+                return None
+            session.expires_at = now + self.ttl_seconds
+            self._sessions.move_to_end(cursor)
+            self.hits += 1
+            return session
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters and current size."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self.created,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
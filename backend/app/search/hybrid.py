@@ -0,0 +1,36 @@
+"""Lexical query building and reciprocal rank fusion for hybrid search."""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# tsquery 연산자와 충돌하지 않도록 단어 문자만 검색어로 사용
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def build_tsquery(query: str, max_terms: int = 32) -> Optional[str]:
+    """Turn free text into a `to_tsquery('simple', ...)` expression.
+
+    Every word becomes a prefix match (`term:*`) so that Korean words followed
+    by particles ("수학을", "민수는") still match their stem, and the terms are
+    OR-ed so that documents matching more terms rank higher. Returns None when
+    the query has no words.
+    """
+    terms = list(dict.fromkeys(term.lower() for term in _TERM_PATTERN.findall(query)))[:max_terms]
+    if not terms:
+        return None
+    return " | ".join(f"{term}:*" for term in terms)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Iterable[int]],
+    k: int = 60,
+) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists into [(id, score)], best first.
+
+    score(id) = sum over lists of 1 / (k + rank) with 1-based ranks; ties are
+    broken by id for a stable order.
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, consultation_id in enumerate(ranking, start=1):
+            scores[consultation_id] = scores.get(consultation_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
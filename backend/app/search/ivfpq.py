@@ -0,0 +1,363 @@
+"""In-process IVF-PQ index for multi-million-row corpora.
+
+Vectors are L2-normalized and scored by inner product (= cosine):
+
+    score(q, x) ~= q . c_list + sum_j q_j . codebook_j[code_j]
+
+where c_list is the coarse (IVF) centroid of x's cell and the codes are the
+product quantization of the residual x - c_list. Per query, an asymmetric
+distance table T[j, c] = q_j . codebook_j[c] is computed once and every
+code in the probed cells is scored by table lookups.
+"""
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.search.positions import PositionMap
+
+IVFPQ_FORMAT_VERSION = 1
+# 거리 계산 시 한 번에 처리하는 행 수 (임시 메모리 상한)
+ASSIGN_BLOCK_ROWS = 16384
+# 위치 맵 값 = 셀 번호 << 32 | 셀 안의 위치
+_POSITION_BITS = 32
+_POSITION_MASK = (1 << _POSITION_BITS) - 1
+# 이보다 적은 행은 한 행씩 마지막 행과 바꿔 삭제하고, 많으면 셀을 한 번에 압축
+BULK_REMOVE_MIN_ROWS = 256
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def assign_nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (L2) for each vector, computed in blocks."""
+    # argmin ||x - c||^2 = argmax (x.c - ||c||^2 / 2)
+    half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = vectors[start:start + ASSIGN_BLOCK_ROWS]
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T - half_norms, axis=1)
+    return assignments
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means with random-sample initialization."""
+    data = np.asarray(data, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    k = min(k, len(data))
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = assign_nearest(data, centroids)
+        counts = np.bincount(assignments, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # 빈 클러스터는 임의의 샘플로 다시 시작
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), size=int(empty.sum()), replace=False)]
+    return centroids
+
+
+class IVFPQIndex:
+    """Inverted-file index with product-quantized residuals."""
+
+    def __init__(self, dimension: int, nlist: int, m: int, nbits: int = 8):
+        if dimension % m != 0:
+            raise ValueError(f"차원({dimension})은 서브벡터 수 m({m})으로 나누어 떨어져야 합니다")
+        if not 1 <= nbits <= 8:
+            raise ValueError("nbits는 1~8 사이여야 합니다")
+        self.dimension = dimension
+        self.nlist = nlist
+        self.m = m
+        self.nbits = nbits
+        self.dsub = dimension // m
+        self.ksub = 2 ** nbits
+        self.high_water_mark: Optional[datetime] = None
+
+        self.centroids: Optional[np.ndarray] = None   # (nlist, dimension)
+        self.codebooks: Optional[np.ndarray] = None   # (m, ksub, dsub)
+        self._list_ids: List[np.ndarray] = []
+        self._list_codes: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+        self._positions = PositionMap()
+        self._lock = threading.RLock()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None and self.codebooks is not None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, consultation_id: int) -> bool:
+        return consultation_id in self._positions
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by centroids, codebooks, codes, ids and the id map (including spare capacity)."""
+        total = sum(ids.nbytes + codes.nbytes for ids, codes in zip(self._list_ids, self._list_codes))
+        total += self._positions.nbytes
+        if self.is_trained:
+            total += self.centroids.nbytes + self.codebooks.nbytes
+        return total
+
+    def memory_footprint(self) -> dict:
+        """Report memory use against the float32 equivalent."""
+        # 코드 + 셀의 id + id -> (셀, 위치) 맵
+        bytes_per_vector = self.m + 8 + PositionMap.ENTRY_BYTES
+        float32_bytes = len(self) * (4 * self.dimension + 8)
+        used_bytes = len(self) * (self.m + 8) + self._positions.nbytes
+        return {
+            "mode": f"ivfpq(nlist={self.nlist}, m={self.m}, nbits={self.nbits})",
+            "vectors": len(self),
+            "bytes_per_vector": bytes_per_vector,
+            "used_bytes": used_bytes,
+            "allocated_bytes": self.nbytes,
+            "float32_equivalent_bytes": float32_bytes,
+            "compression_ratio": round(float32_bytes / used_bytes, 2) if used_bytes else None,
+        }
+
+    def train(self, sample: np.ndarray, iterations: int = 20, seed: int = 0) -> None:
+        """Train coarse centroids and residual PQ codebooks on a sample."""
+        sample = _normalize(sample)
+        if len(sample) < self.nlist:
+            raise ValueError(f"학습 샘플({len(sample)}개)이 nlist({self.nlist})보다 적습니다")
+
+        self.centroids = kmeans(sample, self.nlist, iterations=iterations, seed=seed)
+        residuals = sample - self.centroids[assign_nearest(sample, self.centroids)]
+
+        codebooks = np.zeros((self.m, self.ksub, self.dsub), dtype=np.float32)
+        for j in range(self.m):
+            sub = residuals[:, j * self.dsub:(j + 1) * self.dsub]
+            trained = kmeans(sub, self.ksub, iterations=iterations, seed=seed + j + 1)
+            codebooks[j, :len(trained)] = trained
+        self.codebooks = codebooks
+
+        self._list_ids = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self._list_codes = [np.empty((0, self.m), dtype=np.uint8) for _ in range(self.nlist)]
+        self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+        self._positions = PositionMap()
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        lists = assign_nearest(vectors, self.centroids)
+        residuals = vectors - self.centroids[lists]
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = np.ascontiguousarray(residuals[:, j * self.dsub:(j + 1) * self.dsub])
+            codes[:, j] = assign_nearest(sub, self.codebooks[j])
+        return lists, codes
+
+    def add_many(self, ids: Iterable[int], vectors) -> None:
+        """Assign, encode and append rows without retraining (existing ids are replaced)."""
+        if not self.is_trained:
+            raise RuntimeError("학습되지 않은 IVF-PQ 인덱스에는 추가할 수 없습니다")
+        ids = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64)
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors).reshape(len(ids), self.dimension)
+        if np.unique(ids).size != ids.size:
+            # 같은 id가 여러 번 들어오면 마지막 벡터만 유지
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(ids.size - 1 - last)
+            ids, vectors = ids[keep], vectors[keep]
+        lists, codes = self._encode(_normalize(vectors))
+
+        with self._lock:
+            self._remove_many(ids)
+            locations = np.empty(len(ids), dtype=np.int64)
+            for list_no in np.unique(lists).tolist():
+                mask = lists == list_no
+                start = self._append(list_no, ids[mask], codes[mask])
+                locations[mask] = (list_no << _POSITION_BITS) + np.arange(start, start + int(mask.sum()))
+            # 위치 맵은 배치 전체를 한 번에 갱신
+            self._positions.set_many(ids, locations)
+
+    def _append(self, list_no: int, ids: np.ndarray, codes: np.ndarray) -> int:
+        # 셀 끝에 행을 추가하고 첫 행의 위치를 반환
+        size = int(self._list_sizes[list_no])
+        required = size + len(ids)
+        if required > len(self._list_ids[list_no]):
+            # 셀별 배열을 2배씩 늘려 증분 추가 비용을 상수 시간으로 유지
+            capacity = max(required, 2 * len(self._list_ids[list_no]), 16)
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_codes = np.empty((capacity, self.m), dtype=np.uint8)
+            grown_ids[:size] = self._list_ids[list_no][:size]
+            grown_codes[:size] = self._list_codes[list_no][:size]
+            self._list_ids[list_no], self._list_codes[list_no] = grown_ids, grown_codes
+
+        self._list_ids[list_no][size:required] = ids
+        self._list_codes[list_no][size:required] = codes
+        self._list_sizes[list_no] = required
+        return size
+
+    def upsert(self, consultation_id: int, vector) -> None:
+        """Insert a row or re-encode it into its (possibly new) cell."""
+        self.add_many([consultation_id], np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def remove(self, consultation_id: int) -> bool:
+        """Remove a row by moving the last row of its cell into its slot."""
+        with self._lock:
+            location = self._positions.pop(consultation_id)
+            if location is None:
+                return False
+            list_no, position = location >> _POSITION_BITS, location & _POSITION_MASK
+            last = int(self._list_sizes[list_no]) - 1
+            if position != last:
+                moved_id = int(self._list_ids[list_no][last])
+                self._list_ids[list_no][position] = moved_id
+                self._list_codes[list_no][position] = self._list_codes[list_no][last]
+                self._positions[moved_id] = location
+            self._list_sizes[list_no] = last
+            return True
+
+    def _remove_many(self, ids: np.ndarray) -> None:
+        # 셀마다 남는 행을 앞으로 모으고, 위치가 바뀐 행만 위치 맵을 갱신
+        locations = self._positions.get_many(ids)
+        present = locations >= 0
+        if not present.any():
+            return
+        ids, locations = ids[present], locations[present]
+        if len(ids) < BULK_REMOVE_MIN_ROWS:
+            for consultation_id in ids.tolist():
+                self.remove(consultation_id)
+            return
+        list_nos = locations >> _POSITION_BITS
+        moved_ids, moved_locations = [], []
+        for list_no in np.unique(list_nos).tolist():
+            size = int(self._list_sizes[list_no])
+            keep = np.ones(size, dtype=bool)
+            keep[locations[list_nos == list_no] & _POSITION_MASK] = False
+            kept = int(keep.sum())
+            kept_ids = self._list_ids[list_no][:size][keep]
+            self._list_codes[list_no][:kept] = self._list_codes[list_no][:size][keep]
+            self._list_ids[list_no][:kept] = kept_ids
+            self._list_sizes[list_no] = kept
+            moved_ids.append(kept_ids)
+            moved_locations.append((list_no << _POSITION_BITS) + np.arange(kept, dtype=np.int64))
+        self._positions.remove_many(ids)
+        moved_ids = np.concatenate(moved_ids)
+        moved_locations = np.concatenate(moved_locations)
+        changed = self._positions.get_many(moved_ids) != moved_locations
+        self._positions.set_many(moved_ids[changed], moved_locations[changed])
+
+    def retain_only(self, existing_ids) -> int:
+        """Remove rows whose id is no longer present; return how many were dropped."""
+        existing = np.asarray(list(existing_ids), dtype=np.int64)
+        with self._lock:
+            ids = self._positions.ids()
+            stale = ids[~np.isin(ids, existing)]
+            self._remove_many(stale)
+        return len(stale)
+
+    def scores(self, query_embedding, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate similarities for every row in the `nprobe` closest cells."""
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))[0]
+        nprobe = max(1, min(nprobe, self.nlist))
+
+        coarse = self.centroids @ query
+        probed = np.argpartition(-coarse, nprobe - 1)[:nprobe] if nprobe < self.nlist else np.arange(self.nlist)
+        # 비대칭 거리 테이블: T[j, c] = q_j . codebook_j[c]
+        table = np.einsum("jcd,jd->jc", self.codebooks, query.reshape(self.m, self.dsub))
+        subspaces = np.arange(self.m)
+
+        id_blocks, score_blocks = [], []
+        with self._lock:
+            for list_no in probed.tolist():
+                size = int(self._list_sizes[list_no])
+                if size == 0:
+                    continue
+                codes = self._list_codes[list_no][:size]
+                score_blocks.append(coarse[list_no] + table[subspaces, codes].sum(axis=1))
+                id_blocks.append(self._list_ids[list_no][:size].copy())
+
+        if not id_blocks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(id_blocks), np.concatenate(score_blocks).astype(np.float32)
+
+    def search_candidates(
+        self,
+        query_embedding,
+        candidates: int,
+        similarity_threshold: float = 0.0,
+        slack: float = 0.0,
+        nprobe: int = 8,
+        allowed_ids=None,
+    ) -> Tuple[np.ndarray, int]:
+        """Return up to `candidates` approximate top ids and the hit count within probed cells.
+
+        With `allowed_ids`, rows outside the allow-list are dropped before the
+        top-k selection so that they cannot crowd out allowed candidates.
+        """
+        ids, scores = self.scores(query_embedding, nprobe)
+        if allowed_ids is not None:
+            keep = np.isin(ids, np.asarray(list(allowed_ids), dtype=np.int64))
+            ids, scores = ids[keep], scores[keep]
+        total = int(np.count_nonzero(scores >= similarity_threshold))
+        hits = np.flatnonzero(scores >= similarity_threshold - slack)
+        k = min(candidates, hits.size)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), total
+
+        hit_scores = scores[hits]
+        top = np.argpartition(-hit_scores, k - 1)[:k] if k < hits.size else np.arange(hits.size)
+        top = top[np.argsort(-hit_scores[top], kind="stable")]
+        return ids[hits[top]], total
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Persist the trained index and its codes to a single .npz file."""
+        if not self.is_trained:
+            raise RuntimeError("학습되지 않은 IVF-PQ 인덱스는 저장할 수 없습니다")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sizes = self._list_sizes.copy()
+        meta = {
+            "version": IVFPQ_FORMAT_VERSION,
+            "dimension": self.dimension,
+            "nlist": self.nlist,
+            "m": self.m,
+            "nbits": self.nbits,
+            "high_water_mark": self.high_water_mark.isoformat() if self.high_water_mark else None,
+        }
+        ids = np.concatenate([self._list_ids[i][:sizes[i]] for i in range(self.nlist)])
+        codes = np.concatenate([self._list_codes[i][:sizes[i]] for i in range(self.nlist)])
+
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                     centroids=self.centroids, codebooks=self.codebooks,
+                     list_sizes=sizes, ids=ids, codes=codes)
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IVFPQIndex":
+        """Load an index saved with `save`."""
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode())
+            if meta["version"] != IVFPQ_FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 IVF-PQ 인덱스 버전입니다: {meta['version']}")
+            index = cls(meta["dimension"], meta["nlist"], meta["m"], meta["nbits"])
+            index.centroids = data["centroids"]
+            index.codebooks = data["codebooks"]
+            sizes, ids, codes = data["list_sizes"], data["ids"], data["codes"]
+
+        if meta["high_water_mark"]:
+            index.high_water_mark = datetime.fromisoformat(meta["high_water_mark"])
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        index._list_ids = [ids[offsets[i]:offsets[i + 1]].copy() for i in range(index.nlist)]
+        index._list_codes = [codes[offsets[i]:offsets[i + 1]].copy() for i in range(index.nlist)]
+        index._list_sizes = sizes.astype(np.int64)
+        list_nos = np.repeat(np.arange(index.nlist, dtype=np.int64), sizes)
+        positions = np.arange(len(ids), dtype=np.int64) - np.repeat(offsets[:-1], sizes)
+        index._positions.set_many(ids, (list_nos << _POSITION_BITS) + positions)
+        return index
@@ -0,0 +1,257 @@
+"""Resident in-process exact vector search."""
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from app.search.topk import BATCH_SCAN_BLOCK_ROWS, BatchTopK
+
+if TYPE_CHECKING:
+    from app.search.snapshot import EmbeddingSnapshot
+
+
+class InMemoryVectorIndex:
+    """Exact cosine search over a contiguous float32 embedding matrix.
+
+    All vectors are L2-normalized on insert, so a query is a single
+    matrix-vector product followed by an argpartition top-k.
+
+    An index built with `from_snapshot` additionally scans a read-only,
+    memory-mapped base segment. Updated or deleted base rows are masked
+    out and their new vectors live in the private, growable tail matrix.
+    """
+
+    def __init__(self, dimension: int, initial_capacity: int = 1024):
+        self.dimension = dimension
+        self._vectors = np.empty((max(initial_capacity, 1), dimension), dtype=np.float32)
+        self._ids = np.empty(max(initial_capacity, 1), dtype=np.int64)
+        self._size = 0
+        self._positions: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        # 공유 스냅샷 세그먼트 (id 오름차순, 읽기 전용)
+        self._base_ids = np.empty(0, dtype=np.int64)
+        self._base_vectors = np.empty((0, dimension), dtype=np.float32)
+        self._base_alive = np.empty(0, dtype=bool)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "EmbeddingSnapshot", initial_capacity: int = 1024) -> "InMemoryVectorIndex":
+        """Create an index whose base segment is a memory-mapped snapshot."""
+        index = cls(snapshot.dimension, initial_capacity=initial_capacity)
+        index._base_ids = snapshot.ids
+        index._base_vectors = snapshot.vectors
+        index._base_alive = np.ones(len(snapshot.ids), dtype=bool)
+        return index
+
+    def __len__(self) -> int:
+        return self._size + int(np.count_nonzero(self._base_alive))
+
+    def __contains__(self, consultation_id: int) -> bool:
+        return consultation_id in self._positions or self._base_position(consultation_id) is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Private bytes held by this process (tail matrix, ids and base mask)."""
+        return self._vectors.nbytes + self._ids.nbytes + self._base_alive.nbytes
+
+    @property
+    def shared_nbytes(self) -> int:
+        """Bytes of the memory-mapped base segment shared through the page cache."""
+        return self._base_vectors.nbytes + self._base_ids.nbytes
+
+    def memory_footprint(self) -> dict:
+        """Report private and shared memory use."""
+        bytes_per_vector = 4 * self.dimension + 8
+        return {
+            "mode": "float32",
+            "vectors": len(self),
+            "bytes_per_vector": bytes_per_vector,
+            "used_bytes": self._size * bytes_per_vector,
+            "allocated_bytes": self.nbytes,
+            "shared_bytes": self.shared_nbytes,
+        }
+
+    def retain_only(self, existing_ids) -> int:
+        """Drop rows whose id is no longer present (base rows are masked); return how many were dropped."""
+        existing = np.asarray(existing_ids, dtype=np.int64)
+        with self._lock:
+            keep = np.isin(self._base_ids, existing)
+            dropped = int(np.count_nonzero(self._base_alive & ~keep))
+            self._base_alive &= keep
+            tail_ids = self._ids[:self._size]
+            for consultation_id in tail_ids[~np.isin(tail_ids, existing)].tolist():
+                self.remove(consultation_id)
+                dropped += 1
+            return dropped
+
+    def _base_position(self, consultation_id: int):
+        position = int(np.searchsorted(self._base_ids, consultation_id))
+        if (position < len(self._base_ids) and self._base_ids[position] == consultation_id
+                and self._base_alive[position]):
+            return position
+        return None
+
+    def _retire_base(self, ids: np.ndarray) -> None:
+        if len(self._base_ids) == 0 or len(ids) == 0:
+            return
+        positions = np.searchsorted(self._base_ids, ids)
+        positions[positions >= len(self._base_ids)] = 0
+        matched = self._base_ids[positions] == ids
+        self._base_alive[positions[matched]] = False
+
+    def reserve(self, capacity: int) -> None:
+        """Grow the backing arrays so that `capacity` rows fit without reallocation."""
+        with self._lock:
+            if capacity <= self._vectors.shape[0]:
+                return
+            vectors = np.empty((capacity, self.dimension), dtype=np.float32)
+            ids = np.empty(capacity, dtype=np.int64)
+            vectors[:self._size] = self._vectors[:self._size]
+            ids[:self._size] = self._ids[:self._size]
+            self._vectors, self._ids = vectors, ids
+
+    def add_many(self, ids: Iterable[int], vectors: np.ndarray) -> None:
+        """Append or overwrite many rows at once."""
+        ids = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64)
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension))
+        if np.unique(ids).size != ids.size:
+            # 같은 id가 여러 번 들어오면 마지막 벡터만 유지
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(ids.size - 1 - last)
+            ids, vectors = ids[keep], vectors[keep]
+        with self._lock:
+            # 스냅샷에 있던 행이 갱신되면 base에서 가리고 tail에 새 벡터를 둠
+            self._retire_base(ids)
+            new_mask = np.array([int(i) not in self._positions for i in ids], dtype=bool)
+            for consultation_id, vector in zip(ids[~new_mask], vectors[~new_mask]):
+                self._vectors[self._positions[int(consultation_id)]] = vector
+
+            new_ids, new_vectors = ids[new_mask], vectors[new_mask]
+            if len(new_ids) == 0:
+                return
+            self._ensure_capacity(self._size + len(new_ids))
+            start, end = self._size, self._size + len(new_ids)
+            self._vectors[start:end] = new_vectors
+            self._ids[start:end] = new_ids
+            for offset, consultation_id in enumerate(new_ids.tolist()):
+                self._positions[consultation_id] = start + offset
+            self._size = end
+
+    def upsert(self, consultation_id: int, vector) -> None:
+        """Insert a row or overwrite its vector in place."""
+        self.add_many([consultation_id], np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def remove(self, consultation_id: int) -> bool:
+        """Remove a row by moving the last row into its slot."""
+        with self._lock:
+            position = self._positions.pop(consultation_id, None)
+            if position is None:
+                base_position = self._base_position(consultation_id)
+                if base_position is None:
+                    return False
+                self._base_alive[base_position] = False
+                return True
+            last = self._size - 1
+            if position != last:
+                self._vectors[position] = self._vectors[last]
+                self._ids[position] = self._ids[last]
+                self._positions[int(self._ids[position])] = position
+            self._size = last
+            return True
+
+    def search(
+        self,
+        query_embedding,
+        limit: int = 10,
+        skip: int = 0,
+        similarity_threshold: float = 0.0,
+        allowed_ids=None,
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """Return the requested page of (id, similarity) pairs and the total hit count.
+
+        With `allowed_ids`, only those rows are scored, so a restrictive filter
+        shrinks the scan instead of emptying the page.
+        """
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))[0]
+        with self._lock:
+            if allowed_ids is not None:
+                ids, vectors = self._gather(allowed_ids)
+                return self._page(ids, vectors @ query, limit, skip, similarity_threshold)
+            scores = self._vectors[:self._size] @ query
+            ids = self._ids[:self._size].copy()
+            if len(self._base_ids):
+                base_scores = self._base_vectors @ query
+                base_scores[~self._base_alive] = -np.inf
+                scores = np.concatenate([base_scores, scores])
+                ids = np.concatenate([self._base_ids, ids])
+        return self._page(ids, scores, limit, skip, similarity_threshold)
+
+    def search_many(
+        self,
+        query_embeddings,
+        limits: Sequence[int],
+        similarity_thresholds: Sequence[float],
+    ) -> List[Tuple[List[Tuple[int, float]], int]]:
+        """Search several queries in one pass over the matrix; return (hits, total) per query."""
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32).reshape(len(limits), self.dimension))
+        top = BatchTopK(limits, similarity_thresholds)
+        with self._lock:
+            segments = [(self._ids[:self._size], self._vectors[:self._size], None)]
+            if len(self._base_ids):
+                segments.insert(0, (self._base_ids, self._base_vectors, self._base_alive))
+            for ids, vectors, alive in segments:
+                for start in range(0, len(ids), BATCH_SCAN_BLOCK_ROWS):
+                    end = start + BATCH_SCAN_BLOCK_ROWS
+                    # 행렬-행렬 곱 한 번으로 블록의 모든 쿼리 점수를 계산
+                    scores = vectors[start:end] @ queries.T
+                    if alive is not None:
+                        scores[~alive[start:end]] = -np.inf
+                    top.add(np.asarray(ids[start:end]), scores)
+        return top.results()
+
+    def _gather(self, allowed_ids) -> Tuple[np.ndarray, np.ndarray]:
+        # 허용된 id의 행만 tail과 base 세그먼트에서 모음 (갱신된 base 행은 이미 가려져 있음)
+        allowed = np.unique(np.asarray(list(allowed_ids), dtype=np.int64))
+        tail = np.array([self._positions[i] for i in allowed.tolist() if i in self._positions], dtype=np.int64)
+        ids, vectors = [self._ids[tail]], [self._vectors[tail]]
+        if len(self._base_ids) and len(allowed):
+            positions = np.searchsorted(self._base_ids, allowed)
+            positions[positions >= len(self._base_ids)] = 0
+            positions = positions[(self._base_ids[positions] == allowed) & self._base_alive[positions]]
+            ids.append(self._base_ids[positions])
+            vectors.append(self._base_vectors[positions])
+        return np.concatenate(ids), np.concatenate(vectors)
+
+    def _page(
+        self,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        limit: int,
+        skip: int,
+        similarity_threshold: float,
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        hits = np.flatnonzero(scores >= similarity_threshold)
+        total = int(hits.size)
+        k = min(skip + limit, total)
+        if k <= skip:
+            return [], total
+
+        hit_scores = scores[hits]
+        if k < total:
+            # 전체 정렬 대신 상위 k개만 부분 정렬
+            top = np.argpartition(-hit_scores, k - 1)[:k]
+        else:
+            top = np.arange(total)
+        order = top[np.argsort(-hit_scores[top], kind="stable")][skip:k]
+        return [(int(ids[hits[i]]), float(hit_scores[i])) for i in order], total
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = self._vectors.shape[0]
+        if required > capacity:
+            # 증가분을 2배씩 확보하여 append 비용을 상수 시간으로 유지
+            self.reserve(max(required, capacity * 2))
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -0,0 +1,95 @@
+"""Passage splitting and per-consultation aggregation of passage scores."""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# 상담별 구간 점수 집계 방식
+PASSAGE_AGGREGATIONS = ("max", "mean_top_n")
+# 구간 경계로 선호하는 문장 끝 문자
+SENTENCE_ENDINGS = (".", "!", "?", "。", "\n")
+
+
+def split_passages(text: str, max_chars: int = 400, overlap_chars: int = 80) -> List[Tuple[int, int]]:
+    """Split `text` into overlapping (start, end) character windows.
+
+    Windows are at most `max_chars` long and end at a sentence ending (or a
+    space) in their second half when there is one; consecutive windows share
+    about `overlap_chars` characters. Text no longer than `max_chars` is one
+    window.
+    """
+    length = len(text)
+    if length <= max_chars:
+        return [(0, length)]
+    overlap = max(min(overlap_chars, max_chars // 2), 0)
+    spans = []
+    start = 0
+    while True:
+        end = min(start + max_chars, length)
+        if end < length:
+            # 창 뒷부분의 마지막 문장 끝(없으면 공백)에서 자름
+            floor = start + max_chars // 2
+            cut = max(text.rfind(ending, floor, end) for ending in SENTENCE_ENDINGS)
+            if cut == -1:
+                cut = text.rfind(" ", floor, end)
+            if cut != -1:
+                end = cut + 1
+        spans.append((start, end))
+        if end >= length:
+            return spans
+        next_start = max(end - overlap, start + 1)
+        # 겹치는 구간이 단어 중간에서 시작하지 않도록 다음 공백 뒤로 이동
+        space = text.find(" ", next_start, end)
+        if overlap and space != -1:
+            next_start = space + 1
+        start = next_start
+
+
+def aggregate_passage_scores(
+    consultation_ids: np.ndarray,
+    scores: np.ndarray,
+    aggregation: str = "max",
+    top_n: int = 3,
+) -> Dict[int, Tuple[float, int]]:
+    """Aggregate passage similarities per consultation.
+
+    Returns {consultation_id: (score, index of the best passage)} where score
+    is the best passage similarity ("max") or the mean of the `top_n` best
+    ("mean_top_n").
+    """
+    if aggregation not in PASSAGE_AGGREGATIONS:
+        raise ValueError(f"지원하지 않는 구간 점수 집계 방식입니다: {aggregation}")
+    if len(consultation_ids) == 0:
+        return {}
+    # 상담 id 오름차순, 같은 상담 안에서는 점수 내림차순
+    order = np.lexsort((-scores, consultation_ids))
+    sorted_ids = consultation_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    aggregated = {}
+    for start, end in zip(starts, ends):
+        best = order[start]
+        if aggregation == "max":
+            score = float(scores[best])
+        else:
+            score = float(scores[order[start:min(end, start + top_n)]].mean())
+        aggregated[int(sorted_ids[start])] = (score, int(best))
+    return aggregated
+
+
+def rank_aggregated(
+    aggregated: Dict[int, Tuple[float, int]],
+    similarity_threshold: float,
+) -> List[Tuple[int, float, int]]:
+    """(consultation_id, score, best passage index) above the threshold, best first."""
+    hits = [
+        (consultation_id, score, best)
+        for consultation_id, (score, best) in aggregated.items()
+        if score >= similarity_threshold
+    ]
+    hits.sort(key=lambda hit: (-hit[1], hit[0]))
+    return hits
+
+
+def snippet(text: str, span: Sequence[int]) -> str:
+    start, end = span
+    return text[start:end].strip()
@@ -0,0 +1,151 @@
+"""Compact id -> position map for the in-process indexes."""
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# 최근 변경을 모아두는 dict를 정렬 배열에 합치는 최소 크기
+MERGE_MIN_ENTRIES = 4096
+# dict 항목 하나의 대략적인 크기 (해시 슬롯 + int 객체 두 개)
+PENDING_ENTRY_BYTES = 100
+_REMOVED = -1
+
+
+def _lookup(keys: np.ndarray, values: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # (값, 찾음 여부): keys는 오름차순
+    if len(keys) == 0:
+        return np.full(len(query), _REMOVED, dtype=np.int64), np.zeros(len(query), dtype=bool)
+    index = np.searchsorted(keys, query)
+    index[index >= len(keys)] = 0
+    found = keys[index] == query
+    return np.where(found, values[index], _REMOVED), found
+
+
+class PositionMap:
+    """Map consultation ids to non-negative int64 positions without a Python object per row.
+
+    Entries live in sorted `keys`/`values` arrays (ENTRY_BYTES per id) and are
+    found with `searchsorted`. Changes that are small next to the arrays go to
+    a dict that is merged into them once it outgrows 1/64 of their size, so
+    upserts stay cheap while bulk loads are merged in one linear pass.
+    """
+
+    ENTRY_BYTES = 16
+
+    def __init__(self):
+        self._keys = np.empty(0, dtype=np.int64)
+        self._values = np.empty(0, dtype=np.int64)
+        # 최근 변경 (값이 _REMOVED면 삭제)
+        self._pending: Dict[int, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: int) -> bool:
+        return self.get(key) is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the sorted arrays plus an estimate for the pending dict."""
+        return self._keys.nbytes + self._values.nbytes + len(self._pending) * PENDING_ENTRY_BYTES
+
+    def get(self, key: int, default: Optional[int] = None) -> Optional[int]:
+        value = self._pending.get(key)
+        if value is None:
+            index = int(self._keys.searchsorted(key))
+            if index < len(self._keys) and self._keys[index] == key:
+                value = int(self._values[index])
+        return default if value is None or value == _REMOVED else value
+
+    def __setitem__(self, key: int, value: int) -> None:
+        if self.get(key) is None:
+            self._size += 1
+        self._pending[key] = value
+        self._maybe_merge()
+
+    def pop(self, key: int, default: Optional[int] = None) -> Optional[int]:
+        value = self.get(key)
+        if value is None:
+            return default
+        self._pending[key] = _REMOVED
+        self._size -= 1
+        self._maybe_merge()
+        return value
+
+    def get_many(self, keys) -> np.ndarray:
+        """Positions of `keys` (-1 where missing)."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(keys) < len(self._pending):
+            # 최근 변경 dict를 배열로 바꾸는 것보다 몇 개만 직접 찾는 편이 빠름
+            return np.array([self.get(key, _REMOVED) for key in keys.tolist()], dtype=np.int64)
+        values, _ = _lookup(self._keys, self._values, keys)
+        if self._pending:
+            pending_keys, pending_values = self._pending_arrays()
+            recent, found = _lookup(pending_keys, pending_values, keys)
+            values[found] = recent[found]
+        return values
+
+    def set_many(self, keys: Iterable[int], values) -> None:
+        """Insert or overwrite many entries (the last value wins for repeated keys)."""
+        keys = np.asarray(keys if isinstance(keys, np.ndarray) else list(keys), dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        if self._prefers_pending(len(keys)):
+            for key, value in zip(keys.tolist(), values.tolist()):
+                self[key] = value
+            return
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = len(keys) - 1 - last
+        self._merge()
+        self._combine(keys[keep], values[keep])
+
+    def remove_many(self, keys) -> None:
+        """Remove many entries; missing keys are ignored."""
+        keys = np.unique(np.asarray(keys, dtype=np.int64))
+        keys = keys[self.get_many(keys) != _REMOVED]
+        if self._prefers_pending(len(keys)):
+            for key in keys.tolist():
+                self.pop(key)
+            return
+        self._merge()
+        self._combine(keys, np.full(len(keys), _REMOVED, dtype=np.int64))
+
+    def ids(self) -> np.ndarray:
+        """All mapped ids in ascending order (merges pending changes)."""
+        self._merge()
+        return self._keys.copy()
+
+    def _pending_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        keys = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        values = np.fromiter(self._pending.values(), dtype=np.int64, count=len(self._pending))
+        order = np.argsort(keys)
+        return keys[order], values[order]
+
+    def _prefers_pending(self, count: int) -> bool:
+        # 배열 크기에 비해 작은 변경만 dict에 모으고, 큰 배치는 바로 배열에 합침 (선형 시간)
+        return count <= MERGE_MIN_ENTRIES and count * 64 < len(self._keys)
+
+    def _maybe_merge(self) -> None:
+        if len(self._pending) > max(MERGE_MIN_ENTRIES, len(self._keys) >> 6):
+            self._merge()
+
+    def _merge(self) -> None:
+        if self._pending:
+            keys, values = self._pending_arrays()
+            self._pending = {}
+            self._combine(keys, values)
+
+    def _combine(self, keys: np.ndarray, values: np.ndarray) -> None:
+        # keys는 오름차순이고 중복 없음: 기존 키는 제자리에서 갱신하고 새 키만 끼워 넣음 (선형 시간)
+        index = np.searchsorted(self._keys, keys)
+        found = np.zeros(len(keys), dtype=bool)
+        inside = index < len(self._keys)
+        found[inside] = self._keys[index[inside]] == keys[inside]
+        self._values[index[found]] = values[found]
+        added = ~found
+        merged_keys = np.insert(self._keys, index[added], keys[added])
+        merged_values = np.insert(self._values, index[added], values[added])
+        live = merged_values != _REMOVED
+        if not live.all():
+            merged_keys, merged_values = merged_keys[live], merged_values[live]
+        self._keys, self._values = merged_keys, merged_values
+        self._size = len(self._keys)
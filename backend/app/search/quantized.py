@@ -0,0 +1,256 @@
+"""Quantized in-process vector scan (int8) for coarse candidate search."""
+import threading
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.search.positions import PositionMap
+from app.search.topk import BATCH_SCAN_BLOCK_ROWS, BatchTopK
+
+# float16은 numpy의 float32 변환이 float32 스캔보다 느려 제외 (benchmarks quantized-scan 참고)
+QUANTIZATION_MODES = ("int8",)
+# 스캔 시 float32로 복원하는 블록 크기 (1024차원 기준 1MB, L2 캐시에 머무는 크기)
+SCAN_BLOCK_ROWS = 256
+# 이보다 적은 행은 한 행씩 마지막 행과 바꿔 삭제하고, 많으면 배열을 한 번에 압축
+BULK_REMOVE_MIN_ROWS = 256
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize each vector to int8 codes with its own scale (max |x| / 127)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedVectorIndex:
+    """Compact corpus matrix used for the first stage of a two-stage search.
+
+    Vectors are L2-normalized and stored as per-vector scaled int8 (1/4 of
+    float32). Scans widen SCAN_BLOCK_ROWS rows at a time into one reused
+    float32 buffer, so reading the corpus costs a quarter of the float32
+    memory traffic. `search_candidates` returns the coarse top candidates;
+    callers rerank them exactly.
+    """
+
+    def __init__(self, dimension: int, mode: str = "int8", initial_capacity: int = 1024):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"지원하지 않는 양자화 모드입니다: {mode}")
+        self.dimension = dimension
+        self.mode = mode
+        capacity = max(initial_capacity, 1)
+        self._codes = np.empty((capacity, dimension), dtype=np.int8)
+        self._scales = np.empty(capacity, dtype=np.float32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        # 블록 복원용 버퍼 (스캔은 self._lock 안에서만 사용)
+        self._buffer = np.empty((SCAN_BLOCK_ROWS, dimension), dtype=np.float32)
+        self._size = 0
+        self._positions = PositionMap()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, consultation_id: int) -> bool:
+        return consultation_id in self._positions
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by codes, scales, ids and the id map (including spare capacity)."""
+        return self._codes.nbytes + self._scales.nbytes + self._ids.nbytes + self._positions.nbytes
+
+    def memory_footprint(self) -> dict:
+        """Report memory use against the float32 equivalent."""
+        # 코드 + id + scale + id -> 위치 맵
+        row_bytes = self._codes.itemsize * self.dimension + 8 + 4
+        bytes_per_vector = row_bytes + PositionMap.ENTRY_BYTES
+        float32_bytes = self._size * (4 * self.dimension + 8)
+        used_bytes = self._size * row_bytes + self._positions.nbytes
+        return {
+            "mode": self.mode,
+            "vectors": self._size,
+            "bytes_per_vector": bytes_per_vector,
+            "used_bytes": used_bytes,
+            "allocated_bytes": self.nbytes,
+            "float32_equivalent_bytes": float32_bytes,
+            "compression_ratio": round(float32_bytes / used_bytes, 2) if used_bytes else None,
+        }
+
+    def reserve(self, capacity: int) -> None:
+        """Grow the backing arrays so that `capacity` rows fit without reallocation."""
+        with self._lock:
+            if capacity <= self._codes.shape[0]:
+                return
+            codes = np.empty((capacity, self.dimension), dtype=self._codes.dtype)
+            ids = np.empty(capacity, dtype=np.int64)
+            scales = np.empty(capacity, dtype=np.float32)
+            codes[:self._size] = self._codes[:self._size]
+            scales[:self._size] = self._scales[:self._size]
+            ids[:self._size] = self._ids[:self._size]
+            self._codes, self._scales, self._ids = codes, scales, ids
+
+    def add_many(self, ids: Iterable[int], vectors) -> None:
+        """Quantize and append or overwrite many rows at once."""
+        ids = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        if np.unique(ids).size != ids.size:
+            # 같은 id가 여러 번 들어오면 마지막 벡터만 유지
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(ids.size - 1 - last)
+            ids, vectors = ids[keep], vectors[keep]
+
+        codes, scales = quantize_int8(vectors)
+
+        with self._lock:
+            positions = self._positions.get_many(ids)
+            new = positions < 0
+            added = int(new.sum())
+            if added:
+                if self._size + added > self._codes.shape[0]:
+                    self.reserve(max(self._size * 2, self._size + added))
+                positions[new] = np.arange(self._size, self._size + added)
+                self._ids[positions[new]] = ids[new]
+                self._positions.set_many(ids[new], positions[new])
+                self._size += added
+            self._codes[positions] = codes
+            self._scales[positions] = scales
+
+    def upsert(self, consultation_id: int, vector) -> None:
+        """Insert a row or overwrite its codes in place."""
+        self.add_many([consultation_id], np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def remove(self, consultation_id: int) -> bool:
+        """Remove a row by moving the last row into its slot."""
+        with self._lock:
+            position = self._positions.pop(consultation_id)
+            if position is None:
+                return False
+            last = self._size - 1
+            if position != last:
+                self._codes[position] = self._codes[last]
+                self._scales[position] = self._scales[last]
+                self._ids[position] = self._ids[last]
+                self._positions[int(self._ids[position])] = position
+            self._size = last
+            return True
+
+    def retain_only(self, existing_ids) -> int:
+        """Remove rows whose id is no longer present; return how many were dropped."""
+        existing = np.asarray(list(existing_ids), dtype=np.int64)
+        with self._lock:
+            ids = self._ids[:self._size]
+            stale = ~np.isin(ids, existing)
+            dropped = int(stale.sum())
+            if dropped < BULK_REMOVE_MIN_ROWS:
+                for consultation_id in ids[stale].tolist():
+                    self.remove(consultation_id)
+                return dropped
+            # 남는 행을 앞으로 모으고, 위치가 바뀐 행만 위치 맵을 갱신
+            self._positions.remove_many(ids[stale])
+            kept = self._size - dropped
+            moved = np.flatnonzero(~stale)
+            self._codes[:kept] = self._codes[moved]
+            self._scales[:kept] = self._scales[:self._size][moved]
+            self._ids[:kept] = ids[moved]
+            self._size = kept
+            changed = moved != np.arange(kept)
+            self._positions.set_many(self._ids[:kept][changed], np.flatnonzero(changed))
+            return dropped
+
+    def _widened_blocks(self, positions=None):
+        # (start, end, float32 블록) 순회; 블록은 공유 버퍼이므로 다음 블록 전에 소비해야 함
+        count = self._size if positions is None else len(positions)
+        for start in range(0, count, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, count)
+            rows = slice(start, end) if positions is None else positions[start:end]
+            block = self._buffer[:end - start]
+            np.copyto(block, self._codes[rows], casting="unsafe")
+            yield start, end, block
+
+    def scores(self, query_embedding, allowed_ids=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate cosine similarity of the query against every row (or only `allowed_ids`)."""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self._lock:
+            positions = None
+            if allowed_ids is not None:
+                # 허용된 행만 채점하므로 필터가 좁을수록 스캔이 작아짐
+                positions = self._positions.get_many(np.unique(np.asarray(list(allowed_ids), dtype=np.int64)))
+                positions = positions[positions >= 0]
+            rows = slice(0, self._size) if positions is None else positions
+            ids = self._ids[rows].copy()
+            scores = np.empty(len(ids), dtype=np.float32)
+            for start, end, block in self._widened_blocks(positions):
+                np.dot(block, query, out=scores[start:end])
+            scores *= self._scales[rows]
+        return ids, scores
+
+    def search_candidates(
+        self,
+        query_embedding,
+        candidates: int,
+        similarity_threshold: float = 0.0,
+        slack: float = 0.0,
+        allowed_ids=None,
+    ) -> Tuple[np.ndarray, int]:
+        """Return up to `candidates` coarse top ids (best first) and the coarse hit count.
+
+        Candidates are taken down to `similarity_threshold - slack` so that rows
+        whose quantization error pushed them just below the threshold still
+        reach the exact rerank; the hit count uses the threshold itself.
+        With `allowed_ids`, only those rows are scored.
+        """
+        ids, scores = self.scores(query_embedding, allowed_ids)
+        total = int(np.count_nonzero(scores >= similarity_threshold))
+        hits = np.flatnonzero(scores >= similarity_threshold - slack)
+        k = min(candidates, hits.size)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), total
+
+        hit_scores = scores[hits]
+        top = np.argpartition(-hit_scores, k - 1)[:k] if k < hits.size else np.arange(hits.size)
+        top = top[np.argsort(-hit_scores[top], kind="stable")]
+        return ids[hits[top]], total
+
+    def search_candidates_many(
+        self,
+        query_embeddings,
+        candidates: Sequence[int],
+        similarity_thresholds: Sequence[float],
+        slack: float = 0.0,
+    ) -> List[Tuple[np.ndarray, int]]:
+        """`search_candidates` for several queries in one blockwise pass over the codes."""
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(candidates), self.dimension)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+
+        top = BatchTopK(
+            candidates,
+            keep_thresholds=[threshold - slack for threshold in similarity_thresholds],
+            count_thresholds=similarity_thresholds,
+        )
+        with self._lock:
+            # 복원 블록 점수를 청크에 모아 BatchTopK 병합 횟수를 줄임
+            chunk_rows = max(BATCH_SCAN_BLOCK_ROWS // SCAN_BLOCK_ROWS, 1) * SCAN_BLOCK_ROWS
+            scores = np.empty((min(chunk_rows, self._size), len(queries)), dtype=np.float32)
+            chunk_start = 0
+            for start, end, block in self._widened_blocks():
+                np.dot(block, queries.T, out=scores[start - chunk_start:end - chunk_start])
+                if end - chunk_start == len(scores) or end == self._size:
+                    filled = scores[:end - chunk_start]
+                    filled *= self._scales[chunk_start:end, None]
+                    top.add(self._ids[chunk_start:end], filled)
+                    chunk_start = end
+        return [
+            (np.array([consultation_id for consultation_id, _ in hits], dtype=np.int64), total)
+            for hits, total in top.results()
+        ]
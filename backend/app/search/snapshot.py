@@ -0,0 +1,227 @@
+"""Memory-mapped embedding snapshot files.
+
+Layout (little-endian)::
+
+    [header, HEADER_SIZE bytes]
+    [ids:     count x int64, sorted ascending]        at ids_offset
+    [vectors: count x dimension x float32, L2-normed] at vectors_offset
+
+Workers open the file with ``np.memmap`` in read-only mode, so the OS page
+cache keeps one copy shared by every process on the node.
+"""
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Consultation
+
+SNAPSHOT_MAGIC = b"VSNAPSHT"
+SNAPSHOT_VERSION = 1
+HEADER_SIZE = 4096
+# magic, version, dimension, count, ids_offset, vectors_offset, has_high_water_mark, high_water_mark(us)
+_HEADER_FORMAT = "<8sIIQQQBq"
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass
+class EmbeddingSnapshot:
+    """A read-only, memory-mapped embedding snapshot."""
+
+    path: Path
+    dimension: int
+    ids: np.ndarray
+    vectors: np.ndarray
+    high_water_mark: Optional[datetime]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _align(value: int, alignment: int = HEADER_SIZE) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def _to_microseconds(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _layout(count: int, dimension: int):
+    ids_offset = HEADER_SIZE
+    vectors_offset = ids_offset + _align(count * 8)
+    return ids_offset, vectors_offset, vectors_offset + count * dimension * 4
+
+
+def _pack_header(dimension: int, count: int, ids_offset: int, vectors_offset: int,
+                 high_water_mark: Optional[datetime]) -> bytes:
+    header = struct.pack(
+        _HEADER_FORMAT,
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        dimension,
+        count,
+        ids_offset,
+        vectors_offset,
+        high_water_mark is not None,
+        _to_microseconds(high_water_mark) if high_water_mark is not None else 0,
+    )
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _SnapshotWriter:
+    """Write rows into a temporary file, then atomically replace the target."""
+
+    def __init__(self, path: Union[str, Path], dimension: int, capacity: int):
+        self.path = Path(path)
+        self.dimension = dimension
+        self.capacity = capacity
+        self.count = 0
+        self.high_water_mark: Optional[datetime] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+
+        self._ids_offset, self._vectors_offset, size = _layout(capacity, dimension)
+        with open(self._tmp_path, "wb") as f:
+            f.truncate(size)
+        if capacity == 0:
+            self._ids = np.empty(0, dtype=np.int64)
+            self._vectors = np.empty((0, dimension), dtype=np.float32)
+        else:
+            self._ids = np.memmap(self._tmp_path, dtype=np.int64, mode="r+",
+                                  offset=self._ids_offset, shape=(capacity,))
+            self._vectors = np.memmap(self._tmp_path, dtype=np.float32, mode="r+",
+                                      offset=self._vectors_offset, shape=(capacity, dimension))
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        end = self.count + len(ids)
+        if end > self.capacity:
+            raise ValueError("스냅샷 용량을 초과했습니다")
+        self._ids[self.count:end] = ids
+        self._vectors[self.count:end] = _normalize(np.asarray(vectors, dtype=np.float32))
+        self.count = end
+
+    def commit(self) -> Path:
+        ids = np.asarray(self._ids[:self.count])
+        if np.any(ids[1:] < ids[:-1]):
+            raise ValueError("스냅샷 id는 오름차순이어야 합니다")
+        for block in (self._ids, self._vectors):
+            if isinstance(block, np.memmap):
+                block.flush()
+        del self._ids, self._vectors
+
+        with open(self._tmp_path, "r+b") as f:
+            f.write(_pack_header(self.dimension, self.count, self._ids_offset,
+                                 self._vectors_offset, self.high_water_mark))
+            f.flush()
+            os.fsync(f.fileno())
+        # 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 원자적으로 교체
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def write_snapshot(
+    path: Union[str, Path],
+    ids,
+    vectors,
+    high_water_mark: Optional[datetime] = None,
+) -> Path:
+    """Write ids and vectors to a snapshot file."""
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors.reshape(len(ids), vectors.shape[-1] if vectors.ndim > 1 else -1)
+    order = np.argsort(ids, kind="stable")
+
+    writer = _SnapshotWriter(path, vectors.shape[1], len(ids))
+    try:
+        writer.append(ids[order], vectors[order])
+        writer.high_water_mark = high_water_mark
+        return writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def load_snapshot(path: Union[str, Path]) -> EmbeddingSnapshot:
+    """Open a snapshot file as read-only memory maps."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        header = f.read(struct.calcsize(_HEADER_FORMAT))
+    if len(header) < struct.calcsize(_HEADER_FORMAT):
+        raise ValueError(f"스냅샷 헤더가 손상되었습니다: {path}")
+
+    (magic, version, dimension, count, ids_offset, vectors_offset,
+     has_high_water_mark, high_water_us) = struct.unpack(_HEADER_FORMAT, header)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"스냅샷 파일이 아닙니다: {path}")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 버전입니다: {version}")
+    if path.stat().st_size < vectors_offset + count * dimension * 4:
+        raise ValueError(f"스냅샷 파일이 잘려 있습니다: {path}")
+
+    if count == 0:
+        ids = np.empty(0, dtype=np.int64)
+        vectors = np.empty((0, dimension), dtype=np.float32)
+    else:
+        ids = np.memmap(path, dtype=np.int64, mode="r", offset=ids_offset, shape=(count,))
+        vectors = np.memmap(path, dtype=np.float32, mode="r", offset=vectors_offset, shape=(count, dimension))
+
+    high_water_mark = _EPOCH + timedelta(microseconds=high_water_us) if has_high_water_mark else None
+    return EmbeddingSnapshot(path=path, dimension=dimension, ids=ids, vectors=vectors,
+                             high_water_mark=high_water_mark)
+
+
+async def build_snapshot(
+    db: AsyncSession,
+    path: Union[str, Path],
+    dimension: int,
+    chunk_size: int = 10000,
+) -> EmbeddingSnapshot:
+    """Stream the consultations table into a new snapshot file."""
+    max_id, capacity = (await db.execute(
+        select(func.max(Consultation.id), func.count())
+        .where(Consultation.embedding.isnot(None))
+    )).one()
+
+    writer = _SnapshotWriter(path, dimension, capacity or 0)
+    try:
+        if max_id is not None:
+            # 빌드 중 추가된 행은 제외 (이후 high-water mark 재생으로 반영)
+            result = await db.stream(
+                select(Consultation.id, Consultation.embedding, Consultation.updated_at)
+                .where(Consultation.embedding.isnot(None), Consultation.id <= max_id)
+                .order_by(Consultation.id)
+                .execution_options(yield_per=chunk_size)
+            )
+            async for rows in result.partitions():
+                rows = rows[:writer.capacity - writer.count]
+                if not rows:
+                    break
+                writer.append(
+                    np.array([row.id for row in rows], dtype=np.int64),
+                    np.array([row.embedding for row in rows], dtype=np.float32),
+                )
+                latest = max((row.updated_at for row in rows if row.updated_at is not None), default=None)
+                if latest is not None and (writer.high_water_mark is None or latest > writer.high_water_mark):
+                    writer.high_water_mark = latest
+        writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+    return load_snapshot(path)
@@ -0,0 +1,51 @@
+"""Per-query top-k accumulation for multi-query scans."""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 다중 쿼리 스캔 시 한 번에 곱하는 행 수 (블록 점수 행렬 메모리 상한)
+BATCH_SCAN_BLOCK_ROWS = 16384
+
+
+class BatchTopK:
+    """Collect the best `limits[i]` hits of each query while scanning blocks of rows.
+
+    Each block contributes a (rows x queries) score matrix. Hits are rows
+    scoring at least `keep_thresholds[i]`; `totals[i]` counts rows scoring at
+    least `count_thresholds[i]` (defaults to the keep thresholds).
+    """
+
+    def __init__(
+        self,
+        limits: Sequence[int],
+        keep_thresholds: Sequence[float],
+        count_thresholds: Optional[Sequence[float]] = None,
+    ):
+        self.limits = list(limits)
+        self.keep_thresholds = list(keep_thresholds)
+        self.count_thresholds = list(count_thresholds if count_thresholds is not None else keep_thresholds)
+        self.totals = [0] * len(self.limits)
+        self._ids: List[List[np.ndarray]] = [[] for _ in self.limits]
+        self._scores: List[List[np.ndarray]] = [[] for _ in self.limits]
+
+    def add(self, ids: np.ndarray, block_scores: np.ndarray) -> None:
+        """Merge one scanned block; `block_scores` has shape (len(ids), len(limits))."""
+        for column, limit in enumerate(self.limits):
+            scores = block_scores[:, column]
+            self.totals[column] += int(np.count_nonzero(scores >= self.count_thresholds[column]))
+            hits = np.flatnonzero(scores >= self.keep_thresholds[column])
+            if hits.size > limit:
+                # 블록마다 상위 limit개만 남겨 누적 메모리를 제한
+                hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+            self._ids[column].append(ids[hits])
+            self._scores[column].append(scores[hits])
+
+    def results(self) -> List[Tuple[List[Tuple[int, float]], int]]:
+        """Return ([(id, score)] best first, total) for each query."""
+        results = []
+        for column, limit in enumerate(self.limits):
+            ids = np.concatenate(self._ids[column]) if self._ids[column] else np.empty(0, dtype=np.int64)
+            scores = np.concatenate(self._scores[column]) if self._scores[column] else np.empty(0, dtype=np.float32)
+            order = np.argsort(-scores, kind="stable")[:limit]
+            results.append(([(int(ids[i]), float(scores[i])) for i in order], self.totals[column]))
+        return results
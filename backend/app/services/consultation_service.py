@@ -1,26 +1,279 @@
 """Consultation service for business logic."""
-from typing import List, Optional
+import asyncio
+import logging
+import time
+import numpy as np
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Consultation
-from app.schemas import ConsultationCreate, ConsultationUpdate
+from app.core.config import settings
+from app.core.metrics import record_rows_scanned, request_rows_scanned, request_timings, stage
+from app.db.explain import plan_rows_scanned
+from app.db.session import AsyncSessionLocal
+from app.db.vector_index import bulk_load_index_action
+from app.models import Consultation, EMBEDDING_STATUS_PENDING
+from app.schemas import BatchSearchQuery, ConsultationCreate, ConsultationUpdate, SearchFilters
+from app.search import (
+    PASSAGE_AGGREGATIONS,
+    InMemoryVectorIndex,
+    IVFPQIndex,
+    QuantizedVectorIndex,
+    EmbeddingSnapshot,
+    SearchCursorStore,
+    load_snapshot,
+)
+from app.search.passages import snippet
+from app.services.embedding_cache import normalize_query
 from app.services.embedding_service import embedding_service
+from app.services.ingestion_service import ingestion_service
 from app import crud
 
+logger = logging.getLogger(__name__)
+
+# 프로세스 내에서 벡터를 보관하고 검색하는 모드
+IN_PROCESS_SEARCH_MODES = ("memory", "quantized", "ivfpq")
+# 스냅샷에서 압축 인덱스를 만들 때 한 번에 읽는 행 수
+SNAPSHOT_LOAD_CHUNK_ROWS = 65536
+
+# 검색 진단에서 보고하는 검색 모드별 실행 전략
+SEARCH_STRATEGIES = {
+    "python": "python_scan",
+    "pgvector": "pgvector",
+    "memory": "memory_index",
+    "quantized": "quantized_index",
+    "ivfpq": "ivfpq_index",
+}
+# 임계값 분석에서 유사도를 보고하는 순위
+EXPLAIN_SIMILARITY_RANKS = (1, 10, 100, 1000)
+
+VectorIndex = Union[InMemoryVectorIndex, QuantizedVectorIndex, IVFPQIndex]
+
 
 class ConsultationService:
     """Service for consultation business logic."""
     
     def __init__(self):
         self.embedding_service = embedding_service
+        self.vector_index: Optional[VectorIndex] = None
+        self._index_load_lock = asyncio.Lock()
+        # 인덱스에 반영된 마지막 updated_at과 주기적 갱신 작업 (다른 워커의 쓰기 반영)
+        self._index_watermark: Optional[datetime] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.search_cursors = SearchCursorStore(
+            ttl_seconds=settings.SEARCH_CURSOR_TTL_SECONDS,
+            max_entries=settings.SEARCH_CURSOR_MAX_ENTRIES,
+            max_bytes=settings.SEARCH_CURSOR_MAX_BYTES
+        )
+        # async 수집 모드에서 백그라운드로 채워진 임베딩을 인덱스에 반영
+        ingestion_service.add_listener(self._on_embeddings_filled)
+    
+    def _new_vector_index(self, capacity: int) -> VectorIndex:
+        if settings.SEARCH_MODE == "quantized":
+            return QuantizedVectorIndex(
+                settings.EMBEDDING_DIMENSION, mode=settings.SEARCH_QUANTIZATION, initial_capacity=capacity
+            )
+        return InMemoryVectorIndex(settings.EMBEDDING_DIMENSION, initial_capacity=capacity)
+    
+    async def load_vector_index(self, db: AsyncSession) -> VectorIndex:
+        """Load the in-process vector index from the snapshot file or the database."""
+        # 적재 전에 읽어 두고, 적재 중 바뀐 행은 다음 갱신의 여유 구간에서 다시 읽음
+        watermark = await crud.get_latest_update(db)
+        if settings.SEARCH_MODE == "ivfpq":
+            index = await self._load_ivfpq_index(db)
+        else:
+            snapshot_path = settings.EMBEDDING_SNAPSHOT_PATH
+            if snapshot_path and Path(snapshot_path).exists():
+                index = await self._load_from_snapshot(db, load_snapshot(snapshot_path))
+            else:
+                row_count = await crud.count_embedded_consultations(db)
+                index = self._new_vector_index(row_count or 1)
+                async for ids, embeddings in crud.stream_consultation_embeddings(db):
+                    index.add_many(ids, embeddings)
+        
+        self.vector_index = index
+        self._index_watermark = watermark
+        return index
+    
+    async def refresh_vector_index(self, db: AsyncSession) -> Optional[VectorIndex]:
+        """Apply rows written or deleted by other worker processes since the last load or refresh.
+        
+        Each worker keeps its own index and only its own writes update it
+        directly, so workers call this periodically (SEARCH_INDEX_REFRESH_SECONDS).
+        """
+        index = self.vector_index
+        if index is None:
+            return None
+        watermark = await crud.get_latest_update(db)
+        await self._apply_changes(db, index, self._catch_up_since(self._index_watermark))
+        if watermark is not None:
+            self._index_watermark = watermark
+        return index
+    
+    async def start_index_refresh(self, session_factory=AsyncSessionLocal) -> None:
+        """Start the periodic refresh of the in-process index (no-op if disabled or running)."""
+        interval = settings.SEARCH_INDEX_REFRESH_SECONDS
+        if interval <= 0 or self._refresh_task is not None:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop(session_factory, interval))
+    
+    async def stop_index_refresh(self) -> None:
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        await asyncio.gather(self._refresh_task, return_exceptions=True)
+        self._refresh_task = None
+    
+    async def _refresh_loop(self, session_factory, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    await self.refresh_vector_index(db)
+            except Exception:
+                logger.exception("프로세스 내 벡터 인덱스 갱신에 실패했습니다")
+    
+    async def _apply_changes(self, db: AsyncSession, index: VectorIndex, since: Optional[datetime]) -> None:
+        # since 이후 임베딩이 바뀐 행은 덮어쓰고, 임베딩이 비워진 행(재임베딩 대기)은 제거
+        async for ids, embeddings in crud.stream_consultation_embeddings(db, updated_since=since):
+            index.add_many(ids, embeddings)
+        if since is not None:
+            for consultation_id in await crud.get_unembedded_consultation_ids(db, updated_since=since):
+                index.remove(consultation_id)
+        # 삭제된 행은 updated_at으로 알 수 없으므로 id 목록으로 정리
+        index.retain_only(await crud.get_consultation_ids(db))
+    
+    async def _load_from_snapshot(self, db: AsyncSession, snapshot: EmbeddingSnapshot) -> VectorIndex:
+        if settings.SEARCH_MODE == "quantized":
+            # 압축 행렬은 프로세스별로 만들되, DB 대신 스냅샷에서 청크 단위로 읽음
+            index = self._new_vector_index(len(snapshot) or 1)
+            for start in range(0, len(snapshot), SNAPSHOT_LOAD_CHUNK_ROWS):
+                end = start + SNAPSHOT_LOAD_CHUNK_ROWS
+                index.add_many(snapshot.ids[start:end], snapshot.vectors[start:end])
+        else:
+            # 스냅샷은 모든 워커가 memmap으로 공유하고, 이후 변경분만 DB에서 재생
+            index = InMemoryVectorIndex.from_snapshot(snapshot)
+        
+        await self._apply_changes(db, index, self._catch_up_since(snapshot.high_water_mark))
+        return index
+    
+    @staticmethod
+    def _catch_up_since(high_water_mark: Optional[datetime]) -> Optional[datetime]:
+        # updated_at(now())은 커밋이 아닌 트랜잭션 시작 시각이므로, high-water mark 이전에 시작해
+        # 이후에 커밋된 행을 놓치지 않도록 여유 구간만큼 앞에서부터 다시 읽음
+        if high_water_mark is None:
+            return None
+        return high_water_mark - timedelta(seconds=settings.SNAPSHOT_CATCHUP_WINDOW_SECONDS)
+    
+    async def _load_ivfpq_index(self, db: AsyncSession) -> IVFPQIndex:
+        index_path = Path(settings.IVFPQ_INDEX_PATH)
+        if not index_path.exists():
+            raise RuntimeError(
+                f"IVF-PQ 인덱스 파일이 없습니다: {index_path} (scripts/train_ivfpq_index.py로 학습하세요)"
+            )
+        index = IVFPQIndex.load(index_path)
+        
+        # 인덱스 저장 이후 추가/수정된 행은 재학습 없이 기존 셀에 증분 추가
+        await self._apply_changes(db, index, self._catch_up_since(index.high_water_mark))
+        return index
+    
+    @staticmethod
+    def search_total_is_estimate() -> bool:
+        """True when vector search totals only count rows in the probed IVF-PQ cells."""
+        return settings.SEARCH_MODE == "ivfpq"
+    
+    def get_vector_index_stats(self) -> dict:
+        """Report the state and memory footprint of the in-process vector index."""
+        return {
+            "search_mode": settings.SEARCH_MODE,
+            "loaded": self.vector_index is not None,
+            "memory": self.vector_index.memory_footprint() if self.vector_index is not None else None,
+        }
+    
+    async def _get_vector_index(self, db: AsyncSession) -> VectorIndex:
+        if self.vector_index is None:
+            async with self._index_load_lock:
+                if self.vector_index is None:
+                    await self.load_vector_index(db)
+        return self.vector_index
+    
+    def _sync_vector_index(self, consultation: Optional[Consultation]) -> None:
+        # 로드된 인덱스가 있을 때만 쓰기 결과를 증분 반영
+        if self.vector_index is None or consultation is None:
+            return
+        if consultation.embedding is None:
+            self.vector_index.remove(consultation.id)
+        else:
+            self.vector_index.upsert(consultation.id, consultation.embedding)
+    
+    def _on_embeddings_filled(self, consultation_ids: List[int], embeddings: List[List[float]]) -> None:
+        if self.vector_index is not None and consultation_ids:
+            self.vector_index.add_many(consultation_ids, embeddings)
+    
+    @staticmethod
+    def _defer_embedding() -> bool:
+        return settings.INGESTION_MODE == "async"
     
     async def create_consultation(
         self, 
         db: AsyncSession, 
         consultation_data: ConsultationCreate
     ) -> Consultation:
-        """Create a new consultation with embedding."""
+        """Create a new consultation with embedding (or pending embedding in async ingestion mode)."""
         # 데이터베이스에 저장 (임베딩은 crud에서 처리)
-        return await crud.create_consultation(db=db, consultation=consultation_data)
+        consultation = await crud.create_consultation(
+            db=db, consultation=consultation_data, defer_embedding=self._defer_embedding()
+        )
+        if consultation.embedding_status == EMBEDDING_STATUS_PENDING:
+            ingestion_service.enqueue([consultation.id])
+        self._sync_vector_index(consultation)
+        return consultation
+    
+    async def bulk_create_consultations(
+        self,
+        db: AsyncSession,
+        items: List[Any]
+    ) -> Tuple[List[Tuple[int, Consultation]], List[Tuple[int, List[str]]]]:
+        """Validate items individually and create the valid ones in one batch.
+        
+        Returns (index, consultation) for created items and (index, messages) for
+        items that failed validation.
+        """
+        valid: List[Tuple[int, ConsultationCreate]] = []
+        errors: List[Tuple[int, List[str]]] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, ConsultationCreate.model_validate(item)))
+            except ValidationError as e:
+                errors.append((index, [error["msg"] for error in e.errors()]))
+        if not valid:
+            return [], errors
+        
+        defer = self._defer_embedding()
+        consultations = await crud.bulk_create_consultations(
+            db, [data for _, data in valid], defer_embedding=defer
+        )
+        ready = [consultation for consultation in consultations if consultation.embedding is not None]
+        pending = [consultation.id for consultation in consultations if consultation.embedding is None]
+        ingestion_service.enqueue(pending)
+        
+        if not defer:
+            # 인덱스 재빌드는 테이블 잠금을 오래 잡으므로 요청 경로에서는 필요 여부만 알림
+            action = await bulk_load_index_action(await db.connection(), inserted_rows=len(consultations))
+            await db.commit()
+            if action is not None:
+                logger.warning(
+                    "대량 적재 후 ANN 인덱스 %s이 필요합니다: python scripts/manage_vector_index.py %s",
+                    action, action
+                )
+        
+        if self.vector_index is not None and ready:
+            self.vector_index.add_many(
+                [consultation.id for consultation in ready],
+                [consultation.embedding for consultation in ready]
+            )
+        return [(index, consultation) for (index, _), consultation in zip(valid, consultations)], errors
     
     async def update_consultation(
         self, 
@@ -30,11 +283,16 @@ class ConsultationService:
     ) -> Optional[Consultation]:
         """Update consultation with new embedding."""
         # 데이터베이스 업데이트 (임베딩은 crud에서 처리)
-        return await crud.update_consultation(
+        consultation = await crud.update_consultation(
             db=db, 
             consultation_id=consultation_id, 
-            consultation=consultation_data
+            consultation=consultation_data,
+            defer_embedding=self._defer_embedding()
         )
+        if consultation is not None and consultation.embedding_status == EMBEDDING_STATUS_PENDING:
+            ingestion_service.enqueue([consultation.id])
+        self._sync_vector_index(consultation)
+        return consultation
     
     async def get_consultation(
         self, 
@@ -53,13 +311,33 @@ class ConsultationService:
         """Get list of consultations."""
         return await crud.get_consultations(db=db, skip=skip, limit=limit)
     
+    async def get_consultations_page(
+        self,
+        db: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Consultation], Optional[str]]:
+        """Get a keyset page of consultations and the cursor for the next page."""
+        consultations = await crud.get_consultations_after(db=db, cursor=cursor, limit=limit)
+        return consultations, self.next_list_cursor(consultations, limit)
+    
+    @staticmethod
+    def next_list_cursor(consultations: List[Consultation], limit: int) -> Optional[str]:
+        # 페이지가 가득 찼을 때만 다음 페이지가 있을 수 있음
+        if not consultations or len(consultations) < limit:
+            return None
+        return crud.encode_list_cursor(consultations[-1])
+    
     async def delete_consultation(
         self, 
         db: AsyncSession, 
         consultation_id: int
     ) -> Optional[Consultation]:
         """Delete consultation."""
-        return await crud.delete_consultation(db=db, consultation_id=consultation_id)
+        consultation = await crud.delete_consultation(db=db, consultation_id=consultation_id)
+        if consultation is not None and self.vector_index is not None:
+            self.vector_index.remove(consultation.id)
+        return consultation
     
     async def search_consultations(
         self, 
@@ -67,18 +345,484 @@ class ConsultationService:
         query: str, 
         limit: int = 10,
         skip: int = 0,
-        similarity_threshold: float = 0.3
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None
     ) -> tuple[List[Consultation], int]:
         """Search consultations using vector similarity with relevance filtering."""
-        # 벡터 검색 실행 (임베딩은 crud에서 처리)
+        if settings.SEARCH_MODE in IN_PROCESS_SEARCH_MODES:
+            return await self._search_in_process(db, query, limit, skip, similarity_threshold, probes, filters)
+        
+        # 벡터 검색 실행 (임베딩은 crud에서 처리, 메타데이터 필터는 SQL로 전달)
         return await crud.search_consultations(
             db=db, 
             query=query, 
             limit=limit, 
             skip=skip,
-            similarity_threshold=similarity_threshold
+            similarity_threshold=similarity_threshold,
+            ef_search=ef_search,
+            probes=probes,
+            filters=filters
         )
-
+    
+    async def _search_in_process(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        skip: int,
+        similarity_threshold: float,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> tuple[List[Consultation], int]:
+        query_embedding = await self.embedding_service.aembed_query(query)
+        hits, total_count = await self._rank_in_process(
+            db, query_embedding, limit, skip, similarity_threshold, probes, filters
+        )
+        return await self._fetch_ranked(db, hits), total_count
+    
+    async def _rank_in_process(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        limit: int,
+        skip: int,
+        similarity_threshold: float,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        allowed_ids = None
+        if filters is not None:
+            # 필터를 통과한 id를 먼저 구하고 그 행만 채점
+            allowed_ids = await crud.get_filtered_consultation_ids(db, filters)
+            if not allowed_ids:
+                return [], 0
+        index = await self._get_vector_index(db)
+        if isinstance(index, (QuantizedVectorIndex, IVFPQIndex)):
+            candidates = (skip + limit) * settings.SEARCH_RERANK_FACTOR
+            if allowed_ids is not None and len(allowed_ids) <= candidates:
+                # 허용된 행이 재정렬 후보 수보다 적으면 압축 단계 없이 바로 정확 채점
+                return await self._rank_exact_with_total(
+                    db, query_embedding, allowed_ids, limit, skip, similarity_threshold
+                )
+            # 압축 인덱스로 후보를 고른 뒤 정확 재정렬 (IVF-PQ는 탐색 셀 수 nprobe 적용)
+            extra = {}
+            if isinstance(index, IVFPQIndex):
+                nprobe = probes or settings.IVFPQ_NPROBE
+                if allowed_ids is not None:
+                    # 필터 선택도만큼 탐색 셀을 늘려 탐색 셀 안의 허용 행 수를 유지
+                    nprobe = min(index.nlist, -(-nprobe * len(index) // len(allowed_ids)))
+                extra = {"nprobe": nprobe}
+            with stage("score", settings.SEARCH_MODE):
+                candidate_ids, total_count = index.search_candidates(
+                    query_embedding,
+                    candidates=candidates,
+                    similarity_threshold=similarity_threshold,
+                    slack=settings.SEARCH_QUANTIZATION_SLACK,
+                    allowed_ids=allowed_ids,
+                    **extra
+                )
+            record_rows_scanned(len(allowed_ids) if allowed_ids is not None else len(index), settings.SEARCH_MODE)
+            hits = await self._rerank_exact(
+                db, query_embedding, candidate_ids.tolist(), limit, skip, similarity_threshold
+            )
+            return hits, total_count
+        record_rows_scanned(len(allowed_ids) if allowed_ids is not None else len(index), settings.SEARCH_MODE)
+        with stage("score", settings.SEARCH_MODE):
+            return index.search(
+                query_embedding, limit=limit, skip=skip, similarity_threshold=similarity_threshold,
+                allowed_ids=allowed_ids
+            )
+    
+    async def _fetch_ranked(
+        self,
+        db: AsyncSession,
+        hits: List[Tuple[int, float]]
+    ) -> List[Tuple[Consultation, float]]:
+        # 해당 페이지의 행만 id로 조회하고 순위 순서를 유지 (그 사이 삭제된 행은 제외)
+        with stage("db", "fetch_page"):
+            consultations = await crud.get_consultations_by_ids(db, [consultation_id for consultation_id, _ in hits])
+        by_id = {consultation.id: consultation for consultation in consultations}
+        return [
+            (by_id[consultation_id], similarity)
+            for consultation_id, similarity in hits
+            if consultation_id in by_id
+        ]
+    
+    async def search_consultations_page(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        skip: int = 0,
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[SearchFilters] = None,
+        create_cursor: bool = False
+    ) -> Tuple[List[Tuple[Consultation, float]], int, Optional[str]]:
+        """Search one page, optionally through a search session cursor.
+        
+        Without `cursor` or `create_cursor` this is a plain page search. Otherwise
+        the first request ranks up to SEARCH_CURSOR_MAX_HITS hits and stores them
+        under a new cursor; later pages with that cursor only fetch their rows by id,
+        so the ranking stays stable while rows are inserted in between.
+        """
+        # 세션 생성은 전체 순위(최대 SEARCH_CURSOR_MAX_HITS)를 계산하므로 클라이언트가 요청할 때만 수행
+        if not settings.SEARCH_CURSOR_ENABLED or not (cursor or create_cursor):
+            results, total_count = await self.search_consultations(
+                db, query, limit, skip, similarity_threshold, ef_search, probes, filters
+            )
+            return results, total_count, None
+        
+        # 다른 검색 조건으로 커서를 재사용하지 않도록 조건 전체를 세션 키로 사용
+        key = (
+            settings.SEARCH_MODE, normalize_query(query), similarity_threshold, ef_search, probes,
+            filters.cache_key() if filters is not None else None
+        )
+        session = self.search_cursors.get(cursor, key) if cursor else None
+        if session is None:
+            query_embedding = await self.embedding_service.aembed_query(query)
+            max_hits = max(settings.SEARCH_CURSOR_MAX_HITS, skip + limit)
+            if settings.SEARCH_MODE in IN_PROCESS_SEARCH_MODES:
+                hits, total_count = await self._rank_in_process(
+                    db, query_embedding, max_hits, 0, similarity_threshold, probes, filters
+                )
+            else:
+                hits, total_count = await crud.rank_consultations_by_embedding(
+                    db, query_embedding, max_hits, similarity_threshold,
+                    ef_search=ef_search, probes=probes, filters=filters
+                )
+            cursor = self.search_cursors.create(key, hits, total_count)
+            session = self.search_cursors.get(cursor, key)
+        
+        if session.covers(skip, limit):
+            return await self._fetch_ranked(db, session.page(skip, limit)), session.total, cursor
+        
+        # 보관 범위를 넘는 깊은 페이지는 다시 검색 (전체 개수는 세션 기준 유지)
+        results, _ = await self.search_consultations(
+            db, query, limit, skip, similarity_threshold, ef_search, probes, filters
+        )
+        return results, session.total, cursor
+    
+    async def search_passages(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        skip: int = 0,
+        similarity_threshold: float = 0.3,
+        aggregation: Optional[str] = None,
+        top_n: Optional[int] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> Tuple[List[Tuple[Consultation, float, str]], int]:
+        """Search at passage level and return (consultation, score, best passage snippet)."""
+        if not settings.PASSAGE_SEARCH_ENABLED:
+            raise ValueError("구간 검색이 비활성화되어 있습니다 (PASSAGE_SEARCH_ENABLED)")
+        aggregation = aggregation or settings.PASSAGE_AGGREGATION
+        if aggregation not in PASSAGE_AGGREGATIONS:
+            raise ValueError(f"지원하지 않는 구간 점수 집계 방식입니다: {aggregation}")
+        
+        query_embedding = await self.embedding_service.aembed_query(query)
+        # 구간은 DB에만 있으므로 python 모드가 아니면 pgvector로 집계
+        results, total_count = await crud.search_passages(
+            db,
+            query_embedding,
+            limit=limit,
+            skip=skip,
+            similarity_threshold=similarity_threshold,
+            aggregation=aggregation,
+            top_n=top_n or settings.PASSAGE_TOP_N,
+            mode="python" if settings.SEARCH_MODE == "python" else "pgvector",
+            filters=filters
+        )
+        return [
+            (consultation, score, snippet(consultation.text, span))
+            for consultation, score, span in results
+        ], total_count
+    
+    async def hybrid_search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        skip: int = 0,
+        similarity_threshold: float = 0.3,
+        prefilter: bool = False,
+        filters: Optional[SearchFilters] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> Tuple[List[Tuple[Consultation, float, float]], int]:
+        """Hybrid full-text + vector search; return (consultation, similarity, fused score)."""
+        query_embedding = await self.embedding_service.aembed_query(query)
+        # 어휘 색인은 PostgreSQL에만 있으므로 검색 모드와 무관하게 SQL로 처리
+        return await crud.hybrid_search(
+            db,
+            query,
+            query_embedding,
+            limit=limit,
+            skip=skip,
+            similarity_threshold=similarity_threshold,
+            prefilter=prefilter,
+            filters=filters,
+            ef_search=ef_search,
+            probes=probes
+        )
+    
+    async def explain_search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        skip: int = 0,
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> Dict[str, Any]:
+        """Run one search page without the cursor and report how it was executed.
+        
+        Timings and scanned-vector counts cover only the search itself; the SQL
+        plan (EXPLAIN ANALYZE re-runs the page query) and the threshold analysis
+        (an unthresholded top-SEARCH_EXPLAIN_SAMPLE ranking) run afterwards.
+        """
+        mode = settings.SEARCH_MODE
+        timings: Dict[str, float] = {}
+        scanned: Dict[str, int] = {}
+        timings_token = request_timings.set(timings)
+        scanned_token = request_rows_scanned.set(scanned)
+        started = time.perf_counter()
+        try:
+            query_embedding, cache_hit = await self.embedding_service.aembed_query_with_cache_info(query)
+            if mode in IN_PROCESS_SEARCH_MODES:
+                hits, total_count = await self._rank_in_process(
+                    db, query_embedding, limit, skip, similarity_threshold, probes, filters
+                )
+                results = await self._fetch_ranked(db, hits)
+            else:
+                results, total_count = await crud.search_consultations_by_embedding(
+                    db, query_embedding, limit=limit, skip=skip, similarity_threshold=similarity_threshold,
+                    ef_search=ef_search, probes=probes, filters=filters
+                )
+            timings["total"] = time.perf_counter() - started
+        finally:
+            request_timings.reset(timings_token)
+            request_rows_scanned.reset(scanned_token)
+        # 요청 전체의 Server-Timing에도 반영
+        outer = request_timings.get()
+        if outer is not None:
+            for name, elapsed in timings.items():
+                if name != "total":
+                    outer[name] = outer.get(name, 0.0) + elapsed
+        
+        plan = None
+        if mode in IN_PROCESS_SEARCH_MODES:
+            parameters = self._in_process_parameters(probes)
+        else:
+            plan, parameters = await crud.explain_search(
+                db, query_embedding, limit=limit, skip=skip, similarity_threshold=similarity_threshold,
+                ef_search=ef_search, probes=probes, filters=filters
+            )
+            rows_scanned = plan_rows_scanned(plan)
+            if rows_scanned is not None:
+                scanned[mode] = rows_scanned
+        
+        return {
+            "strategy": SEARCH_STRATEGIES[mode],
+            "parameters": parameters,
+            "query_embedding_cache": "disabled" if cache_hit is None else ("hit" if cache_hit else "miss"),
+            "candidates_scanned": scanned,
+            "returned": len(results),
+            "total": total_count,
+            "threshold": await self._threshold_stats(
+                db, query_embedding, similarity_threshold, total_count, ef_search, probes, filters
+            ),
+            "timings_ms": {name: round(elapsed * 1000, 3) for name, elapsed in timings.items()},
+            "plan": plan,
+            "results": results,
+        }
+    
+    def _in_process_parameters(self, probes: Optional[int]) -> Dict[str, Any]:
+        parameters: Dict[str, Any] = {"index_size": len(self.vector_index) if self.vector_index is not None else 0}
+        if settings.SEARCH_MODE in ("quantized", "ivfpq"):
+            parameters["rerank_factor"] = settings.SEARCH_RERANK_FACTOR
+        if settings.SEARCH_MODE == "quantized":
+            parameters["quantization"] = settings.SEARCH_QUANTIZATION
+        if settings.SEARCH_MODE == "ivfpq":
+            parameters["nprobe"] = probes or settings.IVFPQ_NPROBE
+        return parameters
+    
+    async def _threshold_stats(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        similarity_threshold: float,
+        matched: int,
+        ef_search: Optional[int],
+        probes: Optional[int],
+        filters: Optional[SearchFilters]
+    ) -> Dict[str, Any]:
+        # 코사인 유사도는 -1 이상이므로 임계값 -1로 임계값 없는 순위를 구함
+        sample = settings.SEARCH_EXPLAIN_SAMPLE
+        if settings.SEARCH_MODE in IN_PROCESS_SEARCH_MODES:
+            hits, evaluated = await self._rank_in_process(db, query_embedding, sample, 0, -1.0, probes, filters)
+        else:
+            hits, evaluated = await crud.rank_consultations_by_embedding(
+                db, query_embedding, sample, -1.0, ef_search=ef_search, probes=probes, filters=filters
+            )
+        similarities = [similarity for _, similarity in hits]
+        return {
+            "similarity_threshold": similarity_threshold,
+            "matched": matched,
+            "evaluated": evaluated,
+            "cut": max(evaluated - matched, 0),
+            "best_similarity": similarities[0] if similarities else None,
+            "best_cut_similarity": next(
+                (similarity for similarity in similarities if similarity < similarity_threshold), None
+            ),
+            "similarity_at_rank": {
+                rank: similarities[rank - 1] for rank in EXPLAIN_SIMILARITY_RANKS if rank <= len(similarities)
+            },
+            "sample_size": len(similarities),
+        }
+    
+    async def count_pending_embeddings(self, db: AsyncSession) -> int:
+        """Number of rows excluded from search because their embedding is not ready."""
+        return await crud.count_pending_consultations(db)
+    
+    def get_search_cursor_stats(self) -> dict:
+        """Search session cursor counters."""
+        return self.search_cursors.stats()
+    
+    async def _rerank_exact(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        candidate_ids: List[int],
+        limit: int,
+        skip: int,
+        similarity_threshold: float
+    ) -> List[Tuple[int, float]]:
+        # 압축 후보를 consultations.embedding의 float32 벡터로 정확히 재채점
+        with stage("db", "rerank_fetch"):
+            rows = await crud.get_consultation_embeddings_by_ids(db, candidate_ids)
+        if not rows:
+            return []
+        ids = np.array([row.id for row in rows], dtype=np.int64)
+        vectors = np.array([row.embedding for row in rows], dtype=np.float32)
+        return self._rank_exact(ids, vectors, query_embedding, limit, skip, similarity_threshold)
+    
+    async def _rank_exact_with_total(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        consultation_ids: List[int],
+        limit: int,
+        skip: int,
+        similarity_threshold: float
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        hits = await self._rerank_exact(
+            db, query_embedding, consultation_ids, len(consultation_ids), 0, similarity_threshold
+        )
+        return hits[skip:skip + limit], len(hits)
+    
+    @staticmethod
+    def _rank_exact(
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        query_embedding: List[float],
+        limit: int,
+        skip: int,
+        similarity_threshold: float
+    ) -> List[Tuple[int, float]]:
+        record_rows_scanned(len(ids), "rerank")
+        with stage("score", "rerank"):
+            query = np.asarray(query_embedding, dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+            norms[norms == 0] = 1.0
+            similarities = (vectors @ query) / norms
+            
+            order = np.argsort(-similarities, kind="stable")
+            order = order[similarities[order] >= similarity_threshold][skip:skip + limit]
+            return [(int(ids[i]), float(similarities[i])) for i in order]
+    
+    async def search_consultations_batch(
+        self,
+        db: AsyncSession,
+        queries: List[BatchSearchQuery],
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[Tuple[List[Tuple[Consultation, float]], int]]:
+        """Search several queries with one embedding call and one ranking pass."""
+        query_embeddings = await self.embedding_service.aembed_queries([item.query for item in queries])
+        limits = [item.limit for item in queries]
+        thresholds = [item.similarity_threshold for item in queries]
+        
+        if settings.SEARCH_MODE in IN_PROCESS_SEARCH_MODES:
+            ranked = await self._rank_batch_in_process(db, query_embeddings, limits, thresholds, probes)
+        else:
+            ranked = await crud.rank_consultations_batch(
+                db, query_embeddings, limits, thresholds, ef_search=ef_search, probes=probes
+            )
+        
+        # 모든 쿼리의 결과 행을 한 번에 조회
+        all_hits = [hit for hits, _ in ranked for hit in hits]
+        with stage("db", "fetch_page"):
+            consultations = await crud.get_consultations_by_ids(
+                db, list({consultation_id for consultation_id, _ in all_hits})
+            )
+        by_id = {consultation.id: consultation for consultation in consultations}
+        return [
+            ([(by_id[consultation_id], similarity) for consultation_id, similarity in hits if consultation_id in by_id], total)
+            for hits, total in ranked
+        ]
+    
+    async def _rank_batch_in_process(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        limits: List[int],
+        thresholds: List[float],
+        probes: Optional[int] = None
+    ) -> List[Tuple[List[Tuple[int, float]], int]]:
+        index = await self._get_vector_index(db)
+        if isinstance(index, InMemoryVectorIndex):
+            with stage("score", "memory_batch"):
+                return index.search_many(query_embeddings, limits, thresholds)
+        
+        candidates = [limit * settings.SEARCH_RERANK_FACTOR for limit in limits]
+        with stage("score", f"{settings.SEARCH_MODE}_batch"):
+            if isinstance(index, QuantizedVectorIndex):
+                coarse = index.search_candidates_many(
+                    query_embeddings, candidates, thresholds, slack=settings.SEARCH_QUANTIZATION_SLACK
+                )
+            else:
+                # IVF-PQ는 쿼리마다 탐색 셀이 달라 쿼리별로 후보를 고름
+                coarse = [
+                    index.search_candidates(
+                        embedding, candidates=count, similarity_threshold=threshold,
+                        slack=settings.SEARCH_QUANTIZATION_SLACK, nprobe=probes or settings.IVFPQ_NPROBE
+                    )
+                    for embedding, count, threshold in zip(query_embeddings, candidates, thresholds)
+                ]
+        
+        # 모든 쿼리의 후보 벡터를 한 번에 조회한 뒤 쿼리별로 정확 재정렬
+        with stage("db", "rerank_fetch"):
+            rows = await crud.get_consultation_embeddings_by_ids(
+                db, list({int(i) for candidate_ids, _ in coarse for i in candidate_ids})
+            )
+        positions = {row.id: position for position, row in enumerate(rows)}
+        ids = np.array([row.id for row in rows], dtype=np.int64)
+        vectors = np.array([row.embedding for row in rows], dtype=np.float32).reshape(len(rows), -1)
+        
+        ranked = []
+        for (candidate_ids, total), embedding, limit, threshold in zip(coarse, query_embeddings, limits, thresholds):
+            selected = [positions[i] for i in candidate_ids.tolist() if i in positions]
+            hits = self._rank_exact(ids[selected], vectors[selected], embedding, limit, 0, threshold) if selected else []
+            ranked.append((hits, total))
+        return ranked
 
 # 전역 서비스 인스턴스
 consultation_service = ConsultationService()
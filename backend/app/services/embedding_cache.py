@@ -0,0 +1,209 @@
+"""Bounded LRU + TTL cache for query embeddings."""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different inputs share a cache entry."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the normalized text; rows with the same hash share one embedding."""
+    return hashlib.sha256(normalize_query(text).encode("utf-8")).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache with TTL, size bounds and single-flight computation.
+
+    Entries are bounded by count (`max_entries`) and optionally by bytes
+    (`max_bytes`). Concurrent misses for the same key wait for the first
+    caller's computation instead of encoding the text again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[np.ndarray, float, int]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._tasks: Set[asyncio.Future] = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> CacheKey:
+        return model_name, normalize_query(text)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: CacheKey) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        vector, expires_at, nbytes = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._bytes -= nbytes
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return vector
+
+    def get(self, key: CacheKey) -> Optional[np.ndarray]:
+        """Return a cached vector (refreshing its LRU position) or None."""
+        with self._lock:
+            vector = self._lookup(key)
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return vector
+
+    def put(self, key: CacheKey, vector) -> None:
+        """Insert or replace an entry, evicting least recently used entries as needed."""
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        nbytes = vector.nbytes + len(key[0]) + len(key[1].encode("utf-8"))
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (vector, expires_at, nbytes)
+            self._bytes += nbytes
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def _begin(self, key: CacheKey) -> Tuple[Optional[np.ndarray], Optional[Future], bool]:
+        # (캐시 값, 진행 중 계산, 계산 담당 여부)
+        with self._lock:
+            vector = self._lookup(key)
+            if vector is not None:
+                self.hits += 1
+                return vector, None, False
+            self.misses += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def _complete(self, key: CacheKey, future: Future, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        self.put(key, vector)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(vector)
+        return vector
+
+    def _fail(self, key: CacheKey, future: Future, exc: BaseException) -> None:
+        # 실패는 캐시하지 않고 대기 중인 호출자에게만 전달
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(exc)
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], np.ndarray]) -> Tuple[np.ndarray, bool]:
+        """Return (vector, hit); concurrent misses for one key run `compute` only once."""
+        vector, future, owner = self._begin(key)
+        if vector is not None:
+            return vector, True
+        if not owner:
+            return future.result(), False
+
+        try:
+            result = compute()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        return self._complete(key, future, result), False
+
+    async def aget_or_compute(
+        self, key: CacheKey, compute: Callable[[], Awaitable[np.ndarray]]
+    ) -> Tuple[np.ndarray, bool]:
+        """Async `get_or_compute`; waiters await the in-flight computation without blocking."""
+        vector, future, owner = self._begin(key)
+        if vector is not None:
+            return vector, True
+        if not owner:
+            # 대기자가 취소되어도 공유 Future는 취소하지 않음
+            return await asyncio.shield(asyncio.wrap_future(future)), False
+
+        # 계산은 호출자와 분리된 태스크에서 실행해, 요청이 취소(클라이언트 연결 종료 등)되어도
+        # 대기 중인 호출자는 결과를 받음
+        task = asyncio.ensure_future(self._acompute(key, future, compute))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(task), False
+
+    async def _acompute(
+        self, key: CacheKey, future: Future, compute: Callable[[], Awaitable[np.ndarray]]
+    ) -> np.ndarray:
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            # 계산 자체가 취소되면 대기자에게는 일반 오류를 전달 (다음 호출은 다시 계산)
+            self._fail(key, future, RuntimeError("쿼리 임베딩 계산이 취소되었습니다"))
+            raise
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        return self._complete(key, future, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+            }
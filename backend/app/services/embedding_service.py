@@ -1,8 +1,13 @@
 """Embedding service for text vectorization."""
+import asyncio
+import functools
 import numpy as np
-from typing import List, Union
-from app.embeddings import embedder
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple, Union
+from app.embeddings import MicroBatcher, embedder
 from app.core.config import settings
+from app.core.metrics import BATCH_SIZE, MODEL_LOADED, stage
+from app.services.embedding_cache import QueryEmbeddingCache, normalize_query
 
 
 class EmbeddingService:
@@ -11,23 +16,167 @@ class EmbeddingService:
     def __init__(self):
         self.dimension = settings.EMBEDDING_DIMENSION
         self.batch_size = settings.BATCH_SIZE
+        self.model_name = settings.EMBEDDING_MODEL_NAME
+        self.query_cache: Optional[QueryEmbeddingCache] = None
+        if settings.QUERY_CACHE_ENABLED:
+            self.query_cache = QueryEmbeddingCache(
+                max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+                max_bytes=settings.QUERY_CACHE_MAX_BYTES,
+                ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS
+            )
+        self.max_concurrency = settings.EMBEDDING_MAX_CONCURRENCY
+        # 내용 해시로 모델 호출을 생략한 횟수
+        self.reuse_counters = {"unchanged_update": 0, "copied_by_hash": 0}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.batcher: Optional[MicroBatcher] = None
+        if settings.EMBEDDING_MICRO_BATCHING:
+            self.batcher = MicroBatcher(
+                lambda texts: self._run_in_executor(self._encode_texts, texts),
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+            )
     
     def embed_text(self, text: str) -> List[float]:
         """Convert text to embedding vector."""
         embedding = embedder.embed_text(text)
         return self._normalize_embedding(embedding)
     
+    def embed_query(self, text: str) -> List[float]:
+        """Convert a search query to an embedding vector, using the query cache."""
+        embedding, _ = self.embed_query_with_cache_info(text)
+        return embedding
+    
+    def embed_query_with_cache_info(self, text: str) -> Tuple[List[float], bool]:
+        """Embed a search query and report whether it was served from the cache."""
+        if self.query_cache is None:
+            return self.embed_text(text), False
+        
+        # 페이지 이동/반복 검색 시 같은 쿼리의 모델 추론을 생략
+        key = self.query_cache.make_key(self.model_name, text)
+        embedding, hit = self.query_cache.get_or_compute(
+            key, lambda: embedder.embed_text(normalize_query(text))
+        )
+        return self._normalize_embedding(embedding), hit
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several search queries; cache misses share one batched model call."""
+        if self.query_cache is None:
+            return self.embed_batch(texts)
+        
+        keys = [self.query_cache.make_key(self.model_name, text) for text in texts]
+        vectors = {}
+        for key in keys:
+            if key not in vectors:
+                vectors[key] = self.query_cache.get(key)
+        missing = [key for key, vector in vectors.items() if vector is None]
+        if missing:
+            BATCH_SIZE.observe(len(missing), "queries")
+            computed = embedder.embed_batch([key[1] for key in missing], batch_size=self.batch_size)
+            for key, vector in zip(missing, computed):
+                self.query_cache.put(key, vector)
+                vectors[key] = vector
+        return [self._normalize_embedding(np.asarray(vectors[key], dtype=np.float32)) for key in keys]
+    
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """Convert multiple texts to embedding vectors."""
+        BATCH_SIZE.observe(len(texts), "batch")
         embeddings = embedder.embed_batch(texts, batch_size=self.batch_size)
         return [self._normalize_embedding(emb) for emb in embeddings]
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="embedding"
+            )
+        return self._executor
+    
+    async def _run_in_executor(self, func: Callable[..., Any], *args) -> Any:
+        # 모델 추론(encode)은 GIL을 해제하므로 전용 스레드 풀에서 실행하여 이벤트 루프를 막지 않음
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+    
+    @staticmethod
+    def _encode_texts(texts: List[str]) -> np.ndarray:
+        # 진행 표시줄 없이 한 번의 encode로 여러 텍스트를 처리
+        BATCH_SIZE.observe(len(texts), "micro_batch")
+        return np.asarray(embedder.embed_text(texts), dtype=np.float32).reshape(len(texts), -1)
+    
+    async def _aencode_one(self, text: str) -> np.ndarray:
+        if self.batcher is not None:
+            return await self.batcher.submit(text)
+        return await self._run_in_executor(embedder.embed_text, text)
+    
+    async def aload_model(self) -> None:
+        """Load the model in the embedding thread pool."""
+        await self._run_in_executor(embedder.load)
+    
+    async def aencode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with one model call, bypassing the query cache and micro-batcher."""
+        return await self._run_in_executor(self._encode_texts, texts)
+    
+    async def aembed_text(self, text: str) -> List[float]:
+        """Async embed_text; concurrent calls are micro-batched into one encode."""
+        with stage("embed", "text"):
+            return self._normalize_embedding(await self._aencode_one(text))
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async embed_query; cache hits are served without leaving the event loop."""
+        embedding, _ = await self.aembed_query_with_cache_info(text)
+        return embedding
+    
+    async def aembed_query_with_cache_info(self, text: str) -> Tuple[List[float], Optional[bool]]:
+        """Async embed_query that also reports a cache hit (None when the cache is disabled)."""
+        if self.query_cache is None:
+            return await self.aembed_text(text), None
+        
+        # 실행기 스레드에는 contextvar가 전달되지 않으므로 이벤트 루프 쪽에서 측정
+        with stage("embed", "query"):
+            key = self.query_cache.make_key(self.model_name, text)
+            embedding, hit = await self.query_cache.aget_or_compute(
+                key, lambda: self._aencode_one(normalize_query(text))
+            )
+            return self._normalize_embedding(embedding), hit
+    
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Async embed_queries."""
+        with stage("embed", "queries"):
+            return await self._run_in_executor(self.embed_queries, texts)
+    
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Async embed_batch."""
+        with stage("embed", "batch"):
+            return await self._run_in_executor(self.embed_batch, texts)
+    
+    async def shutdown(self) -> None:
+        """Stop the micro-batcher and the embedding thread pool."""
+        if self.batcher is not None:
+            await self.batcher.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
     def _normalize_embedding(self, embedding: Union[np.ndarray, List[float]]) -> List[float]:
         """Normalize embedding to list format."""
         if hasattr(embedding, 'tolist'):
             return embedding.tolist()
         return embedding
     
+    def record_reuse(self, reason: str, count: int = 1) -> None:
+        """Count model calls avoided by reusing an existing embedding."""
+        if count > 0:
+            self.reuse_counters[reason] += count
+    
+    def get_stats(self) -> dict:
+        """Embedding runtime statistics."""
+        return {
+            "model_name": self.model_name,
+            "backend": embedder.info(),
+            "max_concurrency": self.max_concurrency,
+            "micro_batching": self.batcher.stats() if self.batcher is not None else None,
+            "model_calls_saved": dict(self.reuse_counters, total=sum(self.reuse_counters.values())),
+            "query_cache": self.query_cache.stats() if self.query_cache is not None else None,
+        }
+    
     def validate_embedding_dimension(self, embedding: List[float]) -> bool:
         """Validate embedding dimension."""
         return len(embedding) == self.dimension
@@ -35,3 +184,4 @@ class EmbeddingService:
 
 # 전역 서비스 인스턴스
 embedding_service = EmbeddingService()
+MODEL_LOADED.set_function(lambda: float(embedder.loaded))
@@ -0,0 +1,153 @@
+"""Background embedding of consultations saved in async ingestion mode."""
+import asyncio
+import logging
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.embedding_service import embedding_service
+from app import crud
+
+logger = logging.getLogger(__name__)
+
+# 임베딩이 채워진 행을 받는 콜백 (id 목록, 임베딩 목록)
+EmbeddedListener = Callable[[List[int], List[List[float]]], None]
+
+
+class IngestionService:
+    """Embed pending consultations with a pool of asyncio workers.
+
+    Writes enqueue row ids; each worker drains up to `batch_size` ids, embeds
+    their texts with one batched call in the embedding thread pool and stores
+    the vectors. On start, rows left without embeddings are re-queued; every
+    worker process does this, so batches claim their rows with
+    SELECT ... FOR UPDATE SKIP LOCKED and each row is embedded once.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        workers: int = 1,
+        batch_size: int = 64
+    ):
+        self.session_factory = session_factory
+        self.workers = max(workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._listeners: List[EmbeddedListener] = []
+        self.enqueued = 0
+        self.embedded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.batches = 0
+        self.recovered = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_listener(self, listener: EmbeddedListener) -> None:
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        """Start the workers and re-queue rows left without embeddings."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        async with self.session_factory() as db:
+            pending_ids = await crud.get_unembedded_consultation_ids(db)
+        self.recovered += len(pending_ids)
+        self.enqueue(pending_ids)
+        if pending_ids:
+            logger.info("임베딩 대기 행 %d개를 다시 대기열에 넣었습니다", len(pending_ids))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def enqueue(self, consultation_ids: Iterable[int]) -> None:
+        """Queue rows for embedding; ids are ignored if the workers are not running
+        (they are recovered on the next start)."""
+        if self._queue is None:
+            return
+        for consultation_id in consultation_ids:
+            self._queue.put_nowait(consultation_id)
+            self.enqueued += 1
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self.process_batch(batch)
+            except Exception:
+                logger.exception("임베딩 배치 처리에 실패했습니다")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued id has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def process_batch(self, consultation_ids: List[int]) -> List[int]:
+        """Embed the still-pending rows among `consultation_ids` that no other worker
+        has claimed; return the filled ids."""
+        async with self.session_factory() as db:
+            rows = await crud.get_pending_consultations(db, list(dict.fromkeys(consultation_ids)))
+            if not rows:
+                return []
+            self.batches += 1
+            # 같은 텍스트는 한 번만 임베딩
+            texts = list(dict.fromkeys(text for _, text in rows))
+            try:
+                vectors = dict(zip(texts, await embedding_service.aembed_batch(texts)))
+            except Exception:
+                self.failed += len(rows)
+                await crud.mark_embedding_failed(db, [consultation_id for consultation_id, _ in rows])
+                raise
+            embedding_service.record_reuse("copied_by_hash", len(rows) - len(texts))
+            embeddings = [vectors[text] for _, text in rows]
+            updated = await crud.fill_embeddings(db, rows, embeddings)
+            by_id = {consultation_id: embedding for (consultation_id, _), embedding in zip(rows, embeddings)}
+            if settings.PASSAGE_SEARCH_ENABLED and updated:
+                # 문서 임베딩이 채워진 행의 구간을 이어서 저장
+                texts_by_id = dict(rows)
+                await crud.sync_passages(
+                    db, [(consultation_id, texts_by_id[consultation_id], by_id[consultation_id]) for consultation_id in updated]
+                )
+
+        self.embedded += len(updated)
+        self.skipped += len(rows) - len(updated)
+        for listener in self._listeners:
+            listener(updated, [by_id[consultation_id] for consultation_id in updated])
+        return updated
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.INGESTION_MODE,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "embedded": self.embedded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "recovered": self.recovered,
+        }
+
+
+# 전역 서비스 인스턴스
+ingestion_service = IngestionService(
+    workers=settings.INGESTION_WORKERS,
+    batch_size=settings.INGESTION_BATCH_SIZE
+)
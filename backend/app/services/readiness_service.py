@@ -0,0 +1,142 @@
+"""Model preload and warm-up at startup, reported through the readiness endpoint."""
+import asyncio
+import logging
+import time
+from typing import List, Optional, Sequence
+
+from app.core.config import settings
+from app.embeddings import embedder
+from app.services.embedding_service import EmbeddingService, embedding_service
+
+logger = logging.getLogger(__name__)
+
+# 예열 상태
+STATE_IDLE = "idle"
+STATE_LOADING = "loading"
+STATE_WARMING = "warming"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+STATE_DISABLED = "disabled"
+
+# 예열 문장을 만드는 단어 (대략 단어 하나가 토큰 하나)
+WARMUP_WORD = "상담"
+
+
+def warmup_texts(batch_size: int, seq_length: int) -> List[str]:
+    """`batch_size` texts of roughly `seq_length` tokens (truncated by the model)."""
+    return [" ".join([WARMUP_WORD] * max(seq_length - 2, 1))] * batch_size
+
+
+class ReadinessService:
+    """Load the embedding model in the background and warm it up.
+
+    Each (batch size, sequence length) shape is encoded repeatedly until two
+    consecutive rounds differ by at most `tolerance` (or `max_rounds` is
+    reached), so the worker only reports ready once kernels and allocators
+    are primed and latency is at steady state.
+    """
+
+    def __init__(
+        self,
+        service: EmbeddingService = embedding_service,
+        batch_sizes: Sequence[int] = (1, 8, 32),
+        seq_lengths: Sequence[int] = (16, 128, 512),
+        max_rounds: int = 5,
+        tolerance: float = 0.2,
+    ):
+        self.service = service
+        self.batch_sizes = [size for size in batch_sizes if size > 0]
+        self.seq_lengths = [length for length in seq_lengths if length > 0]
+        self.max_rounds = max(max_rounds, 1)
+        self.tolerance = tolerance
+        self.state = STATE_IDLE
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.warmup: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in (STATE_READY, STATE_DISABLED)
+
+    def start(self) -> None:
+        """Start loading and warming up in a background task."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self.run())
+
+    def disable(self) -> None:
+        """Skip preloading; the model loads lazily on the first request."""
+        self.state = STATE_DISABLED
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run(self) -> None:
+        try:
+            self.state = STATE_LOADING
+            started = time.perf_counter()
+            await self.service.aload_model()
+            self.load_seconds = time.perf_counter() - started
+
+            self.state = STATE_WARMING
+            started = time.perf_counter()
+            for seq_length in self.seq_lengths:
+                for batch_size in self.batch_sizes:
+                    self.warmup.append(await self._warm_shape(batch_size, seq_length))
+            self.warmup_seconds = time.perf_counter() - started
+            self.state = STATE_READY
+            logger.info(
+                "임베딩 모델 준비 완료 (로딩 %.1f초, 예열 %.1f초)", self.load_seconds, self.warmup_seconds
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.state = STATE_FAILED
+            self.error = f"{type(exc).__name__}: {exc}"
+            logger.exception("임베딩 모델 로딩/예열에 실패했습니다")
+
+    async def _warm_shape(self, batch_size: int, seq_length: int) -> dict:
+        texts = warmup_texts(batch_size, seq_length)
+        timings = []
+        for _ in range(self.max_rounds):
+            started = time.perf_counter()
+            await self.service.aencode_uncached(texts)
+            timings.append(time.perf_counter() - started)
+            if len(timings) >= 2 and abs(timings[-1] - timings[-2]) <= self.tolerance * timings[-2]:
+                break
+        return {
+            "batch_size": batch_size,
+            "seq_length": seq_length,
+            "rounds": len(timings),
+            "first_ms": round(timings[0] * 1000.0, 3),
+            "last_ms": round(timings[-1] * 1000.0, 3),
+        }
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "error": self.error,
+            "model": embedder.info(),
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "warmup": list(self.warmup),
+        }
+
+
+# 전역 서비스 인스턴스
+readiness_service = ReadinessService(
+    batch_sizes=settings.EMBEDDING_WARMUP_BATCH_SIZES,
+    seq_lengths=settings.EMBEDDING_WARMUP_SEQ_LENGTHS,
+    max_rounds=settings.EMBEDDING_WARMUP_MAX_ROUNDS,
+    tolerance=settings.EMBEDDING_WARMUP_TOLERANCE
+)
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.compare import compare_results, format_table
+from benchmarks.import_time import DEFAULT_BUDGET_MS, check_import_time
+from benchmarks.scan import DEFAULT_DIMENSION, DEFAULT_ROWS, check_quantized_scan
+from benchmarks.suite import BENCHMARKS, BenchmarkConfig, BenchmarkRun
+
+
+def _ints(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def run(args):
+    config = BenchmarkConfig(
+        database_url=args.database_url,
+        sizes=args.sizes,
+        benchmarks=args.only or list(BENCHMARKS),
+        seed=args.seed,
+        queries=args.queries,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        limit=args.limit,
+        similarity_threshold=args.threshold,
+        depths=args.depths,
+        ingest_batch=args.ingest_batch,
+        ingest_batches=args.ingest_batches,
+    )
+    log = (lambda message: print(message, file=sys.stderr))
+    report = asyncio.run(BenchmarkRun(config, log=log).run())
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        log(f"결과 저장: {args.output}")
+    else:
+        print(output)
+
+
+def compare(args):
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    candidate = json.loads(Path(args.candidate).read_text(encoding="utf-8"))
+    if baseline["config"] != candidate["config"]:
+        print("경고: 두 실행의 설정이 다릅니다 (결과를 직접 비교하기 어려울 수 있음)", file=sys.stderr)
+    rows = compare_results(baseline, candidate, metric=args.metric, threshold=args.max_regression)
+    print(format_table(rows, args.metric))
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+def import_time(args):
+    report = check_import_time(args.module, budget_ms=args.budget_ms, repeat=args.repeat)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if report["forbidden_loaded"]:
+        print(f"금지된 모듈이 import 되었습니다: {', '.join(report['forbidden_loaded'])}", file=sys.stderr)
+    if not report["ok"]:
+        sys.exit(1)
+
+
+def quantized_scan(args):
+    report = check_quantized_scan(
+        rows=args.rows, dimension=args.dimension, repeat=args.repeat, batch=args.batch, max_ratio=args.max_ratio
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if not report["ok"]:
+        print(f"int8 후보 스캔이 float32 스캔보다 {args.max_ratio}배 넘게 느립니다", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="합성 코퍼스와 결정적 임베더로 검색/페이지네이션/적재/직렬화 성능 측정"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="벤치마크 실행 후 JSON 결과 출력")
+    run_parser.add_argument("--database-url", default=None,
+                            help="측정용 DB URL (테이블을 삭제 후 재생성하므로 전용 DB 사용, 기본값: 임시 SQLite)")
+    run_parser.add_argument("--sizes", type=_ints, default=[1000, 10000], help="코퍼스 크기 목록 (예: 1000,10000,100000)")
+    run_parser.add_argument("--only", type=lambda v: v.split(","), default=None,
+                            help=f"실행할 벤치마크 ({','.join(BENCHMARKS)})")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--queries", type=int, default=16, help="서로 다른 검색 쿼리 수")
+    run_parser.add_argument("--repeat", type=int, default=20, help="측정 반복 횟수")
+    run_parser.add_argument("--warmup", type=int, default=2)
+    run_parser.add_argument("--limit", type=int, default=10, help="검색 페이지 크기")
+    run_parser.add_argument("--threshold", type=float, default=0.0, help="유사도 임계값")
+    run_parser.add_argument("--depths", type=_ints, default=[0, 100, 1000], help="페이지네이션 깊이 (skip)")
+    run_parser.add_argument("--ingest-batch", type=int, default=100)
+    run_parser.add_argument("--ingest-batches", type=int, default=5)
+    run_parser.add_argument("--output", "-o", help="결과 JSON 파일 경로 (기본값: 표준 출력)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="두 결과 JSON 비교")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--metric", default="p50_ms", help="비교 지표 (p50_ms, p95_ms, items_per_second 등)")
+    compare_parser.add_argument("--max-regression", type=float, default=0.1,
+                                help="이 비율을 넘게 나빠지면 종료 코드 1")
+    compare_parser.set_defaults(func=compare)
+
+    import_parser = commands.add_parser("import-time", help="python -X importtime으로 콜드 import 시간 예산 검사")
+    import_parser.add_argument("--module", default="app.main")
+    import_parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                               help="누적 import 시간 예산 (ms, 초과 시 종료 코드 1)")
+    import_parser.add_argument("--repeat", type=int, default=3, help="측정 횟수 (가장 빠른 값 사용)")
+    import_parser.set_defaults(func=import_time)
+
+    scan_parser = commands.add_parser("quantized-scan", help="int8 후보 스캔과 float32 정확 스캔 지연 비교")
+    scan_parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    scan_parser.add_argument("--dimension", type=int, default=DEFAULT_DIMENSION)
+    scan_parser.add_argument("--repeat", type=int, default=20)
+    scan_parser.add_argument("--batch", type=int, default=8, help="다중 쿼리 스캔의 쿼리 수")
+    scan_parser.add_argument("--max-ratio", type=float, default=1.0,
+                             help="int8/float32 지연 비율 상한 (초과 시 종료 코드 1)")
+    scan_parser.set_defaults(func=quantized_scan)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
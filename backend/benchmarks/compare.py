@@ -0,0 +1,39 @@
+"""Compare two benchmark result files."""
+from typing import Dict, List
+
+
+def compare_results(baseline: dict, candidate: dict, metric: str = "p50_ms", threshold: float = 0.1) -> List[Dict]:
+    """Rows of (case, baseline, candidate, change) for cases present in both runs.
+
+    `change` is candidate / baseline - 1. For latency metrics a change above
+    `threshold` is a regression; for throughput metrics (items_per_second)
+    a drop below -`threshold` is.
+    """
+    higher_is_better = metric == "items_per_second"
+    rows = []
+    for case, stats in baseline["results"].items():
+        other = candidate["results"].get(case)
+        if other is None or stats.get(metric) is None or other.get(metric) is None:
+            continue
+        before, after = stats[metric], other[metric]
+        change = after / before - 1.0 if before else 0.0
+        regressed = change < -threshold if higher_is_better else change > threshold
+        rows.append({
+            "case": case,
+            "baseline": before,
+            "candidate": after,
+            "change": round(change, 4),
+            "regression": regressed,
+        })
+    return rows
+
+
+def format_table(rows: List[Dict], metric: str) -> str:
+    width = max([len(row["case"]) for row in rows] + [4])
+    lines = [f"{'case':<{width}}  {'baseline':>12}  {'candidate':>12}  {'change':>8}   ({metric})"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['case']:<{width}}  {row['baseline']:>12.3f}  {row['candidate']:>12.3f}  {row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
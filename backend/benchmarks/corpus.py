@@ -0,0 +1,99 @@
+"""Seeded synthetic consultation corpus."""
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from benchmarks.embedder import HashingBackend
+
+# 행 생성 단위 - 요청 배치 크기와 무관하게 같은 시드면 같은 코퍼스가 나오도록 고정
+BLOCK_ROWS = 1000
+# 한글 음절 범위 (가-힣)
+HANGUL_FIRST, HANGUL_COUNT = 0xAC00, 11172
+COMMON_WORDS = (
+    "학생", "수업", "친구", "가정", "상담", "태도", "관찰", "지도", "활동", "시간",
+    "모습", "노력", "참여", "과제", "발표", "생활", "습관", "성장", "칭찬", "관심",
+)
+
+
+@dataclass
+class CorpusBlock:
+    texts: List[str]
+    categories: List[str]
+    owners: List[str]
+    vectors: np.ndarray
+
+
+def _korean_word(rng: np.random.Generator) -> str:
+    syllables = rng.integers(HANGUL_FIRST, HANGUL_FIRST + HANGUL_COUNT, size=int(rng.integers(2, 4)))
+    return "".join(map(chr, syllables))
+
+
+class SyntheticCorpus:
+    """Korean-like consultation texts grouped into topics, with their embeddings.
+
+    Every text mixes words from its topic vocabulary with common words, and
+    its vector comes from the deterministic `HashingBackend`, so texts of the
+    same topic are near each other and topic-word queries have real hits.
+    Rows are generated in fixed blocks from (seed, block index), so any prefix
+    of the corpus is identical across runs and sizes.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        seed: int = 0,
+        topics: int = 32,
+        words_per_topic: int = 40,
+        owners: int = 50,
+        backend: Optional[HashingBackend] = None,
+    ):
+        self.size = size
+        self.seed = seed
+        self.backend = backend or HashingBackend(seed=seed)
+        rng = np.random.default_rng([seed, 0])
+        self.topic_words = [[_korean_word(rng) for _ in range(words_per_topic)] for _ in range(topics)]
+        self.categories = [f"주제_{topic:02d}" for topic in range(topics)]
+        self.owners = [f"teacher-{owner:02d}" for owner in range(owners)]
+
+    @property
+    def dimension(self) -> int:
+        return self.backend.dimension
+
+    def _text(self, rng: np.random.Generator, topic: int) -> str:
+        sentences = []
+        for _ in range(int(rng.integers(2, 6))):
+            words = [
+                self.topic_words[topic][i] if rng.random() < 0.6 else COMMON_WORDS[i % len(COMMON_WORDS)]
+                for i in rng.integers(0, len(self.topic_words[topic]), size=int(rng.integers(5, 12)))
+            ]
+            sentences.append(" ".join(words) + "입니다.")
+        return " ".join(sentences)
+
+    def block(self, index: int) -> CorpusBlock:
+        """Rows [index * BLOCK_ROWS, ...) of the corpus."""
+        rng = np.random.default_rng([self.seed, 1, index])
+        rows = min(BLOCK_ROWS, self.size - index * BLOCK_ROWS)
+        # 마지막 블록이 짧아도 앞쪽 행이 같도록 난수는 항상 블록 전체 크기로 뽑음
+        topics = rng.integers(0, len(self.topic_words), size=BLOCK_ROWS)[:rows]
+        owners = rng.integers(0, len(self.owners), size=BLOCK_ROWS)[:rows]
+        texts = [self._text(rng, int(topic)) for topic in topics]
+        return CorpusBlock(
+            texts=texts,
+            categories=[self.categories[topic] for topic in topics],
+            owners=[self.owners[owner] for owner in owners],
+            vectors=self.backend.encode(texts),
+        )
+
+    def blocks(self) -> Iterator[CorpusBlock]:
+        for index in range(-(-self.size // BLOCK_ROWS)):
+            yield self.block(index)
+
+    def queries(self, count: int, words: int = 3) -> List[str]:
+        """Search queries made of topic words (seeded independently of the rows)."""
+        rng = np.random.default_rng([self.seed, 2])
+        queries = []
+        for topic in rng.integers(0, len(self.topic_words), size=count):
+            picked = rng.choice(len(self.topic_words[topic]), size=words, replace=False)
+            queries.append(" ".join(self.topic_words[topic][i] for i in picked))
+        return queries
@@ -0,0 +1,68 @@
+"""Deterministic stand-in embedder (no model download)."""
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+from typing import Dict, Sequence
+
+import numpy as np
+
+from app.embeddings.backends import EmbedderBackend, l2_normalize
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingBackend(EmbedderBackend):
+    """Bag-of-words embedder whose token vectors are seeded by a hash of the token.
+
+    The same text always maps to the same vector in every process, and texts
+    sharing words have a positive cosine similarity, so search results are
+    meaningful without a real model. Token vectors are cached.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 1024, seed: int = 0):
+        super().__init__("hashing", max_seq_length=512)
+        self.dimension = dimension
+        self.seed = seed
+        self._token_vectors: Dict[str, np.ndarray] = {}
+
+    def load(self) -> None:
+        pass
+
+    def token_vector(self, token: str) -> np.ndarray:
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            # 프로세스마다 달라지는 hash() 대신 blake2b로 시드를 만듦
+            digest = hashlib.blake2b(f"{self.seed}:{token}".encode(), digest_size=8).digest()
+            rng = np.random.default_rng(int.from_bytes(digest, "little"))
+            vector = rng.standard_normal(self.dimension).astype(np.float32)
+            self._token_vectors[token] = vector
+        return vector
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN_PATTERN.findall(text.lower()):
+                vectors[row] += self.token_vector(token)
+        return l2_normalize(vectors)
+
+
+@contextmanager
+def deterministic_embedder(backend: HashingBackend):
+    """Route the global embedder (and so EmbeddingService) through `backend`."""
+    from app.embeddings import embedder
+
+    previous_backend, previous_testing = embedder.backend, os.environ.get("TESTING")
+    # TESTING 모드의 0 벡터 대신 실제 인코딩 경로를 측정
+    os.environ["TESTING"] = "false"
+    embedder.backend = backend
+    try:
+        yield backend
+    finally:
+        embedder.backend = previous_backend
+        if previous_testing is None:
+            os.environ.pop("TESTING", None)
+        else:
+            os.environ["TESTING"] = previous_testing
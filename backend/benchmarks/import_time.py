@@ -0,0 +1,70 @@
+"""Cold import time of the application (`python -X importtime`) against a budget."""
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# app.main import 시 로드되면 안 되는 모듈 (모델 추론 라이브러리, 사용하지 않는 동기 드라이버)
+FORBIDDEN_MODULES = ("torch", "sentence_transformers", "transformers", "onnxruntime", "optimum", "psycopg2")
+# 기본 예산: import app.main 누적 시간 (ms)
+DEFAULT_BUDGET_MS = 3000.0
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Cumulative import time in milliseconds per module, from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000.0
+    return modules
+
+
+def measure_import(module: str = "app.main") -> Dict[str, float]:
+    """Import `module` in a fresh interpreter and return the per-module cumulative times."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} 실패:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def check_import_time(
+    module: str = "app.main",
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    repeat: int = 3,
+    forbidden: Optional[List[str]] = None,
+) -> Dict[str, object]:
+    """Best-of-`repeat` cold import time of `module` and the forbidden modules it pulled in.
+
+    The report's `ok` is False when the time exceeds `budget_ms` or any
+    forbidden module (or a submodule of one) was imported.
+    """
+    forbidden = FORBIDDEN_MODULES if forbidden is None else tuple(forbidden)
+    runs = [measure_import(module) for _ in range(max(repeat, 1))]
+    best = min(runs, key=lambda modules: modules.get(module, float("inf")))
+    elapsed = best.get(module)
+    loaded = sorted(
+        name for name in best
+        if any(name == blocked or name.startswith(blocked + ".") for blocked in forbidden)
+    )
+    slowest = sorted(
+        ((name, ms) for name, ms in best.items() if name != module), key=lambda item: item[1], reverse=True
+    )[:10]
+    return {
+        "module": module,
+        "import_ms": round(elapsed, 1) if elapsed is not None else None,
+        "budget_ms": budget_ms,
+        "runs": [round(modules.get(module, 0.0), 1) for modules in runs],
+        "forbidden_loaded": loaded,
+        "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in slowest],
+        "ok": elapsed is not None and elapsed <= budget_ms and not loaded,
+    }
@@ -0,0 +1,89 @@
+"""Quantized (int8) candidate scan against the float32 memory scan on the same corpus."""
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.search import InMemoryVectorIndex, QuantizedVectorIndex
+
+# 기본 규모: float32 행렬이 CPU 캐시보다 훨씬 큰 크기 (200k x 1024 = 800MB)
+DEFAULT_ROWS = 200_000
+DEFAULT_DIMENSION = 1024
+
+
+def _median_ms(call: Callable[[int], object], repeat: int) -> float:
+    call(0)
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples)) * 1000.0
+
+
+def check_quantized_scan(
+    rows: int = DEFAULT_ROWS,
+    dimension: int = DEFAULT_DIMENSION,
+    repeat: int = 20,
+    batch: int = 8,
+    limit: int = 10,
+    rerank_factor: int = 4,
+    max_ratio: float = 1.0,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """Median latency of the int8 candidate scan and the float32 exact scan.
+
+    Single queries and `batch`-query scans are measured alternately on random
+    unit vectors. The report's `ok` is False when quantized/float32 exceeds
+    `max_ratio` for either case.
+    """
+    rng = np.random.default_rng(seed)
+    exact = InMemoryVectorIndex(dimension, initial_capacity=rows)
+    coarse = QuantizedVectorIndex(dimension, mode="int8", initial_capacity=rows)
+    # 행렬 두 개를 한 번에 만들지 않도록 블록 단위로 적재
+    for start in range(0, rows, 10_000):
+        end = min(start + 10_000, rows)
+        vectors = rng.standard_normal((end - start, dimension), dtype=np.float32)
+        exact.add_many(np.arange(start, end), vectors)
+        coarse.add_many(np.arange(start, end), vectors)
+    queries = rng.standard_normal((16, dimension), dtype=np.float32)
+    candidates = limit * rerank_factor
+
+    def batch_queries(i: int) -> np.ndarray:
+        return np.take(queries, range(i, i + batch), axis=0, mode="wrap")
+
+    cases = {
+        "single": (
+            lambda i: exact.search(queries[i % len(queries)], limit=limit, similarity_threshold=-1.0),
+            lambda i: coarse.search_candidates(queries[i % len(queries)], candidates, similarity_threshold=-1.0),
+        ),
+        f"batch={batch}": (
+            lambda i: exact.search_many(batch_queries(i), [limit] * batch, [-1.0] * batch),
+            lambda i: coarse.search_candidates_many(batch_queries(i), [candidates] * batch, [-1.0] * batch),
+        ),
+    }
+    results: List[dict] = []
+    for case, (float32_call, int8_call) in cases.items():
+        # 두 모드를 번갈아 측정해 부하 변동을 양쪽에 고르게 반영
+        float32_ms, int8_ms = [], []
+        for _ in range(max(repeat // 5, 1)):
+            float32_ms.append(_median_ms(float32_call, 5))
+            int8_ms.append(_median_ms(int8_call, 5))
+        float32_median, int8_median = float(np.median(float32_ms)), float(np.median(int8_ms))
+        results.append({
+            "case": case,
+            "float32_ms": round(float32_median, 3),
+            "int8_ms": round(int8_median, 3),
+            "ratio": round(int8_median / float32_median, 3),
+        })
+    return {
+        "rows": rows,
+        "dimension": dimension,
+        "max_ratio": max_ratio,
+        "memory_bytes": {
+            "float32": exact.memory_footprint()["used_bytes"],
+            "int8": coarse.memory_footprint()["used_bytes"],
+        },
+        "results": results,
+        "ok": all(result["ratio"] <= max_ratio for result in results),
+    }
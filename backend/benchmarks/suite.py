@@ -0,0 +1,325 @@
+"""Benchmarks for search, pagination, ingestion, serialization and the search endpoint."""
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app import crud
+from app.core.config import settings
+from app.db.base import Base
+from app.db.engine import create_engine
+from app.db.vector_index import rebuild_after_bulk_load
+from app.models import Consultation
+from app.schemas import ConsultationCreate, ConsultationSearchResponse, ConsultationSearchResult
+from app.search import InMemoryVectorIndex, QuantizedVectorIndex
+from app.services.embedding_cache import content_hash
+from app.services.embedding_service import embedding_service
+from benchmarks.corpus import BLOCK_ROWS, SyntheticCorpus
+from benchmarks.embedder import HashingBackend, deterministic_embedder
+from benchmarks.timing import measure
+
+BENCHMARKS = ("search", "pagination", "api", "ingest", "serialization")
+
+
+@dataclass
+class BenchmarkConfig:
+    """What to run; recorded in the output so two runs can be checked for comparability."""
+
+    database_url: Optional[str] = None  # None이면 임시 SQLite 파일
+    sizes: List[int] = field(default_factory=lambda: [1000, 10000])
+    benchmarks: List[str] = field(default_factory=lambda: list(BENCHMARKS))
+    seed: int = 0
+    queries: int = 16
+    repeat: int = 20
+    warmup: int = 2
+    limit: int = 10
+    similarity_threshold: float = 0.0
+    depths: List[int] = field(default_factory=lambda: [0, 100, 1000])
+    ingest_batch: int = 100
+    ingest_batches: int = 5
+    serialization_sizes: List[int] = field(default_factory=lambda: [10, 100, 1000])
+
+
+@contextmanager
+def _override(**values):
+    # settings는 전역 객체이므로 측정 중에만 바꾸고 되돌림
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+async def open_database(url: str) -> AsyncEngine:
+    """Create an engine and (re)create the tables - the database must be disposable."""
+    engine = create_engine(url, statement_timeout_ms=0)
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def load_rows(engine: AsyncEngine, corpus: SyntheticCorpus, start: int, end: int) -> float:
+    """Insert corpus rows [start, end) with their precomputed vectors; return seconds."""
+    started = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        for index in range(start // BLOCK_ROWS, -(-end // BLOCK_ROWS)):
+            block = corpus.block(index)
+            offset = index * BLOCK_ROWS
+            lo, hi = max(start - offset, 0), min(end - offset, len(block.texts))
+            await db.execute(insert(Consultation), [
+                {
+                    "text": block.texts[i],
+                    "content_hash": content_hash(block.texts[i]),
+                    "embedding": block.vectors[i].tolist(),
+                    "category": block.categories[i],
+                    "owner": block.owners[i],
+                }
+                for i in range(lo, hi)
+            ])
+            await db.commit()
+    async with engine.begin() as conn:
+        # pgvector면 코퍼스 크기에 맞는 ANN 인덱스 준비 (SQLite는 건너뜀)
+        await rebuild_after_bulk_load(conn, inserted_rows=end - start)
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE consultations"))
+    return time.perf_counter() - started
+
+
+class BenchmarkRun:
+    """One benchmark run; `results` maps case names to latency/throughput summaries."""
+
+    def __init__(self, config: BenchmarkConfig, log: Callable[[str], None] = print):
+        self.config = config
+        self.log = log
+        self.results: Dict[str, dict] = {}
+        self.backend = HashingBackend(dimension=settings.EMBEDDING_DIMENSION, seed=config.seed)
+        self.corpus = SyntheticCorpus(max(config.sizes), seed=config.seed, backend=self.backend)
+        self.queries = self.corpus.queries(config.queries)
+
+    def record(self, case: str, summary: dict) -> None:
+        self.results[case] = summary
+        self.log(f"{case:<55} p50 {summary['p50_ms']:>10.3f} ms  p95 {summary['p95_ms']:>10.3f} ms")
+
+    async def _measure(self, case: str, call, items_per_call: int = 1, repeat: Optional[int] = None) -> None:
+        summary = await measure(
+            call, repeat=repeat or self.config.repeat, warmup=self.config.warmup, items_per_call=items_per_call
+        )
+        self.record(case, summary)
+
+    async def run(self) -> dict:
+        config = self.config
+        with tempfile.TemporaryDirectory() as workdir, deterministic_embedder(self.backend):
+            url = config.database_url or f"sqlite+aiosqlite:///{Path(workdir) / 'bench.db'}"
+            engine = await open_database(url)
+            sessions = async_sessionmaker(engine, expire_on_commit=False)
+            mode = "pgvector" if engine.dialect.name == "postgresql" else "python"
+            try:
+                with _override(SEARCH_MODE=mode):
+                    await self._run_database_benchmarks(engine, sessions, mode)
+            finally:
+                await engine.dispose()
+        if "serialization" in config.benchmarks:
+            await self.bench_serialization()
+        return {
+            "environment": _environment(),
+            "config": asdict(config),
+            "database": engine.dialect.name,
+            "results": self.results,
+        }
+
+    async def _run_database_benchmarks(self, engine, sessions, mode: str) -> None:
+        config = self.config
+        loaded = 0
+        for size in sorted(config.sizes):
+            # 코퍼스는 앞부분이 동일하므로 크기를 늘려 가며 차이만 적재
+            seconds = await load_rows(engine, self.corpus, loaded, size)
+            self.log(f"n={size}: {size - loaded}행 적재 {seconds:.1f}s")
+            loaded = size
+            if "search" in config.benchmarks:
+                await self.bench_search(sessions, mode, size)
+            if "pagination" in config.benchmarks:
+                await self.bench_pagination(sessions, mode, size)
+        if "api" in config.benchmarks:
+            await self.bench_api(sessions, loaded)
+        # 적재량을 바꾸므로 마지막에 실행
+        if "ingest" in config.benchmarks:
+            await self.bench_ingest(sessions)
+
+    async def bench_search(self, sessions, mode: str, size: int) -> None:
+        config = self.config
+
+        async def search(i):
+            async with sessions() as db:
+                await crud.search_consultations(
+                    db, self.queries[i % len(self.queries)], limit=config.limit,
+                    similarity_threshold=config.similarity_threshold, mode=mode
+                )
+
+        await self._measure(f"search/{mode}/n={size}", search)
+
+        # 프로세스 내 인덱스는 DB 없이 순수 채점 비용만 측정
+        query_vectors = self.backend.encode(self.queries)
+        exact = InMemoryVectorIndex(self.corpus.dimension, initial_capacity=size)
+        coarse = QuantizedVectorIndex(self.corpus.dimension, mode="int8", initial_capacity=size)
+        for index in range(-(-size // BLOCK_ROWS)):
+            block = self.corpus.block(index)
+            rows = min(BLOCK_ROWS, size - index * BLOCK_ROWS)
+            ids = np.arange(index * BLOCK_ROWS, index * BLOCK_ROWS + rows) + 1
+            exact.add_many(ids, block.vectors[:rows])
+            coarse.add_many(ids, block.vectors[:rows])
+
+        async def memory(i):
+            exact.search(query_vectors[i % len(query_vectors)], limit=config.limit,
+                         similarity_threshold=config.similarity_threshold)
+
+        async def quantized(i):
+            coarse.search_candidates(query_vectors[i % len(query_vectors)],
+                                     candidates=config.limit * settings.SEARCH_RERANK_FACTOR,
+                                     similarity_threshold=config.similarity_threshold)
+
+        await self._measure(f"search/memory/n={size}", memory)
+        await self._measure(f"search/quantized-int8-candidates/n={size}", quantized)
+
+    async def bench_pagination(self, sessions, mode: str, size: int) -> None:
+        config = self.config
+        for depth in config.depths:
+            if depth >= size:
+                continue
+
+            async def search_page(i, depth=depth):
+                async with sessions() as db:
+                    await crud.search_consultations(
+                        db, self.queries[i % len(self.queries)], limit=config.limit, skip=depth,
+                        similarity_threshold=config.similarity_threshold, mode=mode
+                    )
+
+            async def offset_page(i, depth=depth):
+                async with sessions() as db:
+                    await crud.get_consultations(db, skip=depth, limit=config.limit)
+
+            async with sessions() as db:
+                anchor = await crud.get_consultations(db, skip=depth - 1, limit=1) if depth else []
+            cursor = crud.encode_list_cursor(anchor[0]) if anchor else None
+
+            async def keyset_page(i, cursor=cursor):
+                async with sessions() as db:
+                    await crud.get_consultations_after(db, cursor=cursor, limit=config.limit)
+
+            await self._measure(f"paginate/search-offset/n={size}/depth={depth}", search_page)
+            await self._measure(f"paginate/list-offset/n={size}/depth={depth}", offset_page)
+            await self._measure(f"paginate/list-keyset/n={size}/depth={depth}", keyset_page)
+
+    async def bench_api(self, sessions, size: int) -> None:
+        from httpx import ASGITransport, AsyncClient
+        from app.db.session import get_db
+        from app.main import app
+
+        async def override_get_db():
+            async with sessions() as db:
+                yield db
+
+        config = self.config
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            # ASGITransport는 lifespan을 실행하지 않으므로 모델 예열/워커 없이 요청 경로만 측정
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                async def search(i):
+                    response = await client.post(
+                        f"{settings.API_V1_STR}/consultations/search",
+                        json={
+                            "query": self.queries[i % len(self.queries)],
+                            "limit": config.limit,
+                            "similarity_threshold": config.similarity_threshold,
+                        },
+                    )
+                    response.raise_for_status()
+
+                await self._measure(f"api/search/n={size}", search)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+
+    async def bench_ingest(self, sessions) -> None:
+        config = self.config
+        # 적재된 코퍼스와 내용 해시가 겹치지 않도록 다른 시드의 텍스트 사용
+        fresh = SyntheticCorpus(config.ingest_batch * (config.ingest_batches + config.warmup),
+                                seed=config.seed + 1, backend=self.backend)
+        texts = [t for block in fresh.blocks() for t in block.texts]
+        batch = config.ingest_batch
+
+        def batch_texts(i):
+            return texts[i * batch:(i + 1) * batch]
+
+        async def embed(i):
+            embedding_service.embed_batch(batch_texts(i))
+
+        calls = iter(range(config.ingest_batches + config.warmup))
+
+        async def bulk_create(_):
+            async with sessions() as db:
+                await crud.bulk_create_consultations(
+                    db, [ConsultationCreate(text=t) for t in batch_texts(next(calls))]
+                )
+
+        await self._measure(f"ingest/embed_batch/batch={batch}", embed, items_per_call=batch,
+                            repeat=config.ingest_batches)
+        await self._measure(f"ingest/bulk_create/batch={batch}", bulk_create, items_per_call=batch,
+                            repeat=config.ingest_batches)
+
+    async def bench_serialization(self) -> None:
+        block = self.corpus.block(0)
+        now = datetime.now()
+        for count in self.config.serialization_sizes:
+            response = ConsultationSearchResponse(
+                results=[
+                    ConsultationSearchResult(
+                        id=i + 1, text=block.texts[i % len(block.texts)], created_at=now, updated_at=now,
+                        similarity=0.5, category=block.categories[i % len(block.texts)]
+                    )
+                    for i in range(count)
+                ],
+                total=count, page=1, limit=count, total_pages=1, has_next=False, has_prev=False
+            )
+
+            async def pydantic_json(_):
+                response.model_dump_json()
+
+            async def fastapi_encoder(_):
+                # FastAPI 응답 경로 (jsonable_encoder + json.dumps)
+                json.dumps(jsonable_encoder(response))
+
+            await self._measure(f"serialize/pydantic-json/results={count}", pydantic_json, items_per_call=count)
+            await self._measure(f"serialize/jsonable-encoder/results={count}", fastapi_encoder, items_per_call=count)
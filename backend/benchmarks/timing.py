@@ -0,0 +1,39 @@
+"""Latency sampling and summary statistics."""
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+
+
+def summarize(samples: List[float], items_per_call: int = 1) -> Dict[str, float]:
+    """Latency percentiles in milliseconds and throughput for per-call `samples` in seconds."""
+    values = np.asarray(samples, dtype=np.float64)
+    summary = {
+        "calls": int(values.size),
+        "mean_ms": float(values.mean() * 1000),
+        "p50_ms": float(np.percentile(values, 50) * 1000),
+        "p95_ms": float(np.percentile(values, 95) * 1000),
+        "p99_ms": float(np.percentile(values, 99) * 1000),
+        "min_ms": float(values.min() * 1000),
+        "max_ms": float(values.max() * 1000),
+    }
+    total = float(values.sum())
+    summary["items_per_second"] = items_per_call * values.size / total if total > 0 else None
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+async def measure(
+    call: Callable[[int], Awaitable[object]],
+    repeat: int,
+    warmup: int = 1,
+    items_per_call: int = 1,
+) -> Dict[str, float]:
+    """Await `call(i)` `warmup` times untimed and then `repeat` times timed."""
+    for i in range(warmup):
+        await call(i)
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        await call(i)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, items_per_call)
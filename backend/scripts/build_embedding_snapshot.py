@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정 (로컬/Docker 환경 모두 대응)
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.engine import create_engine
+from app.search import build_snapshot
+
+# 배치 작업은 긴 스캔/적재가 있으므로 서버 측 statement_timeout 없이 연결
+async_engine = create_engine(statement_timeout_ms=0)
+
+async def main():
+    parser = argparse.ArgumentParser(description="consultations 테이블로 공유 임베딩 스냅샷 생성")
+    parser.add_argument("--output", default=settings.EMBEDDING_SNAPSHOT_PATH,
+                        help="스냅샷 파일 경로 (기본값: EMBEDDING_SNAPSHOT_PATH 설정)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="DB 스트리밍 청크 크기")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    async with AsyncSession(async_engine) as session:
+        snapshot = await build_snapshot(
+            session, args.output, settings.EMBEDDING_DIMENSION, chunk_size=args.chunk_size
+        )
+    elapsed = time.perf_counter() - started
+    
+    size_mb = snapshot.path.stat().st_size / (1024 * 1024)
+    print(f"스냅샷 생성 완료: {snapshot.path} ({len(snapshot)}개, {size_mb:.1f}MB, {elapsed:.1f}초)")
+    print(f"high-water mark (updated_at): {snapshot.high_water_mark}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정 (로컬/Docker 환경 모두 대응)
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.db.engine import create_engine
+from app.models import Consultation, EMBEDDING_STATUS_READY
+
+# 배치 작업은 긴 스캔/적재가 있으므로 서버 측 statement_timeout 없이 연결
+async_engine = create_engine(statement_timeout_ms=0)
+
+async def main():
+    parser = argparse.ArgumentParser(description="기존 상담 기록의 구간(passage) 임베딩 생성/재생성")
+    parser.add_argument("--batch-size", type=int, default=256, help="한 번에 구간을 만드는 상담 수")
+    args = parser.parse_args()
+    
+    if not settings.PASSAGE_SEARCH_ENABLED:
+        print("PASSAGE_SEARCH_ENABLED=true 로 설정한 뒤 실행하세요.")
+        sys.exit(1)
+    
+    started = time.perf_counter()
+    consultations = passages = 0
+    last_id = 0
+    async with AsyncSession(async_engine) as session:
+        while True:
+            # id 순 keyset 배치로 전체 상담을 순회
+            result = await session.execute(
+                select(Consultation.id, Consultation.text, Consultation.embedding)
+                .where(Consultation.id > last_id, Consultation.embedding_status == EMBEDDING_STATUS_READY)
+                .order_by(Consultation.id)
+                .limit(args.batch_size)
+            )
+            rows = [(row.id, row.text, row.embedding) for row in result.all()]
+            if not rows:
+                break
+            passages += await crud.sync_passages(session, rows)
+            consultations += len(rows)
+            last_id = rows[-1][0]
+            print(f"상담 {consultations}개 처리, 구간 {passages}개 저장")
+    
+    elapsed = time.perf_counter() - started
+    print(f"구간 생성 완료: 상담 {consultations}개, 구간 {passages}개 ({elapsed:.1f}초)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
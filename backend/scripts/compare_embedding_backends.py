@@ -0,0 +1,51 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정 (로컬/Docker 환경 모두 대응)
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from app.core.config import settings
+from app.embeddings import create_backend, parity_report
+
+def load_texts(limit):
+    """샘플 상담 데이터에서 비교용 텍스트를 읽습니다."""
+    data_file = project_root / "data" / "consultation_samples.json"
+    with open(data_file, 'r', encoding='utf-8') as f:
+        consultations = json.load(f)['consultations']
+    return [item['text'] for item in consultations][:limit]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="sentence-transformers(fp32) 대비 ONNX Runtime 백엔드의 임베딩 일치도와 처리량 비교"
+    )
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME,
+                        help="모델 이름 또는 로컬 모델 경로 (오프라인 실행 시 캐시된 모델/작은 테스트 모델 지정)")
+    parser.add_argument("--onnx-dir", default=settings.EMBEDDING_ONNX_DIR, help="ONNX 내보내기 디렉토리")
+    parser.add_argument("--quantize", action="store_true", help="int8 동적 양자화 모델 비교")
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_ONNX_THREADS,
+                        help="ONNX Runtime intra-op 스레드 수 (0: 기본값)")
+    parser.add_argument("--limit", type=int, default=256, help="비교할 텍스트 수")
+    parser.add_argument("--batch-size", type=int, default=settings.BATCH_SIZE)
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="최소 코사인 일치도가 이 값보다 낮으면 종료 코드 1")
+    args = parser.parse_args()
+
+    texts = load_texts(args.limit)
+    reference = create_backend("sentence-transformers", args.model, cache_dir=settings.HF_HOME)
+    candidate = create_backend(
+        "onnx", args.model, cache_dir=settings.HF_HOME,
+        onnx_dir=args.onnx_dir, quantize=args.quantize, threads=args.threads
+    )
+    report = parity_report(reference, candidate, texts, batch_size=args.batch_size)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if report["cosine"]["min"] < args.min_cosine:
+        print(f"최소 코사인 일치도 {report['cosine']['min']} < {args.min_cosine}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
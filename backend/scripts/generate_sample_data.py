@@ -13,7 +13,11 @@ sys.path.append(str(project_root))
 
 from app.embeddings.bge_embedder import BGEEmbedder
 from app.models import Consultation
-from app.db.session import async_engine, get_db
+from app.db.engine import create_engine
+from app.db.vector_index import rebuild_after_bulk_load
+
+# 배치 작업은 긴 스캔/적재가 있으므로 서버 측 statement_timeout 없이 연결
+async_engine = create_engine(statement_timeout_ms=0)
 
 def load_consultation_data():
     """JSON 파일에서 상담 데이터를 로드합니다."""
@@ -60,14 +64,16 @@ async def generate_sample_data():
             # 배치 크기 설정
             batch_size = 10
             
-            # 텍스트만 추출 (변형 없이 원본 그대로 사용)
+            # 텍스트는 변형 없이 원본 그대로, 분류는 검색 필터용 메타데이터로 저장
             all_texts = [item['text'] for item in consultation_data]
+            all_categories = [item.get('category') for item in consultation_data]
             print(f"총 생성될 텍스트 개수: {len(all_texts)}")
             
             # 배치 단위로 처리
             total_batches = (len(all_texts) + batch_size - 1) // batch_size
             for i in range(0, len(all_texts), batch_size):
                 batch_texts = all_texts[i:i+batch_size]
+                batch_categories = all_categories[i:i+batch_size]
                 
                 # 배치 임베딩 생성
                 print(f"배치 {i//batch_size + 1}/{total_batches} 처리 중...")
@@ -75,9 +81,10 @@ async def generate_sample_data():
                 
                 # 데이터베이스에 삽입
                 consultations = []
-                for text, embedding in zip(batch_texts, embeddings):
+                for text, category, embedding in zip(batch_texts, batch_categories, embeddings):
                     consultation = Consultation(
                         text=text,
+                        category=category,
                         embedding=embedding.tolist()
                     )
                     consultations.append(consultation)
@@ -91,6 +98,12 @@ async def generate_sample_data():
             count = len(all_consultations)
             print(f"총 {count}개의 상담 데이터가 생성되었습니다.")
             
+            # 대량 적재 후 코퍼스 크기에 맞게 벡터 인덱스 재빌드
+            async with async_engine.begin() as conn:
+                index_params = await rebuild_after_bulk_load(conn, inserted_rows=count)
+            if index_params:
+                print(f"벡터 인덱스 준비 완료: {index_params.method} ({index_params.with_clause()})")
+            
             # 카테고리별 데이터 수 확인
             categories = {}
             for item in consultation_data:
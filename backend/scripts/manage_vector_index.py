@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정 (로컬/Docker 환경 모두 대응)
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from app.db.engine import create_engine
+from app.db.init_db import apply_text_search_upgrades, text_search_ready
+from app.db.vector_index import (
+    VECTOR_INDEX_METHODS,
+    compute_index_params,
+    count_embedded_rows,
+    create_vector_index,
+    get_index_params,
+    rebuild_vector_index,
+)
+
+# 배치 작업은 긴 스캔/적재가 있으므로 서버 측 statement_timeout 없이 연결
+async_engine = create_engine(statement_timeout_ms=0)
+
+async def show_status():
+    async with async_engine.connect() as conn:
+        row_count = await count_embedded_rows(conn)
+        current = await get_index_params(conn)
+        text_search = await text_search_ready(conn)
+    recommended = compute_index_params(row_count)
+    print(f"임베딩 보유 행 수: {row_count}")
+    if current:
+        print(f"현재 인덱스: {current.method} ({current.with_clause()})")
+    else:
+        print("현재 인덱스: 없음 (순차 스캔)")
+    print(f"권장 인덱스: {recommended.method} ({recommended.with_clause()})")
+    print(f"하이브리드 검색 text_search: {'있음' if text_search else '없음 (text-search 명령으로 생성)'}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="consultations.embedding ANN 인덱스 관리")
+    parser.add_argument("command", choices=["status", "create", "rebuild", "text-search"],
+                        help="text-search: 하이브리드 검색용 tsvector 컬럼과 GIN 인덱스 생성 (테이블 재작성)")
+    parser.add_argument("--method", choices=VECTOR_INDEX_METHODS, default=None,
+                        help="인덱스 유형 (기본값: VECTOR_INDEX_TYPE 설정)")
+    args = parser.parse_args()
+    
+    if args.command == "status":
+        await show_status()
+        return
+    
+    if args.command == "text-search":
+        async with async_engine.begin() as conn:
+            if await text_search_ready(conn):
+                print("text_search 컬럼과 인덱스가 이미 있습니다")
+                return
+            await apply_text_search_upgrades(conn)
+        print("text_search 컬럼과 인덱스 생성 완료")
+        return
+    
+    async with async_engine.begin() as conn:
+        if args.command == "create":
+            params = await create_vector_index(conn, method=args.method)
+        else:
+            params = await rebuild_vector_index(conn, method=args.method)
+    print(f"인덱스 {args.command} 완료: {params.method} ({params.with_clause()})")
+
+if __name__ == "__main__":
+    asyncio.run(main())
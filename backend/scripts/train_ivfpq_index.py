@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import math
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정 (로컬/Docker 환경 모두 대응)
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.db.engine import create_engine
+from app.models import Consultation
+from app.search import IVFPQIndex
+
+# 배치 작업은 긴 스캔/적재가 있으므로 서버 측 statement_timeout 없이 연결
+async_engine = create_engine(statement_timeout_ms=0)
+
+def default_nlist(row_count: int, sample_size: int) -> int:
+    # 셀 수 ~ 4*sqrt(N), 단 k-means 학습에 셀당 최소 39개 샘플 확보
+    return max(1, min(int(4 * math.sqrt(row_count)), sample_size // 39))
+
+async def train(args):
+    async with AsyncSession(async_engine) as session:
+        row_count = await crud.count_embedded_consultations(session)
+        if row_count == 0:
+            print("임베딩이 있는 상담 데이터가 없습니다.")
+            return
+        high_water_mark = await session.scalar(select(func.max(Consultation.updated_at)))
+        
+        # 1. 학습 샘플 추출
+        started = time.perf_counter()
+        result = await session.execute(
+            select(Consultation.embedding)
+            .where(Consultation.embedding.isnot(None))
+            .order_by(func.random())
+            .limit(args.sample_size)
+        )
+        sample = np.array(result.scalars().all(), dtype=np.float32)
+        nlist = args.nlist or default_nlist(row_count, len(sample))
+        print(f"학습 샘플 {len(sample)}개 로드 ({time.perf_counter() - started:.1f}초), nlist={nlist}, m={args.m}")
+        
+        # 2. 거친 셀(k-means)과 잔차 PQ 코드북 학습
+        started = time.perf_counter()
+        index = IVFPQIndex(settings.EMBEDDING_DIMENSION, nlist=nlist, m=args.m, nbits=args.nbits)
+        index.train(sample, iterations=args.iterations, seed=args.seed)
+        print(f"학습 완료 ({time.perf_counter() - started:.1f}초)")
+        
+        # 3. 전체 행 인코딩 및 추가
+        started = time.perf_counter()
+        async for ids, embeddings in crud.stream_consultation_embeddings(session, chunk_size=args.chunk_size):
+            index.add_many(ids, embeddings)
+        index.high_water_mark = high_water_mark
+        print(f"{len(index)}개 벡터 인코딩 완료 ({time.perf_counter() - started:.1f}초)")
+    
+    path = index.save(args.output)
+    footprint = index.memory_footprint()
+    print(f"인덱스 저장: {path} (벡터당 {footprint['bytes_per_vector']}바이트, 압축률 {footprint['compression_ratio']}배)")
+
+def main():
+    parser = argparse.ArgumentParser(description="consultations 임베딩으로 IVF-PQ 인덱스 학습")
+    parser.add_argument("--output", default=settings.IVFPQ_INDEX_PATH,
+                        help="인덱스 파일 경로 (기본값: IVFPQ_INDEX_PATH 설정)")
+    parser.add_argument("--sample-size", type=int, default=100000, help="k-means 학습 샘플 수")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF 셀 수 (기본값: 4*sqrt(N))")
+    parser.add_argument("--m", type=int, default=64, help="PQ 서브벡터 수 (차원을 나누어 떨어져야 함)")
+    parser.add_argument("--nbits", type=int, default=8, help="서브벡터당 코드 비트 수")
+    parser.add_argument("--iterations", type=int, default=20, help="k-means 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=10000, help="DB 스트리밍 청크 크기")
+    asyncio.run(train(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
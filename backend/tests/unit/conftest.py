@@ -1,6 +1,9 @@
 """단위 테스트용 간단한 설정"""
 import pytest
+import pytest_asyncio
 import os
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.base import Base
 
 # 테스트 환경 설정
 os.environ['TESTING'] = 'true'
@@ -14,3 +17,31 @@ def mock_embedding():
 def sample_text():
     """샘플 텍스트"""
     return "오늘 민수가 친구들과 협력하는 모습을 보였습니다."
+
+# 결정적 키워드 임베딩에 쓰는 키워드 (앞쪽 차원 순서)
+KEYWORDS = ("수학", "교우", "건강")
+
+
+def keyword_embedding(text):
+    """키워드 등장 횟수를 앞쪽 차원에 둔 결정적 임베딩 (1024차원)"""
+    vector = [float(text.count(keyword)) for keyword in KEYWORDS] + [0.0] * (1024 - len(KEYWORDS))
+    vector[-1] = 0.1
+    return vector
+
+
+def keyword_embeddings(texts):
+    return [keyword_embedding(text) for text in texts]
+
+
+@pytest_asyncio.fixture
+async def sqlite_session():
+    """테이블이 생성된 인메모리 SQLite 세션 (모듈별 패치는 각 테스트 파일의 fixture에서 적용)"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = AsyncSession(engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
@@ -0,0 +1,87 @@
+"""비동기 임베딩 API 단위 테스트"""
+import asyncio
+import threading
+import time
+import pytest
+import numpy as np
+from app.services.embedding_cache import QueryEmbeddingCache
+from app.services.embedding_service import EmbeddingService
+
+
+class TestAsyncEmbedding:
+    """추론이 이벤트 루프를 막지 않는지 검증"""
+
+    @pytest.mark.asyncio
+    async def test_inference_does_not_block_event_loop(self, monkeypatch):
+        def slow_embed(text):
+            time.sleep(0.2)
+            return np.ones(4, dtype=np.float32)
+
+        monkeypatch.setattr("app.services.embedding_service.embedder.embed_text", slow_embed)
+        service = EmbeddingService()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            embedding = await service.aembed_text("상담")
+        finally:
+            task.cancel()
+            await service.shutdown()
+
+        assert embedding == [1.0] * 4
+        # 추론 중에도 다른 코루틴이 계속 실행됨
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, monkeypatch):
+        monkeypatch.setattr("app.services.embedding_service.settings.EMBEDDING_MAX_CONCURRENCY", 2)
+        monkeypatch.setattr("app.services.embedding_service.settings.EMBEDDING_MICRO_BATCHING", False)
+        active, peak = 0, 0
+        lock = threading.Lock()
+
+        def tracked_embed(text):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return np.zeros(4, dtype=np.float32)
+
+        monkeypatch.setattr("app.services.embedding_service.embedder.embed_text", tracked_embed)
+        service = EmbeddingService()
+        try:
+            await asyncio.gather(*(service.aembed_text(f"상담 {i}") for i in range(6)))
+        finally:
+            await service.shutdown()
+        assert peak == 2
+
+
+class TestAsyncSingleFlight:
+    """비동기 캐시 단일 실행 검증"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_computation(self):
+        cache = QueryEmbeddingCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return np.ones(4)
+
+        key = cache.make_key("m", "상담")
+        results = await asyncio.gather(*(cache.aget_or_compute(key, compute) for _ in range(5)))
+
+        assert calls == 1
+        assert [hit for _, hit in results] == [False] * 5
+        assert cache.stats()["coalesced"] == 4
+        assert (await cache.aget_or_compute(key, compute))[1] is True
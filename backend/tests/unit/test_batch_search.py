@@ -0,0 +1,118 @@
+"""다중 쿼리 배치 검색 단위 테스트"""
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app import crud
+from app.db.base import Base
+from app.models import Consultation
+from app.search import InMemoryVectorIndex, QuantizedVectorIndex
+
+
+def _random_vectors(count, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestInProcessBatchSearch:
+    """배치 검색 결과가 쿼리별 단일 검색과 같은지 검증"""
+
+    def test_memory_index_matches_single_search(self, monkeypatch):
+        # 블록 경계를 넘는 누적 동작도 함께 검증
+        monkeypatch.setattr("app.search.memory_index.BATCH_SCAN_BLOCK_ROWS", 64)
+        vectors = _random_vectors(300)
+        index = InMemoryVectorIndex(16)
+        index.add_many(range(1, 301), vectors)
+        index.remove(7)
+        queries = _random_vectors(5, seed=1)
+        limits, thresholds = [3, 5, 1, 10, 4], [0.0, 0.2, -1.0, 0.5, 0.1]
+
+        batch = index.search_many(queries, limits, thresholds)
+
+        for query, limit, threshold, (hits, total) in zip(queries, limits, thresholds, batch):
+            expected_hits, expected_total = index.search(query, limit=limit, similarity_threshold=threshold)
+            assert total == expected_total
+            assert [i for i, _ in hits] == [i for i, _ in expected_hits]
+
+    def test_quantized_candidates_match_single_search(self, monkeypatch):
+        # 복원 블록과 점수 청크 경계를 넘는 누적 동작도 함께 검증
+        monkeypatch.setattr("app.search.quantized.SCAN_BLOCK_ROWS", 16)
+        monkeypatch.setattr("app.search.quantized.BATCH_SCAN_BLOCK_ROWS", 40)
+        vectors = _random_vectors(200)
+        index = QuantizedVectorIndex(16, mode="int8")
+        index.add_many(range(200), vectors)
+        queries = _random_vectors(3, seed=2)
+
+        batch = index.search_candidates_many(queries, [8, 8, 8], [0.1, 0.3, 0.0], slack=0.02)
+
+        for query, threshold, (ids, total) in zip(queries, [0.1, 0.3, 0.0], batch):
+            expected_ids, expected_total = index.search_candidates(query, 8, threshold, slack=0.02)
+            assert total == expected_total
+            assert ids.tolist() == expected_ids.tolist()
+
+
+class TestCrudBatchSearch:
+    """DB 검색 모드의 배치 순위 계산 검증"""
+
+    @pytest.mark.asyncio
+    async def test_python_scan_matches_single_search(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+        vectors = _random_vectors(20, dimension=1024)
+        session.add_all([Consultation(text=f"상담 {i}", embedding=v.tolist()) for i, v in enumerate(vectors)])
+        await session.commit()
+        queries = [vectors[0].tolist(), vectors[5].tolist()]
+        try:
+            batch = await crud.rank_consultations_batch(session, queries, [3, 2], [0.0, -1.0], mode="python")
+            for query, limit, threshold, (hits, total) in zip(queries, [3, 2], [0.0, -1.0], batch):
+                results, expected_total = await crud.search_consultations_by_embedding(
+                    session, query, limit=limit, similarity_threshold=threshold, mode="python"
+                )
+                assert total == expected_total
+                assert [i for i, _ in hits] == [c.id for c, _ in results]
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_pgvector_ranks_all_queries_in_one_statement(self, monkeypatch):
+        monkeypatch.setattr("app.crud.settings.VECTOR_INDEX_TYPE", "none")
+        ranked = MagicMock()
+        ranked.all.return_value = [(0, 11, 0.9), (1, 12, 0.8), (0, 13, 0.95)]
+        counts = MagicMock()
+        counts.one.return_value = (42,)
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[ranked, counts])
+
+        results = await crud.rank_consultations_batch(
+            db, [[1.0] + [0.0] * 1023, [0.0, 1.0] + [0.0] * 1022], [2, 5], [0.3, 0.3], mode="pgvector"
+        )
+
+        sql = str(db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+        assert sql.count("<=>") >= 2 and "UNION ALL" in sql
+        count_sql = str(db.execute.call_args_list[1][0][0].compile(dialect=postgresql.dialect()))
+        assert "FILTER (WHERE" in count_sql
+        # limit을 채운 첫 쿼리만 COUNT, 두 번째 쿼리는 결과 수가 곧 전체 개수
+        assert results == [([(13, 0.95), (11, 0.9)], 42), ([(12, 0.8)], 1)]
+
+
+class TestEmbedQueries:
+    """배치 쿼리 임베딩이 캐시 미스만 한 번에 계산하는지 검증"""
+
+    def test_only_misses_are_embedded_once(self, monkeypatch):
+        from app.services.embedding_service import EmbeddingService
+        monkeypatch.setattr("app.services.embedding_service.settings.QUERY_CACHE_ENABLED", True)
+        service = EmbeddingService()
+        embed_batch = MagicMock(side_effect=lambda texts, batch_size: [np.full(4, len(t), dtype=np.float32) for t in texts])
+        monkeypatch.setattr("app.services.embedding_service.embedder.embed_batch", embed_batch)
+
+        service.embed_queries(["가"])
+        vectors = service.embed_queries(["가", "나다", " 나다 ", "가"])
+
+        assert [v[0] for v in vectors] == [1.0, 2.0, 2.0, 1.0]
+        assert embed_batch.call_count == 2
+        assert embed_batch.call_args[0][0] == ["나다"]
@@ -0,0 +1,108 @@
+"""벤치마크 스위트(합성 코퍼스, 결정적 임베더, 결과 비교) 단위 테스트"""
+import os
+import pytest
+import numpy as np
+from benchmarks.compare import compare_results
+from benchmarks.corpus import SyntheticCorpus
+from benchmarks.embedder import HashingBackend, deterministic_embedder
+from benchmarks.import_time import check_import_time, parse_importtime
+from benchmarks.scan import check_quantized_scan
+from benchmarks.suite import BenchmarkConfig, BenchmarkRun
+from app.services.embedding_service import embedding_service
+
+
+class TestSyntheticCorpus:
+    """시드 기반 코퍼스 재현성 검증"""
+
+    def test_same_seed_same_rows_regardless_of_size(self):
+        small, large = SyntheticCorpus(300, seed=7), SyntheticCorpus(2500, seed=7)
+        first, second = small.block(0), large.block(0)
+        assert first.texts == second.texts[:300]
+        np.testing.assert_array_equal(first.vectors, second.vectors[:300])
+        assert small.queries(5) == large.queries(5)
+        assert SyntheticCorpus(300, seed=8).block(0).texts != first.texts
+
+    def test_vectors_are_normalized_and_topics_cluster(self):
+        corpus = SyntheticCorpus(400, seed=0)
+        block = corpus.block(0)
+        np.testing.assert_allclose(np.linalg.norm(block.vectors, axis=1), 1.0, rtol=1e-5)
+        query = corpus.backend.encode(corpus.queries(1))[0]
+        scores = block.vectors @ query
+        # 쿼리 주제의 문서가 다른 주제 문서보다 평균적으로 가까움
+        topic = corpus.categories[[i for i, words in enumerate(corpus.topic_words)
+                                   if corpus.queries(1)[0].split()[0] in words][0]]
+        same = np.array([category == topic for category in block.categories])
+        assert scores[same].mean() > scores[~same].mean()
+
+
+class TestHashingBackend:
+    """결정적 임베더 검증"""
+
+    def test_deterministic_across_instances(self):
+        a, b = HashingBackend(dimension=64), HashingBackend(dimension=64)
+        np.testing.assert_array_equal(a.encode(["수학 시간"]), b.encode(["수학 시간"]))
+
+    def test_routes_embedding_service_through_backend(self):
+        backend = HashingBackend()
+        with deterministic_embedder(backend):
+            vectors = embedding_service.embed_batch(["수학 시간", "교우 관계"])
+        assert os.environ["TESTING"] == "true"
+        np.testing.assert_allclose(vectors, backend.encode(["수학 시간", "교우 관계"]), rtol=1e-5)
+
+
+class TestCompareResults:
+    """두 실행 결과 비교 검증"""
+
+    def test_flags_latency_and_throughput_regressions(self):
+        baseline = {"results": {"a": {"p50_ms": 10.0, "items_per_second": 100.0}, "b": {"p50_ms": 10.0}}}
+        candidate = {"results": {"a": {"p50_ms": 12.0, "items_per_second": 95.0}, "c": {"p50_ms": 1.0}}}
+        (latency,) = compare_results(baseline, candidate, "p50_ms", threshold=0.1)
+        assert latency["case"] == "a" and latency["regression"]
+        (throughput,) = compare_results(baseline, candidate, "items_per_second", threshold=0.1)
+        assert not throughput["regression"]
+
+
+class TestBenchmarkRun:
+    """작은 코퍼스로 전체 실행 경로 검증"""
+
+    @pytest.mark.asyncio
+    async def test_small_run_produces_comparable_report(self):
+        config = BenchmarkConfig(
+            sizes=[60], benchmarks=["search", "pagination", "serialization"], queries=2,
+            repeat=1, warmup=0, depths=[0, 20], serialization_sizes=[5]
+        )
+        report = await BenchmarkRun(config, log=lambda message: None).run()
+
+        assert report["database"] == "sqlite"
+        assert report["config"]["sizes"] == [60]
+        assert {"search/python/n=60", "search/memory/n=60", "paginate/list-keyset/n=60/depth=20",
+                "serialize/pydantic-json/results=5"} <= set(report["results"])
+        assert report["results"]["search/memory/n=60"]["calls"] == 1
+
+
+class TestQuantizedScan:
+    """int8 후보 스캔과 float32 스캔 비교 보고서 검증"""
+
+    def test_report_compares_single_and_batch_scans(self):
+        report = check_quantized_scan(rows=300, dimension=32, repeat=5, batch=2, max_ratio=float("inf"))
+        assert [result["case"] for result in report["results"]] == ["single", "batch=2"]
+        assert all(result["float32_ms"] > 0 and result["int8_ms"] > 0 for result in report["results"])
+        assert report["memory_bytes"]["int8"] < report["memory_bytes"]["float32"]
+        assert report["ok"]
+
+
+class TestImportTime:
+    """import 시간 출력 파싱과 무거운 모듈 지연 로딩 검증"""
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   numpy.core\n"
+            "import time:      2500 |       9000 | app.main\n"
+        )
+        assert parse_importtime(stderr) == {"numpy.core": 0.12, "app.main": 9.0}
+
+    def test_app_main_imports_without_model_libraries(self):
+        # 시간 예산은 부하에 따라 흔들리므로 `python -m benchmarks import-time`에서만 검사
+        report = check_import_time("app.main", repeat=1)
+        assert report["forbidden_loaded"] == []
@@ -0,0 +1,91 @@
+"""대량 생성 단위 테스트"""
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.base import Base
+from app.models import Consultation
+from app.search import InMemoryVectorIndex
+from app.services.consultation_service import ConsultationService
+
+
+class TestBulkCreate:
+    """배치 임베딩 + 다중 행 INSERT 검증"""
+
+    @pytest.mark.asyncio
+    async def test_valid_items_created_and_errors_reported(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+        service = ConsultationService()
+        service.vector_index = InMemoryVectorIndex(1024)
+
+        def fake_embed_batch(texts):
+            return [np.eye(1024, dtype=np.float32)[i].tolist() for i in range(len(texts))]
+
+        items = [{"text": "첫 상담"}, {"text": "   "}, {"text": "둘째 상담"}, {"body": "x"}, {"text": "셋째 상담"}]
+        try:
+            with patch.object(service.embedding_service, "embed_batch", side_effect=fake_embed_batch) as embed:
+                created, errors = await service.bulk_create_consultations(session, items)
+
+            assert embed.call_count == 1
+            assert [index for index, _ in created] == [0, 2, 4]
+            assert [c.text for _, c in created] == ["첫 상담", "둘째 상담", "셋째 상담"]
+            assert all(c.id is not None and c.created_at is not None for _, c in created)
+            assert [index for index, _ in errors] == [1, 3]
+            assert all(messages for _, messages in errors)
+
+            count = await session.scalar(select(func.count()).select_from(Consultation))
+            assert count == 3
+            assert len(service.vector_index) == 3
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_all_invalid_skips_insert(self):
+        service = ConsultationService()
+        with patch("app.services.consultation_service.crud.bulk_create_consultations") as bulk:
+            created, errors = await service.bulk_create_consultations(None, [{"text": ""}, 3])
+        bulk.assert_not_called()
+        assert created == [] and [index for index, _ in errors] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_index_rebuild_is_reported_not_run(self, caplog):
+        service = ConsultationService()
+        db = MagicMock(connection=AsyncMock(), commit=AsyncMock())
+        consultation = Consultation(id=1, text="상담", embedding=None)
+        with patch("app.services.consultation_service.crud.bulk_create_consultations",
+                   AsyncMock(return_value=[consultation])), \
+                patch("app.services.consultation_service.bulk_load_index_action",
+                      AsyncMock(return_value="rebuild")) as action, \
+                patch("app.db.vector_index.rebuild_vector_index") as rebuild, \
+                caplog.at_level("WARNING"):
+            created, _ = await service.bulk_create_consultations(db, [{"text": "상담"}])
+
+        assert action.await_args.kwargs == {"inserted_rows": 1}
+        rebuild.assert_not_called()
+        assert [c.id for _, c in created] == [1]
+        assert "manage_vector_index.py rebuild" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_response_items_carry_all_stored_fields(self):
+        from datetime import datetime
+        from app.api.v1.endpoints.consultations import bulk_create_consultations
+        from app.schemas import ConsultationBulkCreateRequest
+
+        now = datetime(2025, 7, 18)
+        consultation = Consultation(
+            id=7, text="상담", category="진로", owner="teacher-1",
+            embedding_status="ready", created_at=now, updated_at=now
+        )
+        with patch("app.api.v1.endpoints.consultations.consultation_service.bulk_create_consultations",
+                   AsyncMock(return_value=([(2, consultation)], []))):
+            response = await bulk_create_consultations(
+                ConsultationBulkCreateRequest(items=[{"text": "상담"}]), db=MagicMock()
+            )
+
+        item = response.created[0]
+        assert (item.index, item.id, item.category, item.owner) == (2, 7, "진로", "teacher-1")
@@ -0,0 +1,61 @@
+"""내용 해시 기반 임베딩 재사용 단위 테스트"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from app import crud
+from app.schemas import ConsultationCreate, ConsultationUpdate
+from app.services.embedding_cache import content_hash
+from app.services.embedding_service import embedding_service
+
+
+def _vector(value):
+    return [float(value)] + [0.0] * 1023
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    monkeypatch.setattr(embedding_service, "reuse_counters", {"unchanged_update": 0, "copied_by_hash": 0})
+    return embedding_service.reuse_counters
+
+
+class TestContentHashReuse:
+    """같은 내용은 모델을 다시 호출하지 않는지 검증"""
+
+    def test_hash_ignores_whitespace_differences(self):
+        assert content_hash("  상담   내용\n") == content_hash("상담 내용")
+        assert content_hash("상담 내용") != content_hash("다른 내용")
+
+    @pytest.mark.asyncio
+    async def test_create_copies_embedding_of_same_text(self, sqlite_session, counters):
+        with patch("app.crud.embedding_service.aembed_text", AsyncMock(return_value=_vector(1))) as embed:
+            first = await crud.create_consultation(sqlite_session, ConsultationCreate(text="정기 상담 템플릿"))
+            second = await crud.create_consultation(sqlite_session, ConsultationCreate(text="정기  상담 템플릿 "))
+
+        assert embed.call_count == 1
+        assert second.content_hash == first.content_hash
+        assert list(second.embedding) == list(first.embedding)
+        assert counters["copied_by_hash"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_update_skips_model(self, sqlite_session, counters):
+        with patch("app.crud.embedding_service.aembed_text", AsyncMock(return_value=_vector(1))) as embed:
+            created = await crud.create_consultation(sqlite_session, ConsultationCreate(text="상담 내용"))
+            await crud.update_consultation(sqlite_session, created.id, ConsultationUpdate(text="상담 내용"))
+            assert embed.call_count == 1
+            await crud.update_consultation(sqlite_session, created.id, ConsultationUpdate(text="바뀐 상담 내용"))
+            assert embed.call_count == 2
+        assert counters["unchanged_update"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_embeds_each_new_text_once(self, sqlite_session, counters):
+        with patch("app.crud.embedding_service.aembed_text", AsyncMock(return_value=_vector(9))):
+            await crud.create_consultation(sqlite_session, ConsultationCreate(text="기존 내용"))
+
+        embed_batch = AsyncMock(side_effect=lambda texts: [_vector(i + 1) for i in range(len(texts))])
+        with patch("app.crud.embedding_service.aembed_batch", embed_batch):
+            created = await crud.bulk_create_consultations(sqlite_session, [
+                ConsultationCreate(text=text) for text in ["새 내용", "기존 내용", "새 내용", "다른 내용"]
+            ])
+
+        assert embed_batch.call_args[0][0] == ["새 내용", "다른 내용"]
+        assert [c.embedding[0] for c in created] == [1.0, 9.0, 1.0, 2.0]
+        assert counters["copied_by_hash"] == 2
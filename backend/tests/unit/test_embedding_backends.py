@@ -0,0 +1,90 @@
+"""임베딩 추론 백엔드 단위 테스트"""
+import sys
+import pytest
+import numpy as np
+from unittest.mock import patch
+from app.embeddings import BGEEmbedder, EmbedderBackend, create_backend, parity_report
+from app.embeddings.onnx_backend import OnnxBackend, export_dir_for, pool
+
+
+class _FakeBackend(EmbedderBackend):
+    name = "fake"
+
+    def __init__(self, noise=0.0):
+        super().__init__("fake-model")
+        self.noise = noise
+        self.calls = []
+
+    def load(self):
+        pass
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.calls.append((list(texts), batch_size))
+        vectors = np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+        vectors[:, 0] += self.noise
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestPooling:
+    """ONNX 출력 풀링 검증"""
+
+    def test_mean_pooling_ignores_padding(self):
+        hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]])
+        mask = np.array([[1, 1, 0]])
+        assert pool(hidden, mask, "mean").tolist() == [[2.0, 3.0]]
+        assert pool(hidden, mask, "max").tolist() == [[3.0, 4.0]]
+        assert pool(hidden, mask, "cls").tolist() == [[1.0, 2.0]]
+
+    def test_unknown_pooling_rejected(self):
+        with pytest.raises(ValueError):
+            pool(np.zeros((1, 1, 2)), np.ones((1, 1)), "weightedmean")
+
+
+class TestBackendSelection:
+    """설정에 따른 백엔드 선택 검증"""
+
+    def test_create_backend(self, tmp_path):
+        backend = create_backend("onnx", "org/model", onnx_dir=str(tmp_path), quantize=True, threads=2)
+        assert isinstance(backend, OnnxBackend)
+        assert backend.model_path == export_dir_for(str(tmp_path), "org/model") / "model.int8.onnx"
+        assert backend.info()["intra_op_threads"] == 2
+        with pytest.raises(ValueError):
+            create_backend("tensorrt", "org/model")
+
+    def test_onnx_backend_requires_onnxruntime(self, tmp_path):
+        backend = OnnxBackend("org/model", export_dir=str(tmp_path))
+        with patch.dict(sys.modules, {"onnxruntime": None}):
+            with pytest.raises(ImportError, match="onnxruntime"):
+                backend.load()
+
+    def test_embedder_delegates_to_backend(self):
+        fake = _FakeBackend()
+        embedder = BGEEmbedder(model_name="fake-model", backend="fake")
+        with patch.dict("os.environ", {"TESTING": "false"}), \
+             patch("app.embeddings.bge_embedder.create_backend", return_value=fake):
+            single = embedder.embed_text("상담")
+            batch = embedder.embed_batch(["가", "가나"], batch_size=8)
+
+        assert single.shape == (3,)
+        assert batch.shape == (2, 3)
+        # 길이순으로 묶여 인코딩되지만 결과는 입력 순서
+        assert fake.calls[-1] == (["가나", "가"], 2)
+        np.testing.assert_allclose(batch, fake.encode(["가", "가나"]))
+        assert embedder.info()["backend"] == "fake"
+
+
+class TestParityReport:
+    """백엔드 간 일치도 보고서 검증"""
+
+    def test_identical_backends_agree(self):
+        texts = [f"상담 내용 {i}" * (i + 1) for i in range(12)]
+        report = parity_report(_FakeBackend(), _FakeBackend(), texts, top_k=3)
+        assert report["texts"] == 12
+        assert report["cosine"]["min"] == pytest.approx(1.0)
+        assert report["top3_overlap"] == pytest.approx(1.0)
+
+    def test_perturbed_backend_reports_lower_agreement(self):
+        texts = [f"상담 내용 {i}" for i in range(8)]
+        report = parity_report(_FakeBackend(), _FakeBackend(noise=5.0), texts)
+        assert report["cosine"]["min"] < 0.999
+        assert report["texts_per_second"]["candidate"] is not None
@@ -0,0 +1,155 @@
+"""쿼리 임베딩 캐시 단위 테스트"""
+import asyncio
+import threading
+import unicodedata
+import time
+import pytest
+import numpy as np
+from unittest.mock import Mock
+from app.services.embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryNormalization:
+    def test_whitespace_and_unicode_are_normalized(self):
+        # 조합형(NFD) 한글과 공백 차이는 같은 키로 취급
+        word = "상담"
+        decomposed = unicodedata.normalize("NFD", word)
+        assert decomposed != word
+        assert normalize_query(f"  {decomposed}\n 내용 ") == f"{word} 내용"
+
+    def test_key_includes_model_name(self):
+        assert QueryEmbeddingCache.make_key("a", "협력") != QueryEmbeddingCache.make_key("b", "협력")
+
+
+class TestQueryEmbeddingCache:
+    """LRU/TTL/단일 실행 동작 검증"""
+
+    def test_hit_and_miss_counters(self):
+        cache = QueryEmbeddingCache(max_entries=10)
+        compute = Mock(return_value=np.ones(4))
+        key = cache.make_key("model", "협력")
+
+        _, first_hit = cache.get_or_compute(key, compute)
+        _, second_hit = cache.get_or_compute(key, compute)
+
+        assert (first_hit, second_hit) == (False, True)
+        assert compute.call_count == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction_by_entries(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put(("m", "a"), np.ones(4))
+        cache.put(("m", "b"), np.ones(4))
+        cache.get(("m", "a"))
+        cache.put(("m", "c"), np.ones(4))
+
+        assert cache.get(("m", "b")) is None
+        assert cache.get(("m", "a")) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = QueryEmbeddingCache(max_entries=100, max_bytes=64)
+        cache.put(("m", "a"), np.ones(8))
+        cache.put(("m", "b"), np.ones(8))
+        assert len(cache) == 1
+        assert cache.stats()["bytes"] <= 64
+
+    def test_ttl_expiration(self):
+        clock = FakeClock()
+        cache = QueryEmbeddingCache(ttl_seconds=10, clock=clock)
+        cache.put(("m", "a"), np.ones(4))
+        clock.now = 11
+        assert cache.get(("m", "a")) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_single_flight(self):
+        cache = QueryEmbeddingCache()
+        started = threading.Event()
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return np.ones(4)
+
+        key = cache.make_key("m", "협력")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key, slow_compute)))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len(results) == 5
+        assert cache.stats()["coalesced"] == 4
+
+    def test_failure_is_not_cached(self):
+        cache = QueryEmbeddingCache()
+        key = cache.make_key("m", "협력")
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute(key, Mock(side_effect=RuntimeError("model")))
+        vector, hit = cache.get_or_compute(key, Mock(return_value=np.ones(4)))
+        assert not hit and vector.shape == (4,)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        cache = QueryEmbeddingCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_compute():
+            calls.append(1)
+            await release.wait()
+            return np.ones(4)
+
+        key = cache.make_key("m", "협력")
+        leader = asyncio.create_task(cache.aget_or_compute(key, slow_compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.aget_or_compute(key, slow_compute))
+        await asyncio.sleep(0)
+        # 첫 호출자의 요청이 취소되어도 계산은 계속되고 대기자는 결과를 받음
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+        vector, hit = await waiter
+
+        assert not hit and vector.shape == (4,)
+        assert len(calls) == 1
+        assert cache.get(key) is not None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_computation_gives_waiters_plain_error(self):
+        cache = QueryEmbeddingCache()
+
+        async def cancelled_compute():
+            raise asyncio.CancelledError()
+
+        async def compute():
+            return np.ones(4)
+
+        key = cache.make_key("m", "협력")
+        leader = asyncio.create_task(cache.aget_or_compute(key, cancelled_compute))
+        waiter = asyncio.create_task(cache.aget_or_compute(key, compute))
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        with pytest.raises(RuntimeError):
+            await waiter
+        assert cache.stats()["coalesced"] == 1
+        # 실패는 캐시하지 않으므로 다음 호출은 다시 계산
+        vector, hit = await cache.aget_or_compute(key, compute)
+        assert not hit and vector.shape == (4,)
@@ -0,0 +1,216 @@
+"""하이브리드(어휘 + 벡터) 검색과 메타데이터 필터 검색 단위 테스트"""
+import pytest
+import pytest_asyncio
+import numpy as np
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from app import crud
+from app.models import Consultation
+from app.schemas import ConsultationCreate, ConsultationSearchRequest, SearchFilters
+from app.search import InMemoryVectorIndex, QuantizedVectorIndex, build_tsquery, reciprocal_rank_fusion
+from app.services.consultation_service import ConsultationService
+
+from tests.unit.conftest import keyword_embedding as _embed
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session):
+    with patch("app.crud.embedding_service.aembed_text", AsyncMock(side_effect=_embed)):
+        yield sqlite_session
+
+
+async def _seed(db):
+    rows = [
+        ("수학 문제를 잘 풉니다", "학습발달_수학", "teacher-a"),
+        ("수학 수학 단원 평가 만점", "학습발달_수학", "teacher-b"),
+        ("수학 시간에 교우와 협동", "교우관계", "teacher-a"),
+        ("건강 상태 양호", "건강", "teacher-b"),
+    ]
+    created = [
+        await crud.create_consultation(db, ConsultationCreate(text=text, category=category, owner=owner))
+        for text, category, owner in rows
+    ]
+    # 날짜 범위 필터 검증용으로 첫 행만 과거로 이동
+    await db.execute(
+        update(Consultation).where(Consultation.id == created[0].id)
+        .values(created_at=datetime(2020, 1, 1))
+    )
+    await db.commit()
+    return created
+
+
+def _pg_session():
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(all=lambda: []))
+    db.scalar = AsyncMock(return_value=0)
+    db.get_bind.return_value.dialect.name = "postgresql"
+    return db
+
+
+def _compiled(db, call_index=-1):
+    return str(db.execute.call_args_list[call_index][0][0].compile(dialect=postgresql.dialect()))
+
+
+class TestHybridHelpers:
+    """어휘 쿼리 생성과 순위 융합 검증"""
+
+    def test_build_tsquery_prefix_terms(self):
+        assert build_tsquery("민수 수학!") == "민수:* | 수학:*"
+        assert build_tsquery("Math & 수학 | math") == "math:* | 수학:*"
+        assert build_tsquery("!!! ?") is None
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+        assert [consultation_id for consultation_id, _ in fused] == [1, 3, 2, 4]
+        assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+class TestSearchRequestFilters:
+    """요청 필터 변환 검증"""
+
+    def test_no_filters_is_none(self):
+        assert ConsultationSearchRequest(query="수학").search_filters() is None
+
+    def test_cache_key_ignores_id_order(self):
+        first = ConsultationSearchRequest(query="수학", category="건강", ids=[3, 1]).search_filters()
+        second = ConsultationSearchRequest(query="수학", category="건강", ids=[1, 3, 3]).search_filters()
+        assert first.cache_key() == second.cache_key()
+
+
+class TestFilterPushdown:
+    """필터가 순위 계산 전에 적용되는지 검증"""
+
+    @pytest.mark.asyncio
+    async def test_python_scan_applies_all_filters(self, db):
+        created = await _seed(db)
+        query = _embed("수학")
+
+        results, total = await crud.search_consultations_by_embedding(
+            db, query, limit=10, similarity_threshold=0.1, mode="python",
+            filters=SearchFilters(category="학습발달_수학")
+        )
+        assert total == 2
+        assert {c.id for c, _ in results} == {created[0].id, created[1].id}
+
+        results, total = await crud.search_consultations_by_embedding(
+            db, query, limit=10, similarity_threshold=0.1, mode="python",
+            filters=SearchFilters(owner="teacher-a", created_from=datetime.now() - timedelta(days=1))
+        )
+        assert [c.id for c, _ in results] == [created[2].id]
+
+        results, total = await crud.search_consultations_by_embedding(
+            db, query, limit=10, similarity_threshold=0.1, mode="python",
+            filters=SearchFilters(ids=[created[1].id, created[3].id])
+        )
+        assert [c.id for c, _ in results] == [created[1].id]
+
+    @pytest.mark.asyncio
+    async def test_pgvector_filters_in_where_clause_with_iterative_scan(self):
+        db = _pg_session()
+        with patch("app.crud.settings.VECTOR_INDEX_TYPE", "hnsw"):
+            await crud.search_consultations_by_embedding(
+                db, [0.0] * 1024, limit=5, mode="pgvector",
+                filters=SearchFilters(category="건강", created_to=datetime(2024, 1, 1), ids=[1, 2])
+            )
+        statements = [str(call[0][0]) for call in db.execute.call_args_list]
+        assert "SET LOCAL hnsw.iterative_scan = strict_order" in statements
+        sql = _compiled(db)
+        assert "consultations.category = " in sql
+        assert "consultations.created_at < " in sql
+        assert "consultations.id IN" in sql
+
+    @pytest.mark.asyncio
+    async def test_memory_mode_scores_only_allowed_rows(self, db):
+        created = await _seed(db)
+        service = ConsultationService()
+        with patch("app.services.consultation_service.settings.SEARCH_MODE", "memory"), \
+             patch.object(service.embedding_service, "aembed_query", new_callable=AsyncMock, return_value=_embed("수학")):
+            results, total = await service.search_consultations(
+                db, "수학", limit=10, similarity_threshold=0.1, filters=SearchFilters(owner="teacher-b")
+            )
+            empty, empty_total = await service.search_consultations(
+                db, "수학", limit=10, filters=SearchFilters(category="없는분류")
+            )
+        assert total == 1 and results[0][0].id == created[1].id
+        assert (empty, empty_total) == ([], 0)
+
+
+class TestAllowedIds:
+    """프로세스 내 인덱스의 허용 id 채점 검증"""
+
+    def test_memory_index_allowed_ids_cover_base_and_tail(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(6, 8)).astype(np.float32)
+        index = InMemoryVectorIndex(8)
+        index._base_ids = np.arange(1, 4, dtype=np.int64)
+        index._base_vectors = index._normalize(vectors[:3])
+        index._base_alive = np.ones(3, dtype=bool)
+        index.add_many([4, 5, 6], vectors[3:])
+        index.upsert(2, vectors[5])
+        index.remove(3)
+
+        hits, total = index.search(vectors[5], limit=10, similarity_threshold=-1.0, allowed_ids=[2, 3, 5, 99])
+        assert total == 2
+        assert hits[0][0] == 2 and hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert {consultation_id for consultation_id, _ in hits} == {2, 5}
+
+    def test_quantized_candidates_restricted_to_allowed_ids(self):
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(50, 16)).astype(np.float32)
+        index = QuantizedVectorIndex(16)
+        index.add_many(range(50), vectors)
+
+        candidate_ids, total = index.search_candidates(
+            vectors[0], candidates=5, similarity_threshold=-1.0, allowed_ids=[3, 7, 11]
+        )
+        assert total == 3
+        assert set(candidate_ids.tolist()) == {3, 7, 11}
+
+
+class TestHybridSearch:
+    """하이브리드 검색 SQL과 융합 검증"""
+
+    @pytest.mark.asyncio
+    async def test_single_statement_with_lexical_and_vector_ranks(self):
+        db = _pg_session()
+        rows = [
+            MagicMock(id=1, lexical_rank=1, vector_rank=None, similarity=0.2),
+            MagicMock(id=2, lexical_rank=2, vector_rank=1, similarity=0.9),
+            MagicMock(id=3, lexical_rank=None, vector_rank=2, similarity=0.8),
+        ]
+        db.execute = AsyncMock(return_value=MagicMock(all=lambda: rows))
+        consultations = {i: MagicMock(id=i) for i in (1, 2, 3)}
+        with patch("app.crud.settings.VECTOR_INDEX_TYPE", "ivfflat"), \
+             patch("app.crud.get_consultations_by_ids",
+                   AsyncMock(side_effect=lambda _, ids: [consultations[i] for i in ids])):
+            results, total = await crud.hybrid_search(
+                db, "민수 수학", [0.0] * 1024, limit=2, filters=SearchFilters(owner="teacher-a")
+            )
+
+        assert total == 3
+        assert [(c.id, similarity) for c, similarity, _ in results] == [(2, 0.9), (1, 0.2)]
+        assert results[0][2] == pytest.approx(1 / 62 + 1 / 61)
+        # 랭킹은 한 번의 SQL로 수행
+        assert db.execute.await_count == 1
+        sql = _compiled(db)
+        assert "ts_rank_cd(consultations.text_search" in sql
+        assert "FULL OUTER JOIN" in sql
+        assert "consultations.owner = " in sql
+
+    @pytest.mark.asyncio
+    async def test_prefilter_restricts_vector_candidates_to_lexical_hits(self):
+        db = _pg_session()
+        await crud.hybrid_search(db, "수학", [0.0] * 1024, prefilter=True)
+        sql = _compiled(db)
+        assert "consultations.id IN (SELECT lexical.id" in sql
+
+        db = _pg_session()
+        assert await crud.hybrid_search(db, "!!!", [0.0] * 1024, prefilter=True) == ([], 0)
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_hybrid_requires_postgresql(self, db):
+        with pytest.raises(ValueError):
+            await crud.hybrid_search(db, "수학", [0.0] * 1024)
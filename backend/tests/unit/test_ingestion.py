@@ -0,0 +1,101 @@
+"""비동기 수집(백그라운드 임베딩) 단위 테스트"""
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app import crud
+from app.db.base import Base
+from app.models import Consultation, EMBEDDING_STATUS_PENDING, EMBEDDING_STATUS_READY
+from app.schemas import ConsultationCreate, ConsultationUpdate
+from app.services.consultation_service import ConsultationService
+from app.services.ingestion_service import IngestionService
+
+
+def _fake_embeddings(texts):
+    return [[float(len(text))] + [0.0] * 1023 for text in texts]
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    # 워커가 별도 세션을 열므로 파일 기반 SQLite 사용
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ingestion.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+class TestAsyncIngestion:
+    """pending 저장 후 백그라운드 임베딩 검증"""
+
+    @pytest.mark.asyncio
+    async def test_write_returns_pending_and_worker_fills_embedding(self, session_factory):
+        service = ConsultationService()
+        ingestion = IngestionService(session_factory=session_factory, batch_size=8)
+        filled = []
+        ingestion.add_listener(lambda ids, embeddings: filled.extend(ids))
+
+        embed_batch = AsyncMock(side_effect=_fake_embeddings)
+        with patch("app.services.consultation_service.settings.INGESTION_MODE", "async"), \
+             patch("app.services.ingestion_service.embedding_service.aembed_batch", embed_batch), \
+             patch("app.crud.embedding_service.aembed_text", AsyncMock()) as embed_text:
+            async with session_factory() as db:
+                created = [
+                    await service.create_consultation(db, ConsultationCreate(text=f"상담 {i}"))
+                    for i in range(3)
+                ]
+            embed_text.assert_not_called()
+            assert all(c.embedding_status == EMBEDDING_STATUS_PENDING and c.embedding is None for c in created)
+
+            # 재시작 시 임베딩이 없는 행을 복구해 처리
+            await ingestion.start()
+            try:
+                await ingestion.join()
+            finally:
+                await ingestion.stop()
+
+        async with session_factory() as db:
+            rows = (await db.execute(select(Consultation))).scalars().all()
+        assert all(row.embedding_status == EMBEDDING_STATUS_READY for row in rows)
+        assert rows[0].embedding[0] == pytest.approx(len("상담 0"))
+        assert embed_batch.call_count == 1
+        assert sorted(filled) == [c.id for c in created]
+        assert ingestion.stats()["recovered"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rows_edited_during_embedding_are_skipped(self, session_factory):
+        service = ConsultationService()
+        ingestion = IngestionService(session_factory=session_factory)
+
+        async with session_factory() as db:
+            with patch("app.services.consultation_service.settings.INGESTION_MODE", "async"):
+                consultation = await service.create_consultation(db, ConsultationCreate(text="원래 내용"))
+
+        async def embed_then_edit(texts):
+            # 임베딩 도중 텍스트가 수정됨
+            async with session_factory() as db:
+                with patch("app.services.consultation_service.settings.INGESTION_MODE", "async"):
+                    await service.update_consultation(db, consultation.id, ConsultationUpdate(text="수정된 내용"))
+            return _fake_embeddings(texts)
+
+        with patch("app.services.ingestion_service.embedding_service.aembed_batch", AsyncMock(side_effect=embed_then_edit)):
+            updated = await ingestion.process_batch([consultation.id])
+
+        assert updated == []
+        async with session_factory() as db:
+            row = await db.get(Consultation, consultation.id)
+        assert row.embedding_status == EMBEDDING_STATUS_PENDING and row.embedding is None
+        assert ingestion.stats()["skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_claims_rows_with_skip_locked(self):
+        # 모든 워커 프로세스가 시작 시 같은 행을 복구하므로 배치는 행을 잠가 선점해야 함
+        db = Mock(execute=AsyncMock(return_value=Mock(all=Mock(return_value=[]))))
+        await crud.get_pending_consultations(db, [1, 2])
+        statement = db.execute.await_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert sql.endswith("FOR UPDATE SKIP LOCKED")
@@ -0,0 +1,127 @@
+"""IVF-PQ 인덱스 단위 테스트"""
+import pytest
+import numpy as np
+from datetime import datetime
+from app.search import IVFPQIndex
+from app.search.ivfpq import kmeans
+
+
+def _clustered_vectors(count, dimension=32, clusters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension))
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centers[labels] + 0.3 * rng.normal(size=(count, dimension))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def trained_index():
+    vectors = _clustered_vectors(2000)
+    index = IVFPQIndex(32, nlist=8, m=8)
+    index.train(vectors[:1000], iterations=10)
+    index.add_many(range(2000), vectors)
+    return index, vectors
+
+
+class TestKMeans:
+    def test_separates_obvious_clusters(self):
+        data = np.array([[0, 0], [0, 0.1], [10, 10], [10, 10.1]], dtype=np.float32)
+        centroids = kmeans(data, 2, iterations=5)
+        assert sorted(np.round(centroids[:, 0]).tolist()) == [0.0, 10.0]
+
+
+class TestIVFPQIndex:
+    """IVF-PQ 검색/증분 추가/저장 검증"""
+
+    def test_recall_with_all_cells(self, trained_index):
+        index, vectors = trained_index
+        query = vectors[11]
+
+        candidates, _ = index.search_candidates(query, candidates=50, similarity_threshold=-1.0, nprobe=8)
+
+        exact_top = set(np.argsort(-(vectors @ query))[:10].tolist())
+        assert len(exact_top & set(candidates.tolist())) >= 8
+
+    def test_nprobe_limits_scanned_cells(self, trained_index):
+        index, vectors = trained_index
+        all_ids, _ = index.scores(vectors[0], nprobe=8)
+        probed_ids, _ = index.scores(vectors[0], nprobe=1)
+        assert len(all_ids) == 2000
+        assert len(probed_ids) < len(all_ids)
+
+    def test_incremental_add_and_remove(self, trained_index):
+        index, vectors = trained_index
+        new_vector = vectors[5] + 0.01
+
+        index.upsert(5000, new_vector)
+        assert 5000 in index and len(index) == 2001
+        candidates, _ = index.search_candidates(new_vector, candidates=5, similarity_threshold=-1.0, nprobe=8)
+        assert 5000 in candidates.tolist()
+
+        assert index.remove(5000)
+        assert index.retain_only(range(1000)) == 1000
+        assert len(index) == 1000
+
+    def test_save_and_load(self, trained_index, tmp_path):
+        index, vectors = trained_index
+        index.high_water_mark = datetime(2025, 7, 18, 12, 0)
+
+        loaded = IVFPQIndex.load(index.save(tmp_path / "index.npz"))
+
+        assert len(loaded) == len(index)
+        assert loaded.high_water_mark == index.high_water_mark
+        original, _ = index.search_candidates(vectors[3], candidates=10, similarity_threshold=-1.0)
+        restored, _ = loaded.search_candidates(vectors[3], candidates=10, similarity_threshold=-1.0)
+        assert original.tolist() == restored.tolist()
+
+    def test_compression(self, trained_index):
+        index, _ = trained_index
+        footprint = index.memory_footprint()
+        # 코드(m=8) + id + id 위치 맵
+        assert footprint["bytes_per_vector"] == 8 + 8 + 16
+        assert footprint["used_bytes"] >= len(index) * footprint["bytes_per_vector"]
+
+    def test_requires_training(self):
+        with pytest.raises(RuntimeError):
+            IVFPQIndex(32, nlist=4, m=8).add_many([1], np.ones((1, 32)))
+
+    def test_dimension_must_split_into_subvectors(self):
+        with pytest.raises(ValueError):
+            IVFPQIndex(30, nlist=4, m=8)
+
+
+class TestSearchTotalEstimate:
+    """ivfpq 모드 검색 응답의 total 근사 표시 검증"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode,estimate", [("ivfpq", True), ("memory", False)])
+    async def test_response_marks_probed_cell_total(self, mode, estimate):
+        import json
+        from unittest.mock import AsyncMock, MagicMock, patch
+        from app.api.v1.endpoints.consultations import search_consultations
+        from app.schemas import ConsultationSearchRequest
+
+        with patch("app.services.consultation_service.settings.SEARCH_MODE", mode), \
+                patch("app.api.v1.endpoints.consultations.consultation_service.search_consultations_page",
+                      AsyncMock(return_value=([], 7, None))):
+            response = await search_consultations(ConsultationSearchRequest(query="수학"), db=MagicMock())
+
+        body = json.loads(response.body)
+        assert body["total"] == 7
+        assert body["total_is_estimate"] is estimate
+
+    @pytest.mark.asyncio
+    async def test_hybrid_total_is_estimate(self):
+        import json
+        from unittest.mock import AsyncMock, MagicMock, patch
+        from app.api.v1.endpoints.consultations import search_consultations
+        from app.schemas import ConsultationSearchRequest
+
+        # 하이브리드 total은 후보 목록 크기에 묶이므로 검색 모드와 무관하게 근사값
+        with patch("app.services.consultation_service.settings.SEARCH_MODE", "memory"), \
+                patch("app.api.v1.endpoints.consultations.consultation_service.hybrid_search",
+                      AsyncMock(return_value=([], 7))):
+            response = await search_consultations(ConsultationSearchRequest(query="수학", hybrid=True), db=MagicMock())
+
+        assert json.loads(response.body)["total_is_estimate"] is True
@@ -0,0 +1,67 @@
+"""길이 버킷 배치 계획 단위 테스트"""
+import numpy as np
+from unittest.mock import patch
+from app.embeddings import BGEEmbedder, EmbedderBackend
+from app.embeddings.batching import padding_stats, plan_batches
+
+
+class _LengthBackend(EmbedderBackend):
+    """텍스트 길이를 첫 성분으로 갖는 벡터를 돌려주는 백엔드"""
+
+    name = "length"
+
+    def __init__(self, max_seq_length=None):
+        super().__init__("length-model", max_seq_length=max_seq_length)
+        self.batches = []
+
+    def load(self):
+        pass
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.batches.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class TestPlanBatches:
+    """토큰 예산 기반 배치 분할 검증"""
+
+    def test_groups_similar_lengths_within_budget(self):
+        lengths = [10, 500, 12, 480, 11, 9]
+        batches = plan_batches(lengths, token_budget=1000, max_batch_size=8)
+
+        assert sorted(index for batch in batches for index in batch) == list(range(6))
+        # 긴 텍스트 둘이 한 배치, 짧은 텍스트끼리 한 배치
+        assert batches == [[1, 3], [2, 4, 0, 5]]
+        for batch in batches:
+            assert len(batch) * max(lengths[i] for i in batch) <= 1000
+
+    def test_max_batch_size_and_oversized_text(self):
+        assert plan_batches([5] * 5, token_budget=1000, max_batch_size=2) == [[0, 1], [2, 3], [4]]
+        # 예산보다 긴 텍스트는 단독 배치
+        assert plan_batches([2000, 3], token_budget=1000, max_batch_size=8) == [[0], [1]]
+
+    def test_padding_reduced_by_sorting(self):
+        lengths = [10, 500, 12, 480]
+        sorted_plan = plan_batches(lengths, token_budget=1000, max_batch_size=2)
+        input_order_plan = [[0, 1], [2, 3]]
+        assert padding_stats(lengths, sorted_plan)["padded_tokens"] < padding_stats(lengths, input_order_plan)["padded_tokens"]
+
+
+class TestBucketedEmbedBatch:
+    """embed_batch 결과 순서 복원 검증"""
+
+    def test_restores_input_order(self):
+        backend = _LengthBackend(max_seq_length=64)
+        embedder = BGEEmbedder(model_name="length-model", backend="length")
+        texts = ["a" * 40, "b", "c" * 20, "d" * 3, "e" * 100]
+        with patch.dict("os.environ", {"TESTING": "false"}), \
+             patch("app.embeddings.bge_embedder.create_backend", return_value=backend):
+            vectors = embedder.embed_batch(texts, batch_size=8, token_budget=100)
+
+        # 최대 길이 64로 잘린 길이 기준으로 묶임
+        assert backend.token_lengths(texts) == [42, 3, 22, 5, 64]
+        assert backend.batches == [["e" * 100], ["a" * 40, "c" * 20], ["d" * 3, "b"]]
+        assert vectors[:, 0].tolist() == [len(text) for text in texts]
+        stats = embedder.info()["batching"]
+        assert stats["texts"] == 5 and stats["batches"] == 3
+        assert 0 < stats["padding_efficiency"] <= 1
@@ -0,0 +1,59 @@
+"""목록 조회 keyset 페이지네이션 단위 테스트"""
+import pytest
+from datetime import datetime, timedelta
+from app import crud
+from app.db.init_db import SCHEMA_UPGRADES
+from app.models import Consultation
+
+
+async def _collect_pages(db, limit):
+    pages, cursor = [], None
+    while True:
+        page = await crud.get_consultations_after(db, cursor=cursor, limit=limit)
+        if not page:
+            return pages
+        pages.append([c.text for c in page])
+        cursor = crud.encode_list_cursor(page[-1])
+
+
+class TestKeysetPagination:
+    """(created_at, id) 기준 keyset 페이지네이션 검증"""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_rows_once(self, sqlite_session):
+        base = datetime(2024, 1, 1)
+        # 같은 created_at을 가진 행은 id로 순서 결정
+        sqlite_session.add_all([
+            Consultation(text=f"상담 {i}", created_at=base + timedelta(minutes=i // 2))
+            for i in range(7)
+        ])
+        await sqlite_session.commit()
+
+        pages = await _collect_pages(sqlite_session, limit=3)
+
+        flat = [text for page in pages for text in page]
+        assert flat == [f"상담 {i}" for i in reversed(range(7))]
+        assert [len(page) for page in pages] == [3, 3, 1]
+
+    @pytest.mark.asyncio
+    async def test_new_rows_do_not_shift_pages(self, sqlite_session):
+        base = datetime(2024, 1, 1)
+        sqlite_session.add_all([Consultation(text=f"상담 {i}", created_at=base + timedelta(minutes=i)) for i in range(4)])
+        await sqlite_session.commit()
+
+        first = await crud.get_consultations_after(sqlite_session, limit=2)
+        sqlite_session.add(Consultation(text="새 상담", created_at=base + timedelta(days=1)))
+        await sqlite_session.commit()
+        second = await crud.get_consultations_after(sqlite_session, cursor=crud.encode_list_cursor(first[-1]), limit=2)
+
+        assert [c.text for c in second] == ["상담 1", "상담 0"]
+
+    def test_malformed_cursor(self):
+        with pytest.raises(ValueError):
+            crud.decode_list_cursor("not-a-cursor")
+
+    def test_composite_index_is_declared(self):
+        indexes = {index.name: [c.name for c in index.columns] for index in Consultation.__table__.indexes}
+        assert indexes["ix_consultations_created_at_id"] == ["created_at", "id"]
+        # 기존 데이터베이스에도 업그레이드로 생성
+        assert any("ix_consultations_created_at_id ON consultations (created_at, id)" in statement for statement in SCHEMA_UPGRADES)
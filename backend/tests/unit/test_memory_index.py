@@ -0,0 +1,150 @@
+"""프로세스 내 벡터 검색 엔진 단위 테스트"""
+import asyncio
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.base import Base
+from app.models import Consultation
+from app.search import InMemoryVectorIndex
+from app.services.consultation_service import ConsultationService
+
+
+def _random_vectors(count, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestInMemoryVectorIndex:
+    """InMemoryVectorIndex 동작 검증"""
+
+    def test_matches_brute_force_ranking(self):
+        """부분 정렬 결과가 전체 정렬과 같은지 검증"""
+        vectors = _random_vectors(500)
+        index = InMemoryVectorIndex(16, initial_capacity=8)
+        index.add_many(range(1, 501), vectors)
+        query = vectors[42]
+
+        hits, total = index.search(query, limit=10, skip=5, similarity_threshold=-1.0)
+
+        expected = np.argsort(-(vectors @ query), kind="stable")[5:15] + 1
+        assert total == 500
+        assert [consultation_id for consultation_id, _ in hits] == expected.tolist()
+
+    def test_threshold_counts_all_hits(self):
+        """임계값 이상 결과 수가 total로 반환되는지 검증"""
+        index = InMemoryVectorIndex(2)
+        index.add_many([1, 2, 3], [[1, 0], [1, 1], [0, 1]])
+
+        hits, total = index.search([1, 0], limit=1, similarity_threshold=0.5)
+
+        assert total == 2
+        assert hits[0][0] == 1
+        assert hits[0][1] == pytest.approx(1.0)
+
+    def test_upsert_and_remove(self):
+        """증분 갱신/삭제 후 검색 결과 검증"""
+        index = InMemoryVectorIndex(2)
+        index.add_many([1, 2, 3], [[1, 0], [0, 1], [-1, 0]])
+
+        index.upsert(3, [1, 0.1])
+        assert index.remove(1)
+        assert not index.remove(1)
+
+        hits, total = index.search([1, 0], limit=5, similarity_threshold=0.5)
+        assert len(index) == 2
+        assert 1 not in index
+        assert [consultation_id for consultation_id, _ in hits] == [3]
+        assert total == 1
+
+    def test_page_beyond_results(self):
+        """결과 범위를 넘는 페이지는 비어 있는지 검증"""
+        index = InMemoryVectorIndex(2)
+        index.add_many([1], [[1, 0]])
+        hits, total = index.search([1, 0], limit=10, skip=10)
+        assert hits == [] and total == 1
+
+
+class TestInProcessSearchService:
+    """ConsultationService의 프로세스 내 검색 경로 검증"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["memory", "quantized"])
+    async def test_load_and_search(self, mode):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+        vectors = np.zeros((3, 1024), dtype=np.float32)
+        vectors[0, 0] = vectors[1, 1] = vectors[2, 0] = vectors[2, 1] = 1.0
+        session.add_all([
+            Consultation(text=f"상담 {i}", embedding=vector.tolist())
+            for i, vector in enumerate(vectors)
+        ])
+        await session.commit()
+
+        service = ConsultationService()
+        try:
+            with patch("app.services.consultation_service.settings.SEARCH_MODE", mode), \
+                 patch.object(service.embedding_service, "aembed_query", new_callable=AsyncMock, return_value=vectors[0].tolist()):
+                results, total = await service.search_consultations(
+                    session, query="상담", limit=1, similarity_threshold=0.5
+                )
+            assert len(service.vector_index) == 3
+            assert total == 2
+            assert results[0][0].text == "상담 0"
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["memory", "quantized"])
+    async def test_refresh_applies_other_workers_writes(self, mode, tmp_path):
+        from sqlalchemy import delete, update
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'workers.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        vectors = np.eye(1024, dtype=np.float32)
+        async with sessions() as db:
+            db.add_all([Consultation(id=i, text=f"상담 {i}", embedding=vectors[i].tolist()) for i in (1, 2, 3)])
+            await db.commit()
+
+        worker = ConsultationService()
+        try:
+            with patch("app.services.consultation_service.settings.SEARCH_MODE", mode), \
+                 patch("app.services.consultation_service.settings.EMBEDDING_SNAPSHOT_PATH", None):
+                async with sessions() as db:
+                    await worker.load_vector_index(db)
+                # 다른 워커 프로세스의 쓰기 (이 워커의 인덱스에는 직접 반영되지 않음)
+                async with sessions() as db:
+                    await db.execute(update(Consultation).where(Consultation.id == 1)
+                                     .values(embedding=vectors[5].tolist()))
+                    await db.execute(update(Consultation).where(Consultation.id == 3)
+                                     .values(embedding=None, embedding_status="pending"))
+                    await db.execute(delete(Consultation).where(Consultation.id == 2))
+                    db.add(Consultation(id=4, text="상담 4", embedding=vectors[4].tolist()))
+                    await db.commit()
+
+                with patch("app.services.consultation_service.settings.SEARCH_INDEX_REFRESH_SECONDS", 0.01):
+                    await worker.start_index_refresh(sessions)
+                    # 삭제 반영(id 목록 정리)이 갱신의 마지막 단계
+                    for _ in range(100):
+                        if 2 not in worker.vector_index:
+                            break
+                        await asyncio.sleep(0.01)
+                    await worker.stop_index_refresh()
+
+            index = worker.vector_index
+            assert sorted(i for i in (1, 2, 3, 4) if i in index) == [1, 4]
+            # 갱신된 벡터로 검색됨
+            if mode == "quantized":
+                ids = index.search_candidates(vectors[5], 1)[0].tolist()
+            else:
+                ids = [i for i, _ in index.search(vectors[5], limit=1)[0]]
+            assert ids == [1]
+        finally:
+            await engine.dispose()
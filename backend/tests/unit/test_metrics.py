@@ -0,0 +1,131 @@
+"""지표 레지스트리, Server-Timing 미들웨어, 요청 프로파일링 단위 테스트"""
+import sys
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from app.core.metrics import Gauge, Histogram, MetricsRegistry, request_timings, server_timing_header, stage
+from app.core.middleware import RequestTimingMiddleware
+from app.core.profiling import SamplingProfiler, profile_path
+
+
+def _busy(seconds: float) -> int:
+    total, deadline = 0, time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        with stage("db", "test"):
+            pass
+        with stage("score", "test"):
+            _busy(0.05)
+        return {"id": item_id}
+
+    return app
+
+
+class TestMetricsRegistry:
+    """Prometheus 텍스트 형식과 비활성화 동작 검증"""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        histogram = Histogram(registry, "demo_seconds", "Demo", ("operation",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5.0, "a")
+        Gauge(registry, "demo_loaded", "Loaded").set_function(lambda: 1)
+
+        text = registry.render()
+        assert '# TYPE demo_seconds histogram' in text
+        assert 'demo_seconds_bucket{operation="a",le="0.1"} 1' in text
+        assert 'demo_seconds_bucket{operation="a",le="1"} 2' in text
+        assert 'demo_seconds_bucket{operation="a",le="+Inf"} 3' in text
+        assert 'demo_seconds_count{operation="a"} 3' in text
+        assert 'demo_seconds_sum{operation="a"} 5.55' in text
+        assert 'demo_loaded 1' in text
+
+    def test_disabled_registry_ignores_updates(self):
+        registry = MetricsRegistry(enabled=False)
+        histogram = Histogram(registry, "demo_seconds", "Demo")
+        gauge = Gauge(registry, "demo_in_flight", "Demo")
+        histogram.observe(1.0)
+        gauge.inc()
+        assert "demo_seconds_count" not in registry.render()
+        assert gauge.value == 0.0
+
+    def test_stage_accumulates_into_request_timings(self):
+        timings = {}
+        token = request_timings.set(timings)
+        try:
+            for _ in range(2):
+                with stage("db", "test"):
+                    pass
+        finally:
+            request_timings.reset(token)
+        assert set(timings) == {"db"} and timings["db"] >= 0.0
+        assert server_timing_header({"db": 0.0123, "embed": 0.002}, 0.05) == (
+            "embed;dur=2.00, db;dur=12.30, total;dur=50.00"
+        )
+
+
+class TestRequestTimingMiddleware:
+    """Server-Timing 헤더, /metrics, 토큰 인증 프로파일링 검증"""
+
+    @pytest.mark.asyncio
+    async def test_adds_server_timing_header(self):
+        async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test") as client:
+            response = await client.get("/items/1")
+        assert response.status_code == 200
+        entries = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+        assert set(entries) == {"db", "score", "total"}
+        assert float(entries["score"]) >= 50.0
+        assert "x-debug-profile-id" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint_reports_route_template(self):
+        from app.main import app
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/api/v1/health")
+            response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/health",status="200"}' in response.text
+        assert "# TYPE embedding_model_loaded gauge" in response.text
+        assert "http_requests_in_flight 1" in response.text
+
+    @pytest.mark.asyncio
+    async def test_profiles_only_with_matching_token(self, tmp_path):
+        with patch("app.core.middleware.settings.PROFILING_TOKEN", "secret"), \
+                patch("app.core.middleware.settings.PROFILE_DIR", str(tmp_path)), \
+                patch("app.core.middleware.settings.PROFILING_INTERVAL_MS", 1.0):
+            async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test") as client:
+                denied = await client.get("/items/1", headers={"X-Debug-Profile": "wrong"})
+                profiled = await client.get("/items/1", headers={"X-Debug-Profile": "secret"})
+
+        assert "x-debug-profile-id" not in denied.headers
+        path = profile_path(str(tmp_path), profiled.headers["x-debug-profile-id"])
+        assert path is not None and list(tmp_path.iterdir()) == [path]
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        # 요청 처리 코루틴 아래의 스택만 기록됨
+        assert any("test_metrics.py:_busy" in line for line in lines)
+        assert all(line.startswith("middleware.py:RequestTimingMiddleware.__call__") for line in lines)
+        assert profile_path(str(tmp_path), "../secret.folded") is None
+
+    def test_profiler_stop_does_not_wait_for_sampler(self):
+        profiler = SamplingProfiler(sys._getframe(), interval_ms=2000)
+        profiler.start()
+        started = time.perf_counter()
+        profiler.stop()
+        # 샘플러 스레드는 다음 대기 해제 시 스스로 종료되고, 이후 샘플은 기록되지 않음
+        assert time.perf_counter() - started < 0.5
+        profiler._sample(-1)
+        assert profiler.sample_count == 0 and profiler.folded() == ""
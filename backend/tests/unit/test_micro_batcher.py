@@ -0,0 +1,97 @@
+"""임베딩 마이크로 배칭 단위 테스트"""
+import asyncio
+import pytest
+import numpy as np
+from app.embeddings import MicroBatcher
+
+
+def _make_encoder(calls):
+    async def encode(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+    return encode
+
+
+class TestMicroBatcher:
+    """동시 요청을 모아 한 번에 인코딩하는지 검증"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_texts_share_one_encode(self):
+        calls = []
+        batcher = MicroBatcher(_make_encoder(calls), max_batch_size=32, max_wait_ms=20)
+        texts = ["가", "가나", "가나다", "가나다라"]
+        try:
+            vectors = await asyncio.gather(*(batcher.submit(text) for text in texts))
+        finally:
+            await batcher.close()
+
+        assert calls == [texts]
+        # 각 호출자에게 자기 텍스트의 벡터가 돌아감
+        assert [vector[0] for vector in vectors] == [1, 2, 3, 4]
+        stats = batcher.stats()
+        assert stats["batches"] == 1 and stats["texts"] == 4
+        assert stats["batch_size_histogram"]["<=4"] == 1
+        assert stats["queue_delay_ms"]["max"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size_splits_batches(self):
+        calls = []
+        batcher = MicroBatcher(_make_encoder(calls), max_batch_size=3, max_wait_ms=20)
+        try:
+            await asyncio.gather(*(batcher.submit(str(i)) for i in range(7)))
+        finally:
+            await batcher.close()
+        assert [len(batch) for batch in calls] == [3, 3, 1]
+
+    @pytest.mark.asyncio
+    async def test_lone_request_waits_at_most_max_wait(self):
+        calls = []
+        batcher = MicroBatcher(_make_encoder(calls), max_batch_size=32, max_wait_ms=1)
+        try:
+            vector = await asyncio.wait_for(batcher.submit("상담"), timeout=1.0)
+        finally:
+            await batcher.close()
+        assert vector[0] == 2 and calls == [["상담"]]
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_caller(self):
+        async def encode(texts):
+            raise RuntimeError("model")
+
+        batcher = MicroBatcher(encode, max_wait_ms=5)
+        try:
+            results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        finally:
+            await batcher.close()
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert batcher.stats()["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_flush_resolves_every_caller(self):
+        started = asyncio.Event()
+
+        async def encode(texts):
+            started.set()
+            await asyncio.sleep(10)
+
+        batcher = MicroBatcher(encode, max_wait_ms=5)
+        try:
+            submits = [asyncio.ensure_future(batcher.submit(text)) for text in ("a", "b")]
+            await started.wait()
+            for task in list(batcher._dispatches):
+                task.cancel()
+            # 인코딩 중 취소되어도 호출자는 무한히 대기하지 않고 오류를 받음
+            results = await asyncio.wait_for(asyncio.gather(*submits, return_exceptions=True), timeout=1.0)
+        finally:
+            await batcher.close()
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_close_resolves_queued_callers(self):
+        batcher = MicroBatcher(_make_encoder([]), max_wait_ms=1000)
+        submit = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0.01)
+        await batcher.close()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(submit, timeout=1.0)
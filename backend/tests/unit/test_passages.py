@@ -0,0 +1,155 @@
+"""구간(passage) 분할/집계/검색 단위 테스트"""
+import pytest
+import pytest_asyncio
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app import crud
+from app.models import ConsultationPassage
+from app.schemas import ConsultationCreate, ConsultationUpdate
+from app.search import aggregate_passage_scores, split_passages
+from app.services.consultation_service import ConsultationService
+
+from tests.unit.conftest import keyword_embedding as _embed, keyword_embeddings as _embed_many
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session):
+    with patch("app.crud.settings.PASSAGE_SEARCH_ENABLED", True), \
+         patch("app.crud.settings.PASSAGE_MAX_CHARS", 40), \
+         patch("app.crud.settings.PASSAGE_OVERLAP_CHARS", 10), \
+         patch("app.crud.embedding_service.aembed_text", AsyncMock(side_effect=_embed)), \
+         patch("app.crud.embedding_service.aembed_batch", AsyncMock(side_effect=_embed_many)):
+        yield sqlite_session
+
+
+async def _passages(db, consultation_id):
+    result = await db.execute(
+        select(ConsultationPassage)
+        .where(ConsultationPassage.consultation_id == consultation_id)
+        .order_by(ConsultationPassage.position)
+    )
+    return result.scalars().all()
+
+
+class TestSplitPassages:
+    """겹치는 구간 분할 검증"""
+
+    def test_short_text_is_one_passage(self):
+        assert split_passages("짧은 상담 기록", max_chars=40) == [(0, 8)]
+
+    def test_long_text_windows_overlap_and_cover_text(self):
+        text = " ".join(f"문장{i}입니다." for i in range(60))
+        spans = split_passages(text, max_chars=50, overlap_chars=15)
+
+        assert spans[0][0] == 0 and spans[-1][1] == len(text)
+        for (start, end), (next_start, _) in zip(spans, spans[1:]):
+            assert end - start <= 50
+            # 다음 구간은 이전 구간과 겹치며 앞으로 진행
+            assert start < next_start < end
+            # 문장 끝에서 자름
+            assert text[end - 1] in ". "
+
+
+class TestAggregatePassageScores:
+    """상담별 구간 점수 집계 검증"""
+
+    def test_max_and_mean_top_n(self):
+        ids = np.array([1, 2, 1, 1, 2])
+        scores = np.array([0.2, 0.5, 0.9, 0.7, 0.1], dtype=np.float32)
+
+        best = aggregate_passage_scores(ids, scores, "max")
+        assert best[1] == (pytest.approx(0.9), 2)
+        assert best[2] == (pytest.approx(0.5), 1)
+
+        mean = aggregate_passage_scores(ids, scores, "mean_top_n", top_n=2)
+        assert mean[1][0] == pytest.approx(0.8)
+        assert mean[2][0] == pytest.approx(0.3)
+
+    def test_unknown_aggregation_rejected(self):
+        with pytest.raises(ValueError):
+            aggregate_passage_scores(np.array([1]), np.array([0.1]), "median")
+
+
+class TestPassageSync:
+    """쓰기 시 구간 동기화 검증"""
+
+    @pytest.mark.asyncio
+    async def test_create_update_delete_keep_passages_in_sync(self, db):
+        long_text = "수학 시간에 집중력이 좋아졌습니다. 친구들과 교우 관계도 원만합니다. 건강 상태는 양호하며 결석이 없습니다."
+        consultation = await crud.create_consultation(db, ConsultationCreate(text=long_text))
+        passages = await _passages(db, consultation.id)
+        assert len(passages) > 1
+        assert [p.position for p in passages] == list(range(len(passages)))
+
+        # 짧은 텍스트는 구간 하나이며 문서 임베딩을 재사용
+        short = await crud.create_consultation(db, ConsultationCreate(text="건강 양호"))
+        short_passages = await _passages(db, short.id)
+        assert len(short_passages) == 1
+        np.testing.assert_allclose(short_passages[0].embedding, short.embedding)
+
+        await crud.update_consultation(db, consultation.id, ConsultationUpdate(text="수학 성적 향상"))
+        updated = await _passages(db, consultation.id)
+        assert [(p.start_offset, p.end_offset) for p in updated] == [(0, 8)]
+
+        await crud.delete_consultation(db, consultation.id)
+        assert await _passages(db, consultation.id) == []
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_embeds_all_passages_in_one_call(self, db):
+        texts = [
+            "수학 문제를 스스로 해결합니다. " * 4,
+            "교우 관계가 원만하고 친구를 잘 돕습니다. " * 3,
+            "건강",
+        ]
+        with patch("app.crud.embedding_service.aembed_batch", AsyncMock(side_effect=_embed_many)) as embed_batch:
+            created = await crud.bulk_create_consultations(db, [ConsultationCreate(text=t) for t in texts])
+        # 문서 임베딩 1회 + 구간 임베딩 1회
+        assert embed_batch.await_count == 2
+        counts = [len(await _passages(db, c.id)) for c in created]
+        assert counts[0] > 1 and counts[1] > 1 and counts[2] == 1
+
+
+class TestPassageSearch:
+    """구간 단위 검색 검증"""
+
+    @pytest.mark.asyncio
+    async def test_python_scan_returns_best_passage_snippet(self, db):
+        long_text = "출결은 양호합니다. 가정 통신문을 잘 챙깁니다. 최근 수학 수학 단원 평가에서 만점을 받았습니다."
+        target = await crud.create_consultation(db, ConsultationCreate(text=long_text))
+        await crud.create_consultation(db, ConsultationCreate(text="교우 관계가 원만합니다"))
+
+        service = ConsultationService()
+        with patch("app.services.consultation_service.settings.PASSAGE_SEARCH_ENABLED", True), \
+             patch("app.services.consultation_service.settings.SEARCH_MODE", "python"), \
+             patch.object(service.embedding_service, "aembed_query", new_callable=AsyncMock, return_value=_embed("수학")):
+            results, total = await service.search_passages(db, "수학", limit=5, similarity_threshold=0.5)
+
+        assert total == 1
+        consultation, score, snippet = results[0]
+        assert consultation.id == target.id
+        assert "수학" in snippet and len(snippet) <= 40
+        assert score > 0.9
+
+    @pytest.mark.asyncio
+    async def test_disabled_passage_search_rejected(self):
+        service = ConsultationService()
+        with patch("app.services.consultation_service.settings.PASSAGE_SEARCH_ENABLED", False):
+            with pytest.raises(ValueError):
+                await service.search_passages(MagicMock(), "수학")
+
+    @pytest.mark.asyncio
+    async def test_pgvector_aggregates_in_single_query(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(all=lambda: []))
+        results, total = await crud.search_passages(
+            db, [0.0] * 1024, limit=5, aggregation="mean_top_n", top_n=3, mode="pgvector"
+        )
+        assert (results, total) == ([], 0)
+        assert db.execute.await_count == 1
+
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "row_number() OVER (PARTITION BY consultation_passages.consultation_id" in sql
+        assert "avg(" in sql and "FILTER (WHERE" in sql
+        assert "count(*) OVER ()" in sql
@@ -0,0 +1,42 @@
+"""id 위치 맵 단위 테스트"""
+import numpy as np
+from unittest.mock import patch
+from app.search.positions import PositionMap
+
+
+class TestPositionMap:
+    """dict와 같은 결과를 NumPy 배열로 유지하는지 검증"""
+
+    def test_matches_dict_through_merges(self):
+        rng = np.random.default_rng(0)
+        positions, expected = PositionMap(), {}
+        # 작은 병합 기준으로 최근 변경 dict와 정렬 배열 사이의 병합을 자주 일으킴
+        with patch("app.search.positions.MERGE_MIN_ENTRIES", 8):
+            for _ in range(2000):
+                key, value = int(rng.integers(200)), int(rng.integers(1000))
+                operation = rng.random()
+                if operation < 0.5:
+                    positions[key] = value
+                    expected[key] = value
+                elif operation < 0.8:
+                    assert positions.pop(key) == expected.pop(key, None)
+                elif operation < 0.9:
+                    keys = rng.integers(200, size=20)
+                    positions.set_many(keys, keys * 10)
+                    expected.update({int(k): int(k) * 10 for k in keys})
+                else:
+                    keys = rng.integers(200, size=20)
+                    positions.remove_many(keys)
+                    for k in keys.tolist():
+                        expected.pop(k, None)
+                assert len(positions) == len(expected)
+
+            queried = np.arange(200)
+            assert positions.get_many(queried).tolist() == [expected.get(k, -1) for k in queried.tolist()]
+            assert positions.ids().tolist() == sorted(expected)
+
+    def test_bulk_load_uses_arrays(self):
+        positions = PositionMap()
+        positions.set_many(np.arange(100000)[::-1], np.arange(100000))
+        assert len(positions) == 100000 and positions.get(0) == 99999
+        assert positions.nbytes == 100000 * PositionMap.ENTRY_BYTES
@@ -0,0 +1,89 @@
+"""양자화 벡터 인덱스 단위 테스트"""
+import pytest
+import numpy as np
+from app.search import QuantizedVectorIndex
+from app.search.quantized import quantize_int8
+
+
+def _random_vectors(count, dimension=64, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestQuantization:
+    """양자화 정확도 검증"""
+
+    def test_int8_round_trip_error_is_small(self):
+        vectors = _random_vectors(100)
+        codes, scales = quantize_int8(vectors)
+        restored = codes.astype(np.float32) * scales[:, None]
+        assert codes.dtype == np.int8
+        assert np.abs(restored - vectors).max() <= scales.max() / 2 + 1e-6
+
+    def test_coarse_scores_close_to_exact(self, monkeypatch):
+        monkeypatch.setattr("app.search.quantized.SCAN_BLOCK_ROWS", 32)
+        vectors = _random_vectors(300)
+        index = QuantizedVectorIndex(64, initial_capacity=4)
+        index.add_many(range(300), vectors)
+        query = vectors[7]
+
+        ids, scores = index.scores(query)
+        np.testing.assert_allclose(scores, vectors[ids] @ query, atol=0.02)
+        # 필터 경로도 같은 블록 복원 사용
+        ids, scores = index.scores(query, allowed_ids=range(0, 300, 3))
+        assert sorted(ids.tolist()) == list(range(0, 300, 3))
+        np.testing.assert_allclose(scores, vectors[ids] @ query, atol=0.02)
+
+    def test_candidates_contain_exact_top_k(self):
+        vectors = _random_vectors(1000)
+        index = QuantizedVectorIndex(64)
+        index.add_many(range(1000), vectors)
+        query = vectors[3]
+
+        candidates, total = index.search_candidates(query, candidates=40, similarity_threshold=-1.0)
+
+        exact_top = set(np.argsort(-(vectors @ query))[:10].tolist())
+        assert exact_top <= set(candidates.tolist())
+        assert candidates[0] == 3
+        assert total == 1000
+
+
+class TestQuantizedIndexMaintenance:
+    """증분 갱신과 메모리 사용량 검증"""
+
+    def test_upsert_remove_and_retain(self):
+        index = QuantizedVectorIndex(2, mode="int8")
+        index.add_many([1, 2, 3], [[1, 0], [0, 1], [-1, 0]])
+        index.upsert(3, [1, 0.1])
+        assert index.remove(2)
+        assert index.retain_only([3]) == 1
+
+        candidates, total = index.search_candidates([1, 0], candidates=5, similarity_threshold=0.5)
+        assert candidates.tolist() == [3]
+        assert total == 1
+
+    def test_bulk_retain_keeps_positions(self):
+        index = QuantizedVectorIndex(16, mode="int8")
+        vectors = _random_vectors(1000, dimension=16)
+        index.add_many(range(1000), vectors)
+        # 삭제 행이 많으면 배열을 한 번에 압축하고 옮겨진 행의 위치만 갱신
+        assert index.retain_only(range(0, 1000, 3)) == 666
+        assert len(index) == 334 and 3 in index and 4 not in index
+
+        index.upsert(3, vectors[998])
+        candidates, _ = index.search_candidates(vectors[998], candidates=1, similarity_threshold=-1.0)
+        assert candidates.tolist() == [3]
+
+    def test_memory_footprint(self):
+        index = QuantizedVectorIndex(1024, mode="int8")
+        index.add_many(range(10), _random_vectors(10, dimension=1024))
+        footprint = index.memory_footprint()
+        # 코드 + scale + id + id 위치 맵
+        assert footprint["bytes_per_vector"] == 1024 + 4 + 8 + 16
+        assert footprint["compression_ratio"] > 3.5
+
+    @pytest.mark.parametrize("mode", ["int4", "float16"])
+    def test_rejects_unknown_mode(self, mode):
+        with pytest.raises(ValueError):
+            QuantizedVectorIndex(8, mode=mode)
@@ -0,0 +1,94 @@
+"""모델 선로딩/예열 및 준비 상태 단위 테스트"""
+import asyncio
+import pytest
+import numpy as np
+from unittest.mock import patch
+from app.api.v1.endpoints.readiness import readiness_check
+from app.services.readiness_service import ReadinessService, warmup_texts
+
+
+class _FakeEmbeddingService:
+    """로딩/인코딩 호출을 기록하고 지연 시간을 흉내 내는 서비스"""
+
+    def __init__(self, fail_load=False):
+        self.fail_load = fail_load
+        self.loaded = asyncio.Event()
+        self.release = asyncio.Event()
+        self.encoded = []
+
+    async def aload_model(self):
+        self.loaded.set()
+        await self.release.wait()
+        if self.fail_load:
+            raise RuntimeError("model not found")
+
+    async def aencode_uncached(self, texts):
+        self.encoded.append(len(texts))
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+
+class TestReadinessService:
+    """준비 상태 전이와 예열 검증"""
+
+    @pytest.mark.asyncio
+    async def test_not_ready_until_warmed_up(self):
+        fake = _FakeEmbeddingService()
+        service = ReadinessService(fake, batch_sizes=[1, 4], seq_lengths=[8, 32], max_rounds=3)
+        service.start()
+        await fake.loaded.wait()
+        assert not service.ready and service.state == "loading"
+
+        fake.release.set()
+        await service.wait()
+
+        assert service.ready
+        status = service.status()
+        assert status["state"] == "ready"
+        assert [(item["batch_size"], item["seq_length"]) for item in status["warmup"]] == [
+            (1, 8), (4, 8), (1, 32), (4, 32)
+        ]
+        assert all(1 <= item["rounds"] <= 3 for item in status["warmup"])
+        assert status["load_seconds"] is not None and status["warmup_seconds"] is not None
+        assert set(fake.encoded) == {1, 4}
+
+    @pytest.mark.asyncio
+    async def test_warm_shape_repeats_until_latency_settles(self):
+        fake = _FakeEmbeddingService()
+        service = ReadinessService(fake, max_rounds=5, tolerance=0.2)
+        # 첫 두 회는 느리고 이후 안정
+        clock = iter([0.0, 1.0, 1.0, 1.5, 1.5, 1.6, 1.6, 1.7])
+        with patch("app.services.readiness_service.time.perf_counter", lambda: next(clock)):
+            result = await service._warm_shape(2, 16)
+        assert result["rounds"] == 4
+        assert result["first_ms"] == pytest.approx(1000.0)
+        assert result["last_ms"] == pytest.approx(100.0)
+
+    @pytest.mark.asyncio
+    async def test_failed_load_stays_not_ready(self):
+        fake = _FakeEmbeddingService(fail_load=True)
+        fake.release.set()
+        service = ReadinessService(fake, batch_sizes=[1], seq_lengths=[8])
+        service.start()
+        await service.wait()
+
+        assert not service.ready
+        assert service.status()["error"] == "RuntimeError: model not found"
+
+    def test_warmup_texts(self):
+        texts = warmup_texts(3, 10)
+        assert len(texts) == 3 and len(texts[0].split()) == 8
+
+
+class TestReadinessEndpoint:
+    """/ready 응답 코드 검증"""
+
+    @pytest.mark.asyncio
+    async def test_returns_503_until_ready(self):
+        service = ReadinessService(_FakeEmbeddingService())
+        with patch("app.api.v1.endpoints.readiness.readiness_service", service):
+            response = await readiness_check()
+            assert response.status_code == 503
+
+            service.disable()
+            body = await readiness_check()
+            assert body["ready"] is True
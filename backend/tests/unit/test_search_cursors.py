@@ -0,0 +1,126 @@
+"""검색 세션 커서 단위 테스트"""
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.base import Base
+from app.models import Consultation
+from app.search import SearchCursorStore
+from app.services.consultation_service import ConsultationService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSearchCursorStore:
+    """SearchCursorStore TTL/용량 제한 검증"""
+
+    def test_page_and_total(self):
+        store = SearchCursorStore()
+        cursor = store.create("q", [(3, 0.9), (1, 0.8), (2, 0.7)], total=3)
+        session = store.get(cursor, "q")
+
+        assert session.page(1, 1) == [(1, pytest.approx(0.8))]
+        assert session.covers(2, 10)
+
+    def test_partial_session_does_not_cover_deep_pages(self):
+        store = SearchCursorStore()
+        session = store.get(store.create("q", [(1, 0.9), (2, 0.8)], total=5), "q")
+        assert session.covers(0, 2)
+        assert not session.covers(2, 2)
+
+    def test_key_mismatch_is_a_miss(self):
+        store = SearchCursorStore()
+        cursor = store.create("q", [(1, 0.9)], total=1)
+        assert store.get(cursor, "other") is None
+        assert store.get("unknown", "q") is None
+        assert store.stats()["misses"] == 2
+
+    def test_ttl_is_sliding(self):
+        clock = FakeClock()
+        store = SearchCursorStore(ttl_seconds=10, clock=clock)
+        cursor = store.create("q", [(1, 0.9)], total=1)
+
+        clock.now = 8
+        assert store.get(cursor, "q") is not None
+        clock.now = 16
+        assert store.get(cursor, "q") is not None
+        clock.now = 30
+        assert store.get(cursor, "q") is None
+        assert store.stats()["expirations"] == 1
+
+    def test_eviction_by_entries_and_bytes(self):
+        store = SearchCursorStore(max_entries=2)
+        first = store.create("a", [(1, 0.9)], total=1)
+        second = store.create("b", [(2, 0.9)], total=1)
+        store.get(first, "a")
+        store.create("c", [(3, 0.9)], total=1)
+        assert store.get(second, "b") is None
+        assert store.get(first, "a") is not None
+
+        store = SearchCursorStore(max_bytes=24)
+        store.create("a", [(1, 0.9), (2, 0.8)], total=2)
+        store.create("b", [(3, 0.9), (4, 0.8)], total=2)
+        assert len(store) == 1
+        assert store.stats()["evictions"] == 1
+
+
+class TestCursorPagination:
+    """커서로 다음 페이지를 조회할 때 순위가 유지되는지 검증"""
+
+    @pytest.mark.asyncio
+    async def test_pages_stay_stable_after_insert(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+
+        def vector(similarity):
+            v = np.zeros(1024, dtype=np.float32)
+            v[0], v[1] = similarity, np.sqrt(1 - similarity ** 2)
+            return v.tolist()
+
+        session.add_all([Consultation(text=f"상담 {i}", embedding=vector(0.9 - i * 0.1)) for i in range(4)])
+        await session.commit()
+
+        service = ConsultationService()
+        query_embedding = vector(1.0)
+        try:
+            with patch("app.services.consultation_service.settings.SEARCH_MODE", "python"), \
+                 patch("app.crud.settings.SEARCH_MODE", "python"), \
+                 patch.object(service.embedding_service, "aembed_query", new_callable=AsyncMock, return_value=query_embedding) as embed:
+                first, total, cursor = await service.search_consultations_page(
+                    session, query="상담", limit=2, skip=0, similarity_threshold=0.5, create_cursor=True
+                )
+                # 다음 페이지 요청 전에 가장 유사한 행이 새로 추가되어도 순위는 유지
+                session.add(Consultation(text="새 상담", embedding=query_embedding))
+                await session.commit()
+                second, second_total, same_cursor = await service.search_consultations_page(
+                    session, query="상담", limit=2, skip=2, similarity_threshold=0.5, cursor=cursor
+                )
+
+            assert cursor is not None and same_cursor == cursor
+            assert total == second_total == 4
+            assert [c.text for c, _ in first] == ["상담 0", "상담 1"]
+            assert [c.text for c, _ in second] == ["상담 2", "상담 3"]
+            assert embed.call_count == 1
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_plain_search_does_not_create_session(self):
+        service = ConsultationService()
+        with patch.object(service, "search_consultations", new_callable=AsyncMock, return_value=([], 0)) as search:
+            results, total, cursor = await service.search_consultations_page(
+                AsyncMock(), query="상담", limit=2, skip=0, similarity_threshold=0.5
+            )
+        # 커서를 요청하지 않은 첫 검색은 limit만큼만 순위를 계산하고 세션을 만들지 않음
+        assert (results, total, cursor) == ([], 0, None)
+        assert search.await_args.args[2] == 2
+        assert service.search_cursors.stats()["created"] == 0
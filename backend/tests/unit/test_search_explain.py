@@ -0,0 +1,108 @@
+"""검색 진단(EXPLAIN, 후보/임계값 통계, 단계별 시간) 단위 테스트"""
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app import crud
+from app.api.v1.endpoints.consultations import explain_search
+from app.db.explain import Explain, plan_rows_scanned
+from app.models import Consultation
+from app.schemas import ConsultationCreate, ConsultationSearchRequest
+from app.services.consultation_service import ConsultationService
+
+from tests.unit.conftest import keyword_embedding as _embed
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session):
+    with patch("app.crud.embedding_service.aembed_text", AsyncMock(side_effect=_embed)):
+        for text in ("수학 문제를 잘 풉니다", "수학 수학 단원 평가", "교우 관계 원만", "건강 상태 양호"):
+            await crud.create_consultation(sqlite_session, ConsultationCreate(text=text))
+        yield sqlite_session
+
+
+class TestExplainConstruct:
+    """EXPLAIN 구문 생성과 실행 계획 해석 검증"""
+
+    def test_postgresql_explain_analyze_buffers_json(self):
+        distance = Consultation.embedding.cosine_distance([0.0] * 1024)
+        statement = select(Consultation.id).where(distance <= 0.7).order_by(distance).limit(5)
+        sql = str(Explain(statement).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT consultations.id")
+        assert "<=>" in sql
+        assert str(Explain(statement, analyze=False).compile(dialect=postgresql.dialect())).startswith(
+            "EXPLAIN (FORMAT JSON) SELECT"
+        )
+
+    def test_plan_rows_scanned_sums_scan_nodes(self):
+        plan = [{"Plan": {
+            "Node Type": "Limit", "Actual Rows": 5, "Actual Loops": 1,
+            "Plans": [{"Node Type": "Index Scan", "Actual Rows": 40, "Actual Loops": 1,
+                       "Rows Removed by Filter": 12}],
+        }}]
+        assert plan_rows_scanned(plan) == 52
+        assert plan_rows_scanned(["SCAN consultations"]) is None
+
+
+class TestExplainSearch:
+    """검색 모드별 진단 보고서 검증"""
+
+    @pytest.mark.asyncio
+    async def test_python_scan_report(self, db):
+        service = ConsultationService()
+        with patch("app.services.consultation_service.settings.SEARCH_MODE", "python"), \
+             patch.object(service.embedding_service, "aembed_query_with_cache_info",
+                          new_callable=AsyncMock, return_value=(_embed("수학"), False)):
+            report = await service.explain_search(db, "수학", limit=1, similarity_threshold=0.5)
+
+        assert report["strategy"] == "python_scan"
+        assert report["query_embedding_cache"] == "miss"
+        assert report["candidates_scanned"] == {"python": 4}
+        assert (report["returned"], report["total"]) == (1, 2)
+        assert set(report["timings_ms"]) >= {"db", "score", "total"}
+        # SQLite는 EXPLAIN QUERY PLAN 결과(세부 문자열 목록)
+        assert any("consultations" in line for line in report["plan"])
+
+        threshold = report["threshold"]
+        assert (threshold["matched"], threshold["evaluated"], threshold["cut"]) == (2, 4, 2)
+        assert threshold["best_similarity"] == pytest.approx(1.0, abs=1e-3)
+        assert threshold["best_cut_similarity"] < 0.5
+        assert set(threshold["similarity_at_rank"]) == {1}
+
+    @pytest.mark.asyncio
+    async def test_memory_index_report_has_no_sql_plan(self, db):
+        service = ConsultationService()
+        with patch("app.services.consultation_service.settings.SEARCH_MODE", "memory"), \
+             patch.object(service.embedding_service, "aembed_query_with_cache_info",
+                          new_callable=AsyncMock, return_value=(_embed("건강"), True)):
+            report = await service.explain_search(db, "건강", limit=10, similarity_threshold=0.5)
+
+        assert report["strategy"] == "memory_index"
+        assert report["query_embedding_cache"] == "hit"
+        assert report["candidates_scanned"] == {"memory": 4}
+        assert report["parameters"] == {"index_size": 4}
+        assert report["plan"] is None
+        assert [c.text for c, _ in report["results"]] == ["건강 상태 양호"]
+
+    @pytest.mark.asyncio
+    async def test_pgvector_explains_page_query_with_search_params(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(all=lambda: [('[{"Plan": {"Node Type": "Limit"}}]',)]))
+        db.get_bind.return_value.dialect.name = "postgresql"
+        with patch("app.crud.settings.VECTOR_INDEX_TYPE", "hnsw"):
+            plan, parameters = await crud.explain_search(db, [0.0] * 1024, limit=50, skip=20, mode="pgvector")
+
+        assert plan == [{"Plan": {"Node Type": "Limit"}}]
+        assert parameters == {"index_type": "hnsw", "ef_search": 70, "probes": None}
+        statements = [call[0][0] for call in db.execute.call_args_list]
+        assert str(statements[0]) == "SET LOCAL hnsw.ef_search = 70"
+        sql = str(statements[-1].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT")
+
+    @pytest.mark.asyncio
+    async def test_endpoint_rejects_hybrid(self):
+        with pytest.raises(HTTPException) as error:
+            await explain_search(ConsultationSearchRequest(query="수학", hybrid=True), db=MagicMock())
+        assert error.value.status_code == 400
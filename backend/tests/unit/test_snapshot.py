@@ -0,0 +1,130 @@
+"""임베딩 스냅샷 단위 테스트"""
+import pytest
+import numpy as np
+from datetime import datetime
+from app.search import InMemoryVectorIndex, load_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return tmp_path / "embeddings.vsnap"
+
+
+class TestSnapshotFormat:
+    """스냅샷 파일 형식 검증"""
+
+    def test_round_trip(self, snapshot_path):
+        """쓰기/읽기 후 id, 벡터, high-water mark가 보존되는지 검증"""
+        high_water_mark = datetime(2025, 7, 18, 9, 30, 15, 123456)
+        write_snapshot(snapshot_path, [3, 1, 2], [[0, 2], [3, 0], [1, 1]], high_water_mark)
+
+        snapshot = load_snapshot(snapshot_path)
+
+        assert snapshot.ids.tolist() == [1, 2, 3]
+        assert snapshot.dimension == 2
+        assert snapshot.high_water_mark == high_water_mark
+        np.testing.assert_allclose(snapshot.vectors[0], [1.0, 0.0])
+        np.testing.assert_allclose(snapshot.vectors[2], [0.0, 1.0])
+        assert isinstance(snapshot.vectors, np.memmap)
+        assert not snapshot.vectors.flags.writeable
+
+    def test_empty_snapshot(self, snapshot_path):
+        write_snapshot(snapshot_path, [], np.empty((0, 4)))
+        snapshot = load_snapshot(snapshot_path)
+        assert len(snapshot) == 0
+        assert snapshot.high_water_mark is None
+
+    def test_rejects_foreign_file(self, snapshot_path):
+        snapshot_path.write_bytes(b"not a snapshot" * 400)
+        with pytest.raises(ValueError):
+            load_snapshot(snapshot_path)
+
+
+class TestSnapshotBackedIndex:
+    """스냅샷 기반 인덱스의 증분 반영 검증"""
+
+    def test_updates_and_deletes_over_shared_base(self, snapshot_path):
+        write_snapshot(snapshot_path, [1, 2, 3], [[1, 0], [0, 1], [-1, 0]])
+        index = InMemoryVectorIndex.from_snapshot(load_snapshot(snapshot_path))
+
+        index.upsert(3, [1, 0.2])    # 스냅샷 행 갱신 -> tail로 이동
+        index.upsert(4, [1, 0.1])    # 신규 행
+        index.remove(2)              # 스냅샷 행 삭제
+        dropped = index.retain_only([1, 3, 4])
+
+        hits, total = index.search([1, 0], limit=10, similarity_threshold=-1.0)
+
+        assert dropped == 0
+        assert len(index) == 3
+        assert [consultation_id for consultation_id, _ in hits] == [1, 4, 3]
+        assert total == 3
+        assert index.shared_nbytes > 0
+
+    def test_retain_only_drops_missing_rows(self, snapshot_path):
+        write_snapshot(snapshot_path, [1, 2], [[1, 0], [0, 1]])
+        index = InMemoryVectorIndex.from_snapshot(load_snapshot(snapshot_path))
+
+        assert index.retain_only([2]) == 1
+        assert 1 not in index and 2 in index
+
+
+class TestBuildSnapshot:
+    """consultations 테이블로 스냅샷 생성 검증"""
+
+    @pytest.mark.asyncio
+    async def test_build_from_table(self, snapshot_path):
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from app.db.base import Base
+        from app.models import Consultation
+        from app.search import build_snapshot
+
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+        session.add_all([
+            Consultation(text="상담 1", embedding=[1.0] + [0.0] * 1023),
+            Consultation(text="상담 2", embedding=None),
+            Consultation(text="상담 3", embedding=[0.0, 2.0] + [0.0] * 1022),
+        ])
+        await session.commit()
+        try:
+            snapshot = await build_snapshot(session, snapshot_path, 1024, chunk_size=1)
+            assert snapshot.ids.tolist() == [1, 3]
+            assert snapshot.high_water_mark is not None
+            assert snapshot.vectors[1, 1] == pytest.approx(1.0)
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_catch_up_reads_rows_committed_after_high_water_mark(self, snapshot_path):
+        from datetime import timedelta
+        from unittest.mock import patch
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from app.db.base import Base
+        from app.models import Consultation
+        from app.search import build_snapshot
+        from app.services.consultation_service import ConsultationService
+
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+        session.add(Consultation(text="상담 1", embedding=[1.0] + [0.0] * 1023))
+        await session.commit()
+        try:
+            snapshot = await build_snapshot(session, snapshot_path, 1024)
+            # 스냅샷 이전에 시작했지만 이후에 커밋된 트랜잭션 (updated_at < high-water mark)
+            started = snapshot.high_water_mark - timedelta(seconds=5)
+            session.add(Consultation(text="상담 2", embedding=[0.0, 1.0] + [0.0] * 1022,
+                                     created_at=started, updated_at=started))
+            await session.commit()
+
+            with patch("app.services.consultation_service.settings.SEARCH_MODE", "memory"), \
+                    patch("app.services.consultation_service.settings.EMBEDDING_SNAPSHOT_PATH", str(snapshot_path)):
+                index = await ConsultationService().load_vector_index(session)
+            assert 1 in index and 2 in index and len(index) == 2
+        finally:
+            await session.close()
+            await engine.dispose()
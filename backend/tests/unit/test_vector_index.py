@@ -0,0 +1,93 @@
+"""벡터 인덱스 관리 단위 테스트"""
+import contextlib
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.db.init_db import upgrade_schema
+from app.db.vector_index import (
+    VECTOR_INDEX_NAME,
+    VectorIndexParams,
+    build_index_ddl,
+    compute_index_params,
+    parse_index_definition,
+)
+from app.schemas import ConsultationSearchRequest
+
+
+class TestIndexParams:
+    """코퍼스 크기 기반 인덱스 파라미터 테스트"""
+
+    def test_ivfflat_lists_scale_with_rows(self):
+        """IVFFlat lists가 행 수에 비례하는지 검증"""
+        assert compute_index_params(500, "ivfflat").lists == 1
+        assert compute_index_params(200_000, "ivfflat").lists == 200
+        assert compute_index_params(4_000_000, "ivfflat").lists == 2000
+
+    def test_hnsw_params_grow_with_corpus(self):
+        """HNSW 파라미터가 코퍼스 크기에 따라 커지는지 검증"""
+        small = compute_index_params(1_000, "hnsw")
+        large = compute_index_params(2_000_000, "hnsw")
+        assert (small.m, small.ef_construction) == (16, 64)
+        assert large.m > small.m
+        assert large.ef_construction > small.ef_construction
+
+    def test_unknown_method(self):
+        """지원하지 않는 인덱스 유형 검증"""
+        with pytest.raises(ValueError):
+            compute_index_params(1_000, "flat")
+
+    def test_ddl_round_trip(self):
+        """생성 DDL과 pg_indexes 정의 파싱이 일치하는지 검증"""
+        params = VectorIndexParams(method="hnsw", m=16, ef_construction=128)
+        ddl = build_index_ddl(params)
+        assert VECTOR_INDEX_NAME in ddl
+        assert "vector_cosine_ops" in ddl
+
+        indexdef = (
+            f"CREATE INDEX {VECTOR_INDEX_NAME} ON public.consultations "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m='16', ef_construction='128')"
+        )
+        assert parse_index_definition(indexdef) == params
+
+
+class TestSearchKnobs:
+    """요청별 검색 파라미터 검증"""
+
+    def test_optional_by_default(self):
+        request = ConsultationSearchRequest(query="협력")
+        assert request.ef_search is None
+        assert request.probes is None
+
+    def test_ef_search_range(self):
+        with pytest.raises(ValueError):
+            ConsultationSearchRequest(query="협력", ef_search=0)
+
+
+class TestUpgradeSchema:
+    """시작 시 스키마 업그레이드가 타임아웃 없이, 테이블 재작성 없이 실행되는지 검증"""
+
+    @staticmethod
+    async def _run(has_rows):
+        conn = MagicMock(dialect=MagicMock())
+        conn.dialect.name = "postgresql"
+        conn.execute = AsyncMock(return_value=MagicMock(scalar_one=MagicMock(return_value=False)))
+        conn.scalar = AsyncMock(return_value=has_rows)
+
+        @contextlib.asynccontextmanager
+        async def begin():
+            yield conn
+
+        with patch("app.db.init_db.get_engine", return_value=MagicMock(begin=begin)):
+            await upgrade_schema()
+        return [str(call.args[0]) for call in conn.execute.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_existing_table_skips_text_search_rewrite(self, caplog):
+        statements = await self._run(has_rows=True)
+        assert statements[0] == "SET LOCAL statement_timeout = 0"
+        assert not any("ADD COLUMN IF NOT EXISTS text_search" in statement for statement in statements)
+        assert "manage_vector_index.py text-search" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_empty_table_gets_text_search(self):
+        statements = await self._run(has_rows=False)
+        assert any("ADD COLUMN IF NOT EXISTS text_search" in statement for statement in statements)
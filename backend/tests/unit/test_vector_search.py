@@ -0,0 +1,87 @@
+"""벡터 검색 전략 단위 테스트"""
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app import crud
+from app.db.base import Base
+from app.models import Consultation
+
+
+def _unit_vector(*values):
+    vector = np.zeros(1024, dtype=np.float32)
+    vector[:len(values)] = values
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+async def _seeded_session(embeddings):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = AsyncSession(engine, expire_on_commit=False)
+    session.add_all([
+        Consultation(text=f"상담 {i}", embedding=embedding)
+        for i, embedding in enumerate(embeddings)
+    ])
+    await session.commit()
+    return engine, session
+
+
+class TestPythonScanSearch:
+    """Python 전체 스캔 검색 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_ranking_threshold_and_paging(self):
+        """임계값 필터링 후 유사도 순으로 페이징되는지 검증"""
+        engine, session = await _seeded_session([
+            _unit_vector(1, 0),
+            _unit_vector(1, 1),
+            _unit_vector(0, 1),
+        ])
+        try:
+            results, total = await crud.search_consultations_by_embedding(
+                session, _unit_vector(1, 0), limit=1, skip=0,
+                similarity_threshold=0.5, mode="python"
+            )
+            assert total == 2
+            assert [c.text for c, _ in results] == ["상담 0"]
+            assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        finally:
+            await session.close()
+            await engine.dispose()
+
+
+class TestPgvectorSearch:
+    """pgvector 검색 쿼리 생성 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_query_is_pushed_down_to_postgres(self):
+        """정렬/필터/페이징이 SQL로 내려가는지 검증"""
+        page_result = MagicMock()
+        page_result.all.return_value = []
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=page_result)
+        db.scalar = AsyncMock(return_value=0)
+
+        results, total = await crud.search_consultations_by_embedding(
+            db, _unit_vector(1, 0), limit=5, skip=0,
+            similarity_threshold=0.3, mode="pgvector"
+        )
+
+        statement = db.execute.call_args[0][0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "<=>" in sql
+        assert "ORDER BY" in sql
+        assert "LIMIT" in sql
+        assert results == [] and total == 0
+        # 첫 페이지가 비어 있으면 COUNT 쿼리를 생략
+        db.scalar.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_mode_raises(self):
+        """지원하지 않는 검색 모드 검증"""
+        with pytest.raises(ValueError):
+            await crud.search_consultations_by_embedding(
+                MagicMock(), _unit_vector(1), mode="unknown"
+            )
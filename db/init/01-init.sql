@@ -6,6 +6,12 @@ CREATE TABLE IF NOT EXISTS consultations (
     id SERIAL PRIMARY KEY,
     text TEXT NOT NULL,
     embedding vector(1024),  -- BGE-M3 모델은 1024차원
+    content_hash VARCHAR(64),  -- 정규화된 텍스트의 SHA-256 (같은 텍스트의 임베딩 재사용)
+    embedding_status VARCHAR(16) NOT NULL DEFAULT 'ready',  -- pending | ready | failed
+    category VARCHAR(64),  -- 상담 분류 (검색 필터)
+    owner VARCHAR(64),  -- 담당 교사/학생 식별자 (검색 필터)
+    -- 하이브리드 검색용 어휘 색인 (한국어 조사 대응을 위해 'simple' 사전 + 접두어 검색)
+    text_search tsvector GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, ''))) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -25,6 +31,44 @@ CREATE TRIGGER update_consultations_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
--- IVFFlat 인덱스 생성 (검색 성능 향상)
--- 참고: 데이터가 있어야 인덱스 생성 가능
--- CREATE INDEX ON consultations USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- 목록 조회 keyset 페이지네이션용 복합 인덱스 ((created_at, id) 역방향 스캔)
+CREATE INDEX IF NOT EXISTS ix_consultations_created_at_id
+    ON consultations (created_at, id);
+
+-- 같은 내용의 기존 임베딩 조회용 인덱스
+CREATE INDEX IF NOT EXISTS ix_consultations_content_hash
+    ON consultations (content_hash);
+
+-- 검색 필터 메타데이터 인덱스
+CREATE INDEX IF NOT EXISTS ix_consultations_category
+    ON consultations (category);
+
+CREATE INDEX IF NOT EXISTS ix_consultations_owner
+    ON consultations (owner);
+
+-- 하이브리드 검색의 어휘 후보 조회용 GIN 인덱스
+CREATE INDEX IF NOT EXISTS ix_consultations_text_search
+    ON consultations USING gin (text_search);
+
+-- 임베딩 대기 행 복구/개수 조회용 부분 인덱스 (INGESTION_MODE=async)
+CREATE INDEX IF NOT EXISTS ix_consultations_embedding_pending
+    ON consultations (id) WHERE embedding_status <> 'ready';
+
+-- 긴 상담 기록의 구간(passage) 임베딩 (PASSAGE_SEARCH_ENABLED=true)
+CREATE TABLE IF NOT EXISTS consultation_passages (
+    id SERIAL PRIMARY KEY,
+    consultation_id INTEGER NOT NULL REFERENCES consultations(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    start_offset INTEGER NOT NULL,  -- consultations.text 내 문자 위치 [start_offset, end_offset)
+    end_offset INTEGER NOT NULL,
+    embedding vector(1024)
+);
+
+CREATE INDEX IF NOT EXISTS ix_consultation_passages_consultation_id
+    ON consultation_passages (consultation_id);
+
+-- HNSW 인덱스 생성 (검색 성능 향상)
+-- 참고: HNSW는 빈 테이블에도 생성 가능. 코퍼스 크기에 맞춘 재빌드/IVFFlat 전환은
+-- backend/scripts/manage_vector_index.py 로 수행 (app/db/vector_index.py)
+CREATE INDEX IF NOT EXISTS ix_consultations_embedding_ann
+    ON consultations USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);